@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+#
+# python-netsnmpagent example agent with asyncio
+#
+# Copyright (c) 2013-2016 Pieter Hollants <pieter@hollants.com>
+# Licensed under the GNU Lesser Public License (LGPL) version 3
+#
+
+#
+# This example agent serves the same single DisplayString as
+# threading_agent.py but does not need a separate data update thread nor
+# SIGALRM-driven wakeups: asyncio_attach() hooks net-snmp's file descriptors
+# and timers into an asyncio event loop, so the coroutine updating the data
+# and SNMP request processing share a single thread and never block each
+# other.
+#
+# Requires Python 3.5 or newer.
+#
+# Use the included script run_asyncio_agent.sh to test this example.
+#
+# Alternatively, see the comment block in the head of simple_agent.py for
+# adaptable instructions how to run this example against a system-wide snmpd
+# instance.
+#
+
+import sys, os, signal, time
+import optparse, asyncio
+
+# Make sure we use the local copy, not a system-wide one
+sys.path.insert(0, os.path.dirname(os.getcwd()))
+import netsnmpagent
+
+prgname = sys.argv[0]
+
+# Process command line arguments
+parser = optparse.OptionParser()
+parser.add_option(
+	"-i",
+	"--interval",
+	dest="interval",
+	help="Set interval in seconds between data updates",
+	default=30
+)
+parser.add_option(
+	"-m",
+	"--mastersocket",
+	dest="mastersocket",
+	help="Sets the transport specification for the master agent's AgentX socket",
+	default="/var/run/agentx/master"
+)
+parser.add_option(
+	"-p",
+	"--persistencedir",
+	dest="persistencedir",
+	help="Sets the path to the persistence directory",
+	default="/var/lib/net-snmp"
+)
+(options, args) = parser.parse_args()
+
+def LogMsg(msg):
+	""" Writes a formatted log message with a timestamp to stdout. """
+
+	print("{0} {1}".format(time.strftime("%T", time.localtime(time.time())), msg))
+
+def LogNetSnmpMsg(priority, msg):
+	""" Log handler for log messages generated by net-snmp code. """
+
+	LogMsg("[{0}] {1}.".format(priority, msg))
+
+# Create an instance of the netsnmpAgent class
+try:
+	agent = netsnmpagent.netsnmpAgent(
+		AgentName      = "AsyncioAgent",
+		MasterSocket   = options.mastersocket,
+		PersistenceDir = options.persistencedir,
+		MIBFiles       = [ os.path.abspath(os.path.dirname(sys.argv[0])) +
+		                   "/THREADING-MIB.txt" ],
+		LogHandler     = LogNetSnmpMsg,
+	)
+except netsnmpagent.netsnmpAgentException as e:
+	print("{0}: {1}".format(prgname, e))
+	sys.exit(1)
+
+# Register the only SNMP object we serve, a DisplayString
+threadingString = agent.DisplayString(
+	oidstr  = "THREADING-MIB::threadingString",
+	initval = "<No data available yet>"
+)
+
+async def UpdateSNMPObjs():
+	""" Coroutine that periodically does the actual data update. """
+
+	while True:
+		# Obtain the data by calling an external command. SNMP requests keep
+		# being served while we wait for it to finish.
+		LogMsg("Calling external command \"sleep 5; date\".")
+		proc = await asyncio.create_subprocess_shell(
+			"sleep 5; date", env={ "LANG": "C" },
+			stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT
+		)
+		output = (await proc.communicate())[0].splitlines()[0]
+		if proc.returncode != 0:
+			LogMsg("An error occured executing the command: {0}".format(output))
+		else:
+			LogMsg("Updating \"threadingString\" object with data \"{0}\".".format(output))
+			threadingString.update(output)
+
+		await asyncio.sleep(float(options.interval))
+
+# Start the agent (eg. connect to the master agent).
+try:
+	agent.start()
+except netsnmpagent.netsnmpAgentException as e:
+	LogMsg("{0}: {1}".format(prgname, e))
+	sys.exit(1)
+
+loop = asyncio.get_event_loop()
+
+# Terminate our asyncio agent when CTRL-C is pressed or a KILL signal is
+# received
+loop.add_signal_handler(signal.SIGINT, loop.stop)
+loop.add_signal_handler(signal.SIGTERM, loop.stop)
+
+agent.asyncio_attach(loop)
+updater = loop.create_task(UpdateSNMPObjs())
+
+LogMsg("Now serving SNMP requests, press ^C to terminate.")
+loop.run_forever()
+
+LogMsg("Terminating.")
+updater.cancel()
+agent.asyncio_detach()
+agent.shutdown()
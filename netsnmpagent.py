@@ -18,8 +18,9 @@ actually takes care of in its API's helpers.
 This module, by contrast, concentrates on wrapping the net-snmp C API
 for SNMP subagents in an easy manner. """
 
-import sys, os, socket, struct, re, locale
-from collections import defaultdict
+import sys, os, socket, struct, re, locale, bisect, array, time, heapq, itertools
+import json, mmap, hashlib, signal
+from collections import defaultdict, deque, OrderedDict
 from netsnmpapi import *
 
 # Maximum string size supported by python-netsnmpagent
@@ -82,6 +83,12 @@ def _build_callback_handler(callback):
 		if ret != SNMP_ERR_NOERROR:
 			return ret
 
+		# If the callback delegated the requests (see netsnmpAgent.delegate()),
+		# the remaining handlers will be called once the delegated work has
+		# been done.
+		if _is_delegated(args[2]):
+			return ret
+
 		if handler_p[0].next is not None:
 			ret = libnsa.netsnmp_call_next_handler(handler_p, *args, **kwargs)
 
@@ -90,6 +97,18 @@ def _build_callback_handler(callback):
 	return SNMPNodeHandler(callback_with_next_handler)
 
 
+def _is_delegated(requests):
+	""" Helper function to check whether any of the requests in the chain
+	    "requests" has been marked delegated """
+
+	request = requests
+	while bool(request):
+		if request.contents.delegated:
+			return True
+		request = ctypes.cast(request.contents.next, netsnmp_request_info_p)
+	return False
+
+
 def _inject_custom_handler(handler, registration_info):
 	"""
 	Helper function to inject a custom handler at the top of the callback
@@ -101,6 +120,2751 @@ def _inject_custom_handler(handler, registration_info):
 		raise netsnmpAgentException("Error injecting custom callback handler!")
 
 
+class _OIDCache(object):
+	""" Bounded LRU cache mapping OID strings to the tuples of sub-identifiers
+	    they resolve to, used by netsnmpAgent.determine_oid_and_length(). """
+
+	__slots__ = ("_entries", "_maxsize", "hits", "misses")
+
+	def __init__(self, maxsize):
+		self._entries = OrderedDict()
+		self._maxsize = maxsize
+		self.hits     = 0
+		self.misses   = 0
+
+	def get(self, oidstr):
+		""" Returns the tuple cached for "oidstr" or None. """
+
+		oid = self._entries.pop(oidstr, None)
+		if oid is None:
+			self.misses += 1
+			return None
+
+		# Reinsert to mark the entry as most recently used
+		self._entries[oidstr] = oid
+		self.hits += 1
+		return oid
+
+	def put(self, oidstr, oid):
+		""" Caches the tuple "oid" for "oidstr", evicting the least
+		    recently used entry if the cache is full. """
+
+		if self._maxsize <= 0:
+			return
+		self._entries[oidstr] = oid
+		if len(self._entries) > self._maxsize:
+			self._entries.popitem(last=False)
+
+	def clear(self):
+		self._entries.clear()
+
+	def stats(self):
+		return {
+			"hits":    self.hits,
+			"misses":  self.misses,
+			"size":    len(self._entries),
+			"maxsize": self._maxsize
+		}
+
+# Matches the beginning of a MIB module's definition, capturing its name
+_mibModuleDefinition = re.compile(
+	r"^\s*([A-Za-z][-A-Za-z0-9]*)\s+DEFINITIONS\s*::=\s*BEGIN",
+	re.MULTILINE
+)
+
+def _mibModuleNames(mibfiles):
+	""" Returns the set of the names of the MIB modules defined in the MIB
+	    files "mibfiles". """
+
+	modules = set()
+	for mib in mibfiles:
+		with open(mib, "rb") as f:
+			contents = f.read().decode("ascii", "replace")
+		modules.update(_mibModuleDefinition.findall(contents))
+	return modules
+
+def _mibFingerprint(mibfiles):
+	""" Returns a list describing the MIB files "mibfiles" by their path,
+	    modification time, size and SHA-1 hash, as stored in the header of
+	    the files written by _writeOIDFile(). """
+
+	fingerprint = []
+	for mib in mibfiles:
+		path = os.path.abspath(mib)
+		st   = os.stat(path)
+		with open(path, "rb") as f:
+			digest = hashlib.sha1(f.read()).hexdigest()
+		fingerprint.append({
+			"path":  path,
+			"mtime": st.st_mtime,
+			"size":  st.st_size,
+			"sha1":  digest
+		})
+	return fingerprint
+
+def _mibFingerprintValid(fingerprint, mibfiles):
+	""" Checks whether "fingerprint", as returned by _mibFingerprint(), still
+	    describes the MIB files "mibfiles". Files whose modification time and
+	    size did not change are assumed to be unchanged, for all others the
+	    hash is compared, so eg. freshly checked out files are no reason to
+	    recompile. """
+
+	paths = [os.path.abspath(mib) for mib in mibfiles]
+	if paths != [entry["path"] for entry in fingerprint]:
+		return False
+
+	for entry in fingerprint:
+		try:
+			st = os.stat(entry["path"])
+		except OSError:
+			return False
+		if st.st_mtime == entry["mtime"] and st.st_size == entry["size"]:
+			continue
+		if st.st_size != entry["size"]:
+			return False
+		with open(entry["path"], "rb") as f:
+			if hashlib.sha1(f.read()).hexdigest() != entry["sha1"]:
+				return False
+	return True
+
+# Layout of the files written by _writeOIDFile(): the magic, the lengths of
+# the JSON header, the number of entries and the length of the name blob,
+# followed by the JSON header, the fixed-size entry records sorted by name,
+# the name blob and the blob of sub-identifiers
+_oidFileMagic    = b"NSAOIDC1"
+_oidFilePreamble = struct.Struct("<8sIII")
+_oidFileRecord   = struct.Struct("<IHIH")
+_oidFileSubid    = struct.Struct("<I")
+
+def _writeOIDFile(path, mibs, entries):
+	""" Writes the OID strings and tuples of sub-identifiers in the dictionary
+	    "entries" to the compiled OID file "path", recording the MIB file
+	    fingerprint "mibs". The file is replaced atomically so agents reading
+	    it concurrently never see partial contents. """
+
+	names   = sorted((name if isinstance(name, bytes) else name.encode("utf-8"), oid)
+	                 for name, oid in entries.items())
+	header  = json.dumps({ "mibs": mibs }).encode("utf-8")
+	records = []
+	nameblob = []
+	oidblob  = []
+	nameoff  = 0
+	oidoff   = 0
+	for name, oid in names:
+		records.append(_oidFileRecord.pack(nameoff, len(name), oidoff, len(oid)))
+		nameblob.append(name)
+		oidblob.append(struct.pack("<{0}I".format(len(oid)), *oid))
+		nameoff += len(name)
+		oidoff  += len(oid) * _oidFileSubid.size
+
+	tmppath = "{0}.{1}.tmp".format(path, os.getpid())
+	with open(tmppath, "wb") as f:
+		f.write(_oidFilePreamble.pack(_oidFileMagic, len(header), len(names), nameoff))
+		f.write(header)
+		f.write(b"".join(records))
+		f.write(b"".join(nameblob))
+		f.write(b"".join(oidblob))
+	os.rename(tmppath, path)
+
+class _OIDFile(object):
+	""" Read-only, memory-mapped view of a compiled OID file as written by
+	    _writeOIDFile(). Lookups binary search the sorted entry records in
+	    place, so opening even large files costs next to nothing. """
+
+	__slots__ = ("_file", "_mmap", "mibs", "_count", "_records", "_names", "_oids")
+
+	def __init__(self, path):
+		self._file = open(path, "rb")
+		try:
+			self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+			magic, headerlen, self._count, namelen = \
+				_oidFilePreamble.unpack_from(self._mmap, 0)
+			if magic != _oidFileMagic:
+				raise ValueError("bad magic")
+			offset = _oidFilePreamble.size
+			header = json.loads(self._mmap[offset:offset + headerlen].decode("utf-8"))
+			self.mibs = header["mibs"]
+			self._records = offset + headerlen
+			self._names   = self._records + self._count * _oidFileRecord.size
+			self._oids    = self._names + namelen
+
+			# The sub-identifiers are laid out in the order of the entry
+			# records, so the last entry's end the file
+			size = self._oids
+			if self._count:
+				nameoff, entrylen, oidoff, oidlen = _oidFileRecord.unpack_from(
+					self._mmap,
+					self._records + (self._count - 1) * _oidFileRecord.size
+				)
+				size += oidoff + oidlen * _oidFileSubid.size
+			if len(self._mmap) != size:
+				raise ValueError("bad size")
+		except (ValueError, KeyError, TypeError, struct.error, mmap.error):
+			self._file.close()
+			raise netsnmpAgentException("Invalid compiled OID file: {0}".format(path))
+
+	def __len__(self):
+		return self._count
+
+	def _entry(self, i):
+		nameoff, namelen, oidoff, oidlen = \
+			_oidFileRecord.unpack_from(self._mmap, self._records + i * _oidFileRecord.size)
+		nameoff += self._names
+		return self._mmap[nameoff:nameoff + namelen], oidoff, oidlen
+
+	def _oid(self, oidoff, oidlen):
+		return struct.unpack_from("<{0}I".format(oidlen), self._mmap, self._oids + oidoff)
+
+	def get(self, name):
+		""" Returns the tuple of sub-identifiers "name" resolves to or None. """
+
+		key = name if isinstance(name, bytes) else name.encode("utf-8")
+		lo, hi = 0, self._count
+		while lo < hi:
+			mid = (lo + hi) // 2
+			entry, oidoff, oidlen = self._entry(mid)
+			if entry < key:
+				lo = mid + 1
+			elif entry > key:
+				hi = mid
+			else:
+				return self._oid(oidoff, oidlen)
+		return None
+
+	def items(self):
+		""" Returns a dictionary of all entries. """
+
+		entries = {}
+		for i in range(self._count):
+			name, oidoff, oidlen = self._entry(i)
+			entries[name.decode("utf-8")] = self._oid(oidoff, oidlen)
+		return entries
+
+	def names(self):
+		""" Returns a dictionary mapping the tuples of sub-identifiers back
+		    to the names they were compiled from. """
+
+		names = {}
+		for name, oid in sorted(self.items().items()):
+			# Prefer fully qualified names such as "SIMPLE-MIB::simpleInteger"
+			if oid not in names or ("::" in name and "::" not in names[oid]):
+				names[oid] = name
+		return names
+
+	def close(self):
+		self._mmap.close()
+		self._file.close()
+
+class _OIDRegistry(object):
+	""" The SNMP objects registered in one SNMP context, keyed by their
+	    numeric OIDs (tuples of sub-identifiers), so that an object
+	    registered as eg. ".1.3.6.1.2.1.1" and as "SNMPv2-MIB::system" is
+	    the same. The OIDs are also kept in a sorted list, which allows
+	    in-order traversal and subtree queries by bisecting. """
+
+	__slots__ = ("_oids", "_entries")
+
+	def __init__(self):
+		self._oids    = []
+		self._entries = {}
+
+	def __len__(self):
+		return len(self._oids)
+
+	def __contains__(self, oid):
+		return tuple(oid) in self._entries
+
+	def add(self, oid, oidstr, snmpobj):
+		""" Registers "snmpobj", which was registered at "oidstr" resolving
+		    to "oid", replacing any object registered at the same OID. """
+
+		oid = tuple(oid)
+		if oid not in self._entries:
+			bisect.insort(self._oids, oid)
+		self._entries[oid] = (oidstr, snmpobj)
+
+	def remove(self, oid):
+		""" Removes the object registered at "oid" and returns its (oidstr,
+		    snmpobj) tuple. Raises KeyError if there is none. """
+
+		oid = tuple(oid)
+		entry = self._entries.pop(oid)
+		del self._oids[bisect.bisect_left(self._oids, oid)]
+		return entry
+
+	def get(self, oid, default = None):
+		""" Returns the object registered at "oid" or "default". """
+
+		entry = self._entries.get(tuple(oid))
+		return default if entry is None else entry[1]
+
+	def find(self, oid):
+		""" Returns the (oid, oidstr, snmpobj) tuple of the object whose
+		    registration covers "oid", ie. the one registered at its longest
+		    prefix, or None, eg. for an instance OID of a scalar or a table
+		    cell. """
+
+		oid = tuple(oid)
+		for i in range(len(oid), 0, -1):
+			entry = self._entries.get(oid[:i])
+			if entry is not None:
+				return (oid[:i],) + entry
+		return None
+
+	def items(self, prefix = ()):
+		""" Yields (oid, oidstr, snmpobj) tuples for the objects registered
+		    at "prefix" or below in OID order. """
+
+		prefix = tuple(prefix)
+		oids   = self._oids
+		plen   = len(prefix)
+		for i in range(bisect.bisect_left(oids, prefix), len(oids)):
+			oid = oids[i]
+			if oid[:plen] != prefix:
+				break
+			yield (oid,) + self._entries[oid]
+
+def _reginfoOID(handler_reginfo):
+	""" Returns the root OID of "handler_reginfo" as a tuple. """
+
+	reginfo = handler_reginfo.contents
+	return tuple(reginfo.rootoid[:reginfo.rootoid_len])
+
+class _SNMPObject(object):
+	""" Base class of the SNMP object types served through a watcher. The
+	    properties common to all objects of a type are class attributes,
+	    instances only hold the state of the particular SNMP object. """
+
+	__slots__ = (
+		"_cvar", "_data_size", "_max_size", "_watcher", "_callback_handler",
+		"_handler_reginfo", "_generation", "_state"
+	)
+
+	_register_func = staticmethod(libnsX.netsnmp_register_watched_instance)
+
+	def _changeGeneration(self, current):
+		""" Returns the generation of the object's last change, "current"
+		    being the generation to assign to changes noticed now.
+
+		    Scalars may be changed by update() as well as by SNMP SETs,
+		    which net-snmp applies to the C variable directly, so instead of
+		    tracking either we compare the variable to what it was at the
+		    last call, which for scalars costs next to nothing. """
+
+		size = self._watcher.contents.data_size if self._watcher is not None \
+		                                        else self._data_size
+		state = (size, ctypes.string_at(ctypes.addressof(self._cvar), ctypes.sizeof(self._cvar)))
+		if state != getattr(self, "_state", None):
+			self._state      = state
+			self._generation = current
+		return self._generation
+
+	def _register(self, agent, oidstr, writable, context, callback, oid = None):
+		""" Registers this SNMP object with net-snmp using the watcher
+		    registration function given by the class attribute
+		    "_register_func".
+
+		    "oid" optionally is the already resolved (oid, oid_len) tuple
+		    for "oidstr". """
+
+		# Prepare the netsnmp_handler_registration structure.
+		self._callback_handler = None
+		if callback != None:
+			# We defined a Python function that needs a ctypes conversion so it can
+			# be called by C code such as net-snmp. That's what SNMPNodeHandler() is
+			# used for. However we also need to store the reference in "self" as it
+			# will otherwise be lost at the exit of this function so that net-snmp's
+			# attempt to call it would end in nirvana...
+			self._callback_handler = _build_callback_handler(callback)
+
+		handler_reginfo = agent._prepareRegistration(oidstr, writable, oid)
+		handler_reginfo.contents.contextName = b(context)
+
+		# The watcher registration functions for scalars extend the root
+		# OID by the instance sub-identifier, so take note of it now
+		regoid = _reginfoOID(handler_reginfo)
+
+		# Create the netsnmp_watcher_info structure. With
+		# WATCHER_SIZE_UNIT_OIDS, the watcher counts the data size in
+		# sub-identifiers instead of bytes.
+		data_size = self._data_size
+		if self._flags & WATCHER_SIZE_UNIT_OIDS:
+			data_size //= ctypes.sizeof(c_oid)
+		self._watcher = libnsX.netsnmp_create_watcher_info(
+			self.cref(),
+			data_size,
+			self._asntype,
+			self._flags
+		)
+
+		# Explicitly set netsnmp_watcher_info structure's
+		# max_size parameter. netsnmp_create_watcher_info6 would
+		# have done that for us but that function was not yet
+		# available in net-snmp 5.4.x.
+		self._watcher.contents.max_size = self._max_size
+
+		# Register handler and watcher with net-snmp.
+		result = self._register_func(handler_reginfo, self._watcher)
+		if result != 0:
+			raise netsnmpAgentException("Error registering variable with net-snmp!")
+
+		# If present, inject the custom callback handler before the watcher
+		if self._callback_handler is not None:
+			_inject_custom_handler(self._callback_handler, handler_reginfo)
+
+		# Finally, we keep track of all registered SNMP objects for the
+		# getRegistered() method.
+		self._handler_reginfo = handler_reginfo
+		agent._objs[context].add(regoid, oidstr, self)
+
+	def _unregister(self):
+		""" Unregisters this SNMP object from net-snmp, which frees the
+		    watcher. The object keeps its value. """
+
+		# SNMP SETs may have changed the value's size in the watcher only
+		size = self._watcher.contents.data_size
+		if self._flags & WATCHER_SIZE_UNIT_OIDS:
+			size *= ctypes.sizeof(c_oid)
+		self._data_size = size
+
+		libnsa.netsnmp_unregister_handler(self._handler_reginfo)
+		self._handler_reginfo = None
+		self._watcher         = None
+
+class _VarType(_SNMPObject):
+	""" Base class of the SNMP variable types defined through the
+	    netsnmpAgent.VarTypeClass decorator. Derived classes carry the
+	    dictionary returned by the decorated property_func in "_props". """
+
+	__slots__ = ()
+
+	_register_func = staticmethod(libnsX.netsnmp_register_watched_scalar)
+
+	def __init__(self, agent, initval, oidstr, writable, context, callback):
+		props = self._props
+
+		# Use variable type's default initval if we weren't given one
+		if initval == None:
+			initval = props["initval"]
+
+		# Create the ctypes class instance representing the variable
+		# to be handled by the net-snmp C API. If this variable type
+		# has no fixed size, pass the maximum size as second
+		# argument to the constructor.
+		if self._flags == WATCHER_FIXED_SIZE:
+			self._cvar      = props["ctype"](initval if isnum(initval) else b(initval))
+			self._data_size = ctypes.sizeof(self._cvar)
+			self._max_size  = self._data_size
+		else:
+			self._cvar      = props["ctype"](initval if isnum(initval) else b(initval), props["max_size"])
+			self._data_size = len(self._cvar.value)
+			self._max_size  = max(self._data_size, props["max_size"])
+
+		self._watcher = None
+		if oidstr:
+			self._register(agent, oidstr, writable, context, callback)
+
+	def value(self):
+		val = self._cvar.value
+
+		if self._asntype != ASN_OPAQUE_FLOAT and self._asntype != ASN_OPAQUE_DOUBLE:
+			if isnum(val):
+				# Python 2.x will automatically switch from the "int"
+				# type to the "long" type, if necessary. Python 3.x
+				# has no limits on the "int" type anymore.
+				val = int(val)
+			else:
+				val = u(val)
+
+		return val
+
+	def cref(self, **kwargs):
+		return ctypes.byref(self._cvar) if self._flags == WATCHER_FIXED_SIZE \
+		                                else self._cvar
+
+	def update(self, val):
+		if self._asntype == ASN_COUNTER and val >> 32:
+			val = val & 0xFFFFFFFF
+		elif self._asntype == ASN_COUNTER64 and val >> 64:
+			val = val & 0xFFFFFFFFFFFFFFFF
+		elif self.__class__.__name__ == 'Gauge32' and val >> 32:
+			val = 0xFFFFFFFF
+		self._cvar.value = val
+		if self._flags & WATCHER_MAX_SIZE == WATCHER_MAX_SIZE:
+			if len(val) > self._max_size:
+				raise netsnmpAgentException(
+					"Value passed to update() truncated: {0} > {1} "
+					"bytes!".format(len(val), self._max_size)
+				)
+			self._data_size = len(val)
+			if self._watcher is not None:
+				self._watcher.contents.data_size = self._data_size
+
+class _CounterVarType(_VarType):
+	""" Base class of the counter SNMP variable types. """
+
+	__slots__ = ()
+
+	def increment(self, count=1):
+		self.update(self.value() + count)
+
+class _ObjectIdentifier(_SNMPObject):
+	__slots__ = ("_agent", "_object_id")
+
+	_flags   = WATCHER_MAX_SIZE | WATCHER_SIZE_UNIT_OIDS
+	_asntype = ASN_OBJECT_ID
+
+	def __init__(self, agent, initval, oidstr, writable, context, callback):
+		self._agent     = agent
+		self._set_oid_value(initval)
+
+		self._watcher = None
+		if oidstr:
+			self._register(agent, oidstr, writable, context, callback)
+
+	def _register(self, agent, oidstr, writable, context, callback, oid = None):
+		# Registered writable objects may get SET to OIDs of any length.
+		# registerMany() registers objects created without "oidstr", so
+		# this can't be done at construction time.
+		if writable:
+			self._object_id = (c_oid * MAX_OID_LEN)(*self._object_id)
+			self._cvar      = self._object_id
+			self._max_size  = ctypes.sizeof(self._object_id)
+
+		_SNMPObject._register(self, agent, oidstr, writable, context, callback, oid)
+
+	def _set_oid_value(self, oid_value):
+		# determine_oid_and_length() returns arrays of the OID's actual
+		# length. "_max_size" reflects that so that SETs can not overflow.
+		if oid_value is not None:
+			oid, oid_len = self._agent.determine_oid_and_length(oid_value)
+			self._object_id = oid
+			self._data_size = oid_len.value * ctypes.sizeof(c_oid)
+		else:
+			self._object_id = (c_oid * 0)()
+			self._data_size = 0
+		self._cvar     = self._object_id
+		self._max_size = ctypes.sizeof(self._object_id)
+
+	def value(self):
+		# Once registered, SNMP SETs change the OID's length in the watcher
+		# only, which counts it in sub-identifiers
+		if self._watcher is not None:
+			oid_len = self._watcher.contents.data_size
+		else:
+			oid_len = self._data_size // ctypes.sizeof(c_oid)
+		return "." + ".".join([str(oid) for oid in self._object_id[:oid_len]])
+
+	def cref(self, **kwargs):
+		return ctypes.byref(self._cvar)
+
+	def update(self, val):
+		raise NotImplementedError("ObjectIdentifier type does not currently support update!")
+_ObjectIdentifier.__name__ = "ObjectIdentifier"
+
+class _IpAddress(_SNMPObject):
+	__slots__ = ()
+
+	_flags   = WATCHER_FIXED_SIZE
+	_asntype = ASN_IPADDRESS
+
+	def __init__(self, agent, initval, oidstr, writable, context, callback):
+		self._cvar      = ctypes.c_uint(0)
+		self._data_size = ctypes.sizeof(self._cvar)
+		self._max_size  = self._data_size
+		self.update(initval)
+
+		self._watcher = None
+		if oidstr:
+			self._register(agent, oidstr, writable, context, callback)
+
+	def value(self):
+		# Get string representation of IP address.
+		return socket.inet_ntoa(
+			struct.pack("I", self._cvar.value)
+		)
+
+	def cref(self, **kwargs):
+		# Due to an unfixed Net-SNMP issue (see
+		# https://sourceforge.net/p/net-snmp/bugs/2136/) we have
+		# to convert the value to host byte order if it shall be
+		# used as table index.
+		if kwargs.get("is_table_index", False) == False:
+			return ctypes.byref(self._cvar)
+		else:
+			_cidx = ctypes.c_uint(0)
+			_cidx.value = struct.unpack("I", struct.pack("!I", self._cvar.value))[0]
+			return ctypes.byref(_cidx)
+
+	def update(self, val):
+		# Convert dotted decimal IP address string to ctypes
+		# unsigned int in network byte order.
+		self._cvar.value = struct.unpack(
+			"I",
+			socket.inet_aton(val)
+		)[0]
+_IpAddress.__name__ = "IpAddress"
+
+class _TruthValue(_SNMPObject):
+	__slots__ = ()
+
+	_flags   = WATCHER_FIXED_SIZE
+	_asntype = ASN_INTEGER
+
+	def __init__(self, agent, initval, oidstr, writable, context, callback):
+		self._cvar      = ctypes.c_int(0)
+		self._data_size = ctypes.sizeof(self._cvar)
+		self._max_size  = self._data_size
+		self.update(initval)
+
+		self._watcher = None
+		if oidstr:
+			self._register(agent, oidstr, writable, context, callback)
+
+	def value(self):
+		# Get boolean representation of TruthValue.
+		return True if self._cvar.value == TV_TRUE else False
+
+	def cref(self, **kwargs):
+		return ctypes.byref(self._cvar)
+
+	def update(self, val):
+		# Convert boolean to corresponding integer values
+		if isinstance(val, bool):
+			self._cvar.value = TV_TRUE if val == True else TV_FALSE
+		else:
+			raise netsnmpAgentException("TruthValue must be True or False")
+_TruthValue.__name__ = "TruthValue"
+
+def _rowIndexOID(row):
+	""" Returns the index OID of the netsnmp_table_row "row" as a tuple. """
+
+	return tuple(row.contents.index_oid[:row.contents.index_oid_len])
+
+def _oidParts(agent, val):
+	""" Returns the list of sub-identifiers of the OID "val", which may be
+	    given in dot notation or symbolically, in which case it gets
+	    resolved through "agent". """
+
+	try:
+		return [int(x) for x in val.strip(".").split(".")]
+	except ValueError:
+		oid, oid_len = agent.determine_oid_and_length(val)
+		return oid[:oid_len.value]
+
+def _encodeIndex(agent, idxobjs, values):
+	""" Encodes the index values "values" into an index OID tuple according
+	    to the types of the SNMP objects in "idxobjs". OBJECT IDENTIFIER
+	    values may be given symbolically, in which case they get resolved
+	    through "agent". """
+
+	indexoid = []
+	for idxobj, val in zip(idxobjs, values):
+		if idxobj._asntype == ASN_OCTET_STR:
+			octets = bytearray(b(val))
+			indexoid.append(len(octets))
+			indexoid.extend(octets)
+		elif idxobj._asntype == ASN_OBJECT_ID:
+			parts = _oidParts(agent, val)
+			indexoid.append(len(parts))
+			indexoid.extend(parts)
+		elif idxobj._asntype == ASN_IPADDRESS:
+			indexoid.extend(int(x) for x in val.split("."))
+		else:
+			indexoid.append(int(val))
+	return tuple(indexoid)
+
+def _decodeIndex(agent, idxobjs, indexoid):
+	""" Decodes the index OID tuple "indexoid" into a tuple of index values
+	    according to the types of the SNMP objects in "idxobjs", without
+	    the MIB.
+
+	    OCTET STRING values that can't be decoded are returned in dot
+	    notation, eg. "255.0.1". OBJECT IDENTIFIER values are returned by
+	    name if "agent" knows one, otherwise in dot notation. """
+
+	values = []
+	pos = 0
+	for idxobj in idxobjs:
+		if idxobj._asntype == ASN_OCTET_STR:
+			length = indexoid[pos]
+			octets = indexoid[pos + 1:pos + 1 + length]
+			try:
+				values.append(u(struct.pack("{0}B".format(length), *octets)))
+			except UnicodeDecodeError:
+				values.append(".".join(str(x) for x in octets))
+			pos += 1 + length
+		elif idxobj._asntype == ASN_OBJECT_ID:
+			length = indexoid[pos]
+			subids = indexoid[pos + 1:pos + 1 + length]
+			name   = agent._oidName(subids)
+			values.append(name if name is not None else ".".join(
+				str(x) for x in subids
+			))
+			pos += 1 + length
+		elif idxobj._asntype == ASN_IPADDRESS:
+			values.append(".".join(str(x) for x in indexoid[pos:pos + 4]))
+			pos += 4
+		else:
+			values.append(int(indexoid[pos]))
+			pos += 1
+	return tuple(values)
+
+def _packInteger(val):
+	# Booleans are stored as TruthValues
+	if isinstance(val, bool):
+		val = TV_TRUE if val else TV_FALSE
+	return struct.pack("l", val)
+
+def _packObjectIdentifier(agent, val):
+	parts = _oidParts(agent, val)
+	oid = (c_oid * len(parts))(*parts)
+	return ctypes.string_at(oid, ctypes.sizeof(oid))
+
+# Functions converting plain Python values to the C representation of table
+# cells of the respective ASN type, as done by the SNMP object classes.
+# OBJECT IDENTIFIERs may be given symbolically, so they get converted by
+# _packObjectIdentifier() with the agent to resolve them through instead.
+_cellPackers = {
+	ASN_INTEGER:        _packInteger,
+	ASN_UNSIGNED:       lambda val: struct.pack("L", val),
+	ASN_COUNTER:        lambda val: struct.pack("L", val & 0xFFFFFFFF),
+	ASN_COUNTER64:      lambda val: struct.pack(
+	                        "LL",
+	                        (val >> 32) & 0xFFFFFFFF,
+	                        val & 0xFFFFFFFF
+	                    ),
+	ASN_TIMETICKS:      lambda val: struct.pack("L", val),
+	ASN_OPAQUE_FLOAT:   lambda val: struct.pack("f", val),
+	ASN_OPAQUE_DOUBLE:  lambda val: struct.pack("d", val),
+	ASN_OCTET_STR:      b,
+	ASN_IPADDRESS:      socket.inet_aton,
+}
+
+# The ASN types whose C representation has a fixed size, allowing table cells
+# to be updated in place
+_fixedSizeTypes = frozenset([
+	ASN_INTEGER, ASN_UNSIGNED, ASN_COUNTER, ASN_COUNTER64, ASN_TIMETICKS,
+	ASN_IPADDRESS, ASN_OPAQUE_FLOAT, ASN_OPAQUE_DOUBLE
+])
+
+# Clock used for table row expiry. time.monotonic() is not available with
+# Python 2.x.
+_monotonic = getattr(time, "monotonic", time.time)
+
+# Tie breaker for the entries in the tables' expiry heaps
+_expirySequence = itertools.count()
+
+# Source of the change generations of registered SNMP objects, see
+# netsnmpAgent.changedSince()
+_generations = itertools.count(1)
+
+def _rawCellValue(asntype, raw):
+	""" Returns the Python value of the C representation "raw" of a table
+	    cell of type "asntype", as _storageValue() would. """
+
+	if asntype == ASN_OCTET_STR:
+		return u(raw)
+	elif asntype == ASN_COUNTER64:
+		high, low = struct.unpack("LL", raw)
+		return high << 32 | low
+	elif asntype == ASN_IPADDRESS:
+		return socket.inet_ntoa(raw)
+	else:
+		size = struct.calcsize("l")
+		return struct.unpack("l", raw[:size].ljust(size, b"\0"))[0]
+
+# The SET phases _Table._followSets() has to act upon
+_followedSetModes = frozenset([
+	MODE_SET_RESERVE1, MODE_SET_COMMIT, MODE_SET_FREE, MODE_SET_UNDO
+])
+
+def _rowUsage(row):
+	""" Returns a (rows, cells, bytes) tuple with the number of rows (zero
+	    if "row" is a NULL pointer, one otherwise) and cells and the
+	    approximate number of bytes of C memory used by the netsnmp_table_row
+	    "row". """
+
+	if not bool(row):
+		return 0, 0, 0
+
+	nbytes = ctypes.sizeof(netsnmp_table_row) \
+	       + row.contents.index_oid_len * ctypes.sizeof(c_oid)
+	var = row.contents.indexes
+	while bool(var):
+		nbytes += ctypes.sizeof(netsnmp_variable_list)
+		var = var.contents.next_variable
+
+	cells = 0
+	data = ctypes.cast(row.contents.data, netsnmp_table_data_set_storage_p)
+	while bool(data):
+		cells  += 1
+		nbytes += ctypes.sizeof(netsnmp_table_data_set_storage) + data.contents.data_len
+		data    = data.contents.next
+
+	return 1, cells, nbytes
+
+def _storageValue(storage):
+	""" Returns the Python value stored in the netsnmp_table_data_set_storage
+	    structure "storage". """
+
+	if storage.type == ASN_OCTET_STR:
+		return u(ctypes.string_at(storage.data.string, storage.data_len))
+	elif storage.type == ASN_COUNTER64:
+		return storage.data.counter64.contents.value
+	elif storage.type == ASN_IPADDRESS:
+		uint_value = ctypes.cast((ctypes.c_int*1)(
+			storage.data.integer.contents.value),
+			ctypes.POINTER(ctypes.c_uint)
+			).contents.value
+		return socket.inet_ntoa(struct.pack("I", uint_value))
+	else:
+		return storage.data.integer.contents.value
+
+class _Table(object):
+	__slots__ = (
+		"_dataset", "_handler_reginfo", "_callback_handler", "_counterobj",
+		"_rows", "_rowsByOID", "_foreignRows", "_agent", "_idxobjs", "_indexcache", "_shadow",
+		"_rebuild", "_coltypes", "_rowTTL", "_expiry", "_mirror",
+		"_mirrorColumns", "_mirrorDefaults", "_setHandler", "_setPending",
+		"_setSuspended",
+		"_numRows", "_numCells", "_numBytes", "_generation"
+	)
+
+	def __init__(self, agent, oidstr, idxobjs, coldefs, counterobj, extendable, context, callback, rowTTL, mirror):
+		self._agent      = agent
+		self._idxobjs    = tuple(idxobjs)
+		self._generation = next(_generations)
+
+		if rowTTL is not None and rowTTL <= 0:
+			raise netsnmpAgentException(
+				"Invalid row TTL {0}, must be positive!".format(rowTTL)
+			)
+
+		# Rows get expired by a net-snmp alarm, whose callback must not be
+		# run from within a signal handler
+		if rowTTL is not None and agent.AlarmSignals:
+			raise netsnmpAgentException(
+				"Tables with a row TTL require an agent created with "
+				"AlarmSignals=False!"
+			)
+
+		# Create a netsnmp_table_data_set structure, representing both
+		# the table definition and the data stored inside it. We use the
+		# oidstr as table name.
+		self._dataset = libnsX.netsnmp_create_table_data_set(
+			ctypes.c_char_p(b(oidstr))
+		)
+
+		# Define the table row's indexes
+		for idxobj in idxobjs:
+			libnsX.netsnmp_table_dataset_add_index(
+				self._dataset,
+				idxobj._asntype
+			)
+
+		# Define the table's columns and their default values
+		for coldef in coldefs:
+			colno    = coldef[0]
+			defobj   = coldef[1]
+			writable = coldef[2] if len(coldef) > 2 \
+			                     else 0
+
+			result = libnsX.netsnmp_table_set_add_default_row(
+				self._dataset,
+				colno,
+				defobj._asntype,
+				writable,
+				defobj.cref(),
+				defobj._data_size
+			)
+			if result != SNMPERR_SUCCESS:
+				raise netsnmpAgentException(
+					"netsnmp_table_set_add_default_row() failed with "
+					"error code {0}!".format(result)
+				)
+
+		# Remember the columns' types for TableRow.setCells()
+		self._coltypes = {}
+		col = self._dataset.contents.default_row
+		while bool(col):
+			self._coltypes[int(col.contents.column)] = col.contents.type
+			col = col.contents.next
+
+		# If "mirror" was specified, we keep a copy of the table's contents
+		# in Python dictionaries, mapping row indexes as returned by value()
+		# to dictionaries of cell values, so that reads don't have to decode
+		# C memory. "mirror" may be True to mirror all columns or, to save
+		# memory, a sequence of the column numbers to mirror. Each TableRow
+		# holds a reference to its own cells' dictionary, in which bound
+		# cells are represented by their SNMP objects. Reads still follow
+		# net-snmp's row list, so rows come in index order either way.
+		self._mirror         = None
+		self._mirrorColumns  = None
+		self._mirrorDefaults = None
+		if mirror:
+			self._mirror = {}
+			if mirror is not True:
+				self._mirrorColumns = frozenset(mirror)
+			self._mirrorDefaults = self._storageCells(
+				self._dataset.contents.default_row,
+				self._mirrorColumns
+			)
+
+		self._callback_handler = None
+		if callback != None:
+			# We defined a Python function that needs a ctypes conversion so it can
+			# be called by C code such as net-snmp. That's what SNMPNodeHandler() is
+			# used for. However we also need to store the reference in "self" as it
+			# will otherwise be lost at the exit of this function so that net-snmp's
+			# attempt to call it would end in nirvana...
+			self._callback_handler = _build_callback_handler(callback)
+
+		# Register handler and table_data_set with net-snmp.
+		self._handler_reginfo = agent._prepareRegistration(oidstr, extendable)
+		self._handler_reginfo.contents.contextName = b(context)
+		result = libnsX.netsnmp_register_table_data_set(
+			self._handler_reginfo,
+			self._dataset,
+			None
+		)
+		if result != SNMP_ERR_NOERROR:
+			raise netsnmpAgentException(
+				"Error code {0} while registering table with "
+				"net-snmp!".format(result)
+			)
+
+		# The number of rows and cells and the approximate number of bytes
+		# of C memory they use, see memoryUsage()
+		self._numRows  = 0
+		self._numCells = 0
+		self._numBytes = 0
+
+		# SNMP SETs on writable or extendable tables may change rows behind
+		# our back, so our memory accounting and the mirror need a handler
+		# of their own. Other tables don't, which saves their GETs a trip
+		# through Python. It must come after the custom callback handler,
+		# which we thus inject afterwards.
+		self._setHandler   = None
+		self._setPending   = None
+		self._setSuspended = None
+		if extendable \
+		or any(len(coldef) > 2 and coldef[2] for coldef in coldefs):
+			self._setHandler = SNMPNodeHandler(self._followSets)
+			_inject_custom_handler(self._setHandler, self._handler_reginfo)
+
+		if self._callback_handler is not None:
+			_inject_custom_handler(self._callback_handler, self._handler_reginfo)
+
+		# Finally, we keep track of all registered SNMP objects for the
+		# getRegistered() method.
+		agent._objs[context].add(_reginfoOID(self._handler_reginfo), oidstr, self)
+
+		# If "counterobj" was specified, use it to track the number
+		# of table rows
+		if counterobj:
+			counterobj.update(0)
+		self._counterobj = counterobj
+
+		# Maps the rows' index values to their TableRow objects
+		self._rows = {}
+
+		# Maps the rows' index OIDs to their TableRow objects, so SNMP SETs
+		# can be related to them
+		self._rowsByOID = {}
+
+		# The index OIDs of the rows created through SNMP SETs, which have
+		# no TableRow objects and get replaced by rows added from Python
+		self._foreignRows = set()
+
+		# Maps the rows' index OIDs to their decoded representation as
+		# returned by value() and iterRows()
+		self._indexcache = {}
+
+		# The second netsnmp_table_data_set used by beginRebuild(), created
+		# on first use, and the TableRebuild object currently using it
+		self._shadow  = None
+		self._rebuild = None
+
+		# If "rowTTL" was specified, rows not touched for that many seconds
+		# get removed. "_expiry" is a heap of (deadline, sequence, TableRow)
+		# tuples, one for each row added, holding the deadline the row had
+		# at the time. The row's current deadline may have been moved on by
+		# touch() since, which we'll notice when the entry comes up.
+		self._rowTTL = rowTTL
+		self._expiry = None
+		if rowTTL is not None:
+			self._expiry = []
+			agent._expiryTables.append(self)
+
+	@staticmethod
+	def _rowKey(idx):
+		""" Returns the key identifying a row in "_rows" for "idx", which
+		    may be a list of SNMP objects as passed to addRow(), a tuple of
+		    their values or, for single-index tables, the value itself. """
+
+		if not isinstance(idx, (list, tuple)):
+			idx = (idx,)
+		return tuple(
+			i.value() if isinstance(i, _SNMPObject) else i for i in idx
+		)
+
+	def addRow(self, idxobjs):
+		""" Adds a row with the index values given by the SNMP objects in
+		    "idxobjs". An existing row with the same index values gets
+		    replaced. Returns the new row's TableRow object. """
+
+		key = self._rowKey(idxobjs)
+		if key in self._rows:
+			self.removeRow(key)
+
+		row = _TableRow(self._dataset, idxobjs, key, self)
+
+		# netsnmp_table_dataset_add_row() refuses rows whose index OID is
+		# already taken, which rows created through SNMP SETs may do
+		if self._foreignRows:
+			libnsX.netsnmp_table_data_generate_index_oid(row._table_row)
+			self._removeForeignRow(_rowIndexOID(row._table_row))
+
+		libnsX.netsnmp_table_dataset_add_row(
+			self._dataset,  # *table
+			row._table_row  # row
+		)
+		indexoid = _rowIndexOID(row._table_row)
+		self._rows[key] = row
+		self._rowsByOID[indexoid] = row
+		self._account(*_rowUsage(row._table_row))
+		self._generation = next(_generations)
+		if self._mirror is not None:
+			self._mirror[self._decodeRowIndex(row._table_row)] = row._mirror
+
+		if self._expiry is not None:
+			heapq.heappush(self._expiry, (row._expires, next(_expirySequence), row))
+			self._agent._scheduleExpiry(row._expires)
+
+		if self._counterobj:
+			self._counterobj.update(self._counterobj.value() + 1)
+
+		return row
+
+	def addRows(self, rows):
+		""" Adds many rows at once. "rows" is an iterable of (idxobjs,
+		    cells) tuples, "idxobjs" being a list of SNMP objects as passed
+		    to addRow() and "cells" a dictionary mapping column numbers to
+		    SNMP objects as passed to TableRow.setRowCell(). Existing rows
+		    with the same index values get replaced, as with addRow().
+
+		    Unlike repeated addRow() calls, whose insertion into the table's
+		    sorted row list takes linear time each, the new rows are sorted
+		    once and then linked into the list in order, which makes loading
+		    large tables much faster. Returns a list of the new rows'
+		    TableRow objects, in index order. """
+
+		newrows = self._createRows(self._dataset, rows)
+		for row in newrows:
+			if row._key in self._rows:
+				self.removeRow(row._key)
+			if self._foreignRows:
+				self._removeForeignRow(_rowIndexOID(row._table_row))
+		self._linkRows(self._dataset, newrows)
+		for row in newrows:
+			self._rows[row._key] = row
+			self._rowsByOID[_rowIndexOID(row._table_row)] = row
+			self._account(*_rowUsage(row._table_row))
+		self._generation = next(_generations)
+		if self._mirror is not None:
+			buffers = self._indexBuffers()
+			for row in newrows:
+				self._mirror[self._decodeRowIndex(row._table_row, buffers)] = row._mirror
+
+		if self._expiry is not None and newrows:
+			for row in newrows:
+				heapq.heappush(self._expiry, (row._expires, next(_expirySequence), row))
+			self._agent._scheduleExpiry(self._expiry[0][0])
+
+		if self._counterobj:
+			self._counterobj.update(len(self._rows))
+
+		return newrows
+
+	def _createRows(self, dataset, rows):
+		""" Creates the rows "rows" as passed to addRows() for "dataset"
+		    without adding them to it yet. Returns their TableRow objects
+		    sorted by index OID. """
+
+		cellsbykey = {}
+		for idxobjs, cells in rows:
+			cellsbykey[self._rowKey(idxobjs)] = (idxobjs, cells)
+
+		newrows = []
+		for key, (idxobjs, cells) in cellsbykey.items():
+			row = _TableRow(dataset, idxobjs, key, self)
+			libnsX.netsnmp_table_data_generate_index_oid(row._table_row)
+			for column, snmpobj in cells.items():
+				row.setRowCell(column, snmpobj)
+			newrows.append((_rowIndexOID(row._table_row), row))
+
+		newrows.sort(key=lambda entry: entry[0])
+		return [row for indexoid, row in newrows]
+
+	@staticmethod
+	def _linkRows(dataset, newrows):
+		""" Links the TableRow objects "newrows", sorted by index OID and
+		    with their index OIDs generated, into the row list of "dataset",
+		    doing what netsnmp_table_dataset_add_row() would do. Rows sorting
+		    after the current last row, the common case, get appended in
+		    constant time. Others are inserted searching forward from the
+		    previously inserted row, so all rows get linked in one pass. """
+
+		table = dataset.contents.table.contents
+		last = ctypes.cast(table.last_row, netsnmp_table_row_p)
+		lastoid = _rowIndexOID(last) if bool(last) else None
+		cursor = None
+
+		for newrow in newrows:
+			row = newrow._table_row
+			indexoid = _rowIndexOID(row)
+
+			if lastoid is None or indexoid > lastoid:
+				row.contents.prev = last
+				row.contents.next = None
+				if bool(last):
+					last.contents.next = row
+				else:
+					table.first_row = row
+				table.last_row = row
+				last = cursor = row
+				lastoid = indexoid
+				continue
+
+			# Find the first row sorting after the new one
+			if cursor is None:
+				after = ctypes.cast(table.first_row, netsnmp_table_row_p)
+			else:
+				after = ctypes.cast(cursor.contents.next, netsnmp_table_row_p)
+			while _rowIndexOID(after) < indexoid:
+				after = ctypes.cast(after.contents.next, netsnmp_table_row_p)
+
+			prev = ctypes.cast(after.contents.prev, netsnmp_table_row_p)
+			if bool(prev):
+				prev.contents.next = row
+			else:
+				table.first_row = row
+			row.contents.prev = prev
+			row.contents.next = after
+			after.contents.prev = row
+			cursor = row
+
+	def getRow(self, idx):
+		""" Returns the TableRow object for the row with the index values
+		    "idx" or None if there is no such row. """
+
+		return self._rows.get(self._rowKey(idx))
+
+	def removeRow(self, idx):
+		""" Removes the row with the index values "idx". """
+
+		row = self._rows.pop(self._rowKey(idx), None)
+		if row is None:
+			raise netsnmpAgentException(
+				"No table row with index {0}!".format(idx)
+			)
+
+		table_row = row._table_row
+		indexoid = _rowIndexOID(table_row)
+		if self._mirror is not None:
+			self._mirror.pop(self._decodeRowIndex(table_row), None)
+		self._indexcache.pop(indexoid, None)
+		self._rowsByOID.pop(indexoid, None)
+		row._detach()
+		self._account(*[-n for n in _rowUsage(table_row)])
+		self._generation = next(_generations)
+		libnsX.netsnmp_table_dataset_remove_and_delete_row(
+			self._dataset,
+			table_row
+		)
+
+		if self._counterobj:
+			self._counterobj.update(self._counterobj.value() - 1)
+
+	def _removeForeignRow(self, indexoid):
+		""" Removes the row with the index OID "indexoid" if it was created
+		    through an SNMP SET and thus has no TableRow object. """
+
+		if indexoid not in self._foreignRows:
+			return
+		self._foreignRows.discard(indexoid)
+		row = self._findRow(indexoid)
+		if not bool(row):
+			return
+
+		if self._mirror is not None:
+			self._mirror.pop(self._decodeIndexOID(indexoid), None)
+		self._indexcache.pop(indexoid, None)
+		self._account(*[-n for n in _rowUsage(row)])
+		libnsX.netsnmp_table_dataset_remove_and_delete_row(
+			self._dataset,
+			row
+		)
+
+	def _createIndexObjects(self, key):
+		""" Creates SNMP objects for the row index values "key" as required
+		    by addRow(), using the table's index objects as templates. """
+
+		if len(key) != len(self._idxobjs):
+			raise netsnmpAgentException(
+				"Table row index {0} does not match the table's {1} "
+				"index(es)!".format(key, len(self._idxobjs))
+			)
+		return [
+			type(idxobj)(self._agent, val, None, False, "", None)
+			for idxobj, val in zip(self._idxobjs, key)
+		]
+
+	def sync(self, rows):
+		""" Makes the table's contents match the snapshot "rows", a
+		    dictionary (or an iterable of tuples) mapping row index values to
+		    dictionaries that map column numbers to SNMP objects.
+
+		    Instead of clear()ing the table and adding everything again, only
+		    rows not in "rows" are removed, only new rows are added and only
+		    cells whose values changed are set. Rows added through SNMP SETs
+		    are left alone unless "rows" has rows with the same index
+		    values, which replace them.
+
+		    Returns a dictionary with the number of rows "added" and
+		    "removed" and the number of cells "set" and "skipped", the
+		    latter being the cell updates saved. Cells of rows changed
+		    through SNMP SETs since are set again. """
+
+		if hasattr(rows, "items"):
+			rows = rows.items()
+
+		stats = { "added": 0, "removed": 0, "set": 0, "skipped": 0 }
+
+		desired = {}
+		for idx, cells in rows:
+			desired[self._rowKey(idx)] = cells
+
+		for key in [key for key in self._rows if key not in desired]:
+			self.removeRow(key)
+			stats["removed"] += 1
+
+		for key, cells in desired.items():
+			row = self._rows.get(key)
+			if row is None:
+				row = self.addRow(self._createIndexObjects(key))
+				stats["added"] += 1
+
+			for column, snmpobj in cells.items():
+				if row._holds(column, snmpobj._asntype, _getRawValue(snmpobj)):
+					stats["skipped"] += 1
+				else:
+					row.setRowCell(column, snmpobj)
+					stats["set"] += 1
+
+		return stats
+
+	def updateRow(self, idx, cells):
+		""" Sets the cells of the row with the index values "idx" from the
+		    dictionary "cells" mapping column numbers to SNMP objects.
+		    Returns the row's TableRow object. """
+
+		row = self._rows.get(self._rowKey(idx))
+		if row is None:
+			raise netsnmpAgentException(
+				"No table row with index {0}!".format(idx)
+			)
+
+		for column, snmpobj in cells.items():
+			row.setRowCell(column, snmpobj)
+
+		return row
+
+	def value(self):
+		# Because tables are more complex than scalar variables, we
+		# return a dictionary representing the table's structure and
+		# contents instead of a simple string.
+		retdict = {}
+
+		# The first entry will contain the defined columns, their types
+		# and their defaults, if set. We use array index 0 since it's
+		# impossible for SNMP tables to have a row with that index.
+		retdict[0] = {}
+		col = self._dataset.contents.default_row
+		while bool(col):
+			retdict[0][int(col.contents.column)] = {}
+
+			asntypes = {
+				ASN_INTEGER:    "Integer",
+				ASN_OBJECT_ID:  "ObjectIdentifier",
+				ASN_OCTET_STR:  "OctetString",
+				ASN_IPADDRESS:  "IPAddress",
+				ASN_COUNTER:    "Counter32",
+				ASN_COUNTER64:  "Counter64",
+				ASN_UNSIGNED:   "Unsigned32",
+				ASN_TIMETICKS:  "TimeTicks"
+			}
+			retdict[0][int(col.contents.column)]["type"] = asntypes[col.contents.type]
+			if bool(col.contents.data):
+				if col.contents.type == ASN_OCTET_STR:
+					retdict[0][int(col.contents.column)]["value"] = u(ctypes.string_at(col.contents.data.string, col.contents.data_len))
+				elif col.contents.type == ASN_IPADDRESS:
+					uint_value = ctypes.cast(
+						(ctypes.c_int*1)(col.contents.data.integer.contents.value),
+						ctypes.POINTER(ctypes.c_uint)
+					).contents.value
+					retdict[0][int(col.contents.column)]["value"] = socket.inet_ntoa(struct.pack("I", uint_value))
+				else:
+					retdict[0][int(col.contents.column)]["value"] = col.contents.data.integer.contents.value
+			col = col.contents.next
+
+		# Next we iterate over the table's rows, creating a dictionary
+		# entry for each row after that row's index.
+		for indices, cells in self.iterRows():
+			retdict[indices] = cells
+
+		return retdict
+
+	def iterRows(self, columns = None):
+		""" Generator yielding an (index, cells) tuple for every table row,
+		    "cells" being a dictionary mapping column numbers to values.
+
+		    Unlike value(), rows are decoded lazily, one at a time, and
+		    "columns" may be given as a sequence of column numbers to limit
+		    the cells decoded to these columns. The current row may be
+		    removed while iterating, other modifications should be avoided. """
+
+		if columns is not None:
+			columns = frozenset(columns)
+
+		# Take the cells from the mirror if it holds all columns asked for.
+		# The rows themselves still come from net-snmp's row list, so they
+		# are in index order with or without a mirror.
+		mirror = None
+		if self._mirror is not None \
+		and (self._mirrorColumns is None
+		     or (columns is not None and columns <= self._mirrorColumns)):
+			mirror = self._mirror
+
+		buffers = self._indexBuffers()
+
+		row = ctypes.cast(self._dataset.contents.table.contents.first_row, netsnmp_table_row_p)
+		while bool(row):
+			# Copied, as the current row may get removed and freed
+			nextrow = ctypes.cast(row.contents.next, netsnmp_table_row_p)
+
+			indices = self._decodeRowIndex(row, buffers)
+			cells = mirror.get(indices) if mirror is not None else None
+			if cells is not None:
+				yield indices, self._mirroredValues(cells, columns)
+			else:
+				yield indices, self._storageCells(row.contents.data, columns)
+
+			row = nextrow
+
+	@staticmethod
+	def _mirroredValues(cells, columns = None):
+		""" Returns a copy of the mirrored "cells" of a row, optionally
+		    limited to the column numbers in the set "columns". Bound cells
+		    are mirrored as the SNMP objects they are bound to, whose
+		    current values are returned. """
+
+		return dict(
+			(column, val.value() if isinstance(val, _SNMPObject) else val)
+			for column, val in cells.items()
+			if columns is None or column in columns
+		)
+
+	@staticmethod
+	def _storageCells(data, columns = None):
+		""" Returns a dictionary mapping the column numbers of the cells in
+		    the list of netsnmp_table_data_set_storage structures "data"
+		    that hold data to their values, optionally limited to the column
+		    numbers in the set "columns". """
+
+		cells = {}
+		data = ctypes.cast(data, ctypes.POINTER(netsnmp_table_data_set_storage))
+		while bool(data):
+			column = int(data.contents.column)
+			if bool(data.contents.data) \
+			and (columns is None or column in columns):
+				cells[column] = _storageValue(data.contents)
+			data = data.contents.next
+		return cells
+
+	def _indexBuffers(self):
+		""" Returns the (fulloid, rootoidlen, oidcstr) tuple of buffers
+		    required by _printRowIndex(). """
+
+		# snprint_objid() requires a _full_ OID whereas the table row
+		# contains only the current row's identifer. Unfortunately,
+		# net-snmp does not have a ready function to get the full OID.
+		# The following code was modelled after similar code in
+		# netsnmp_table_data_build_result(). We set up the part common to
+		# all rows once so the buffers can be reused.
+		fulloid = (c_oid * MAX_OID_LEN)()
+		oidcstr = ctypes.create_string_buffer(MAX_OID_LEN)
+
+		# Registered OID
+		rootoidlen = self._handler_reginfo.contents.rootoid_len
+		for i in range(0, rootoidlen):
+			fulloid[i] = self._handler_reginfo.contents.rootoid[i]
+
+		# Entry
+		fulloid[rootoidlen] = 1
+
+		# Fake the column number. Unlike the table_data and
+		# table_data_set handlers, we do not have one here. No
+		# biggie, using a fixed value will do for our purposes as
+		# we'll do away with anything left of the first dot below.
+		fulloid[rootoidlen + 1] = 2
+
+		return fulloid, rootoidlen, oidcstr
+
+	def _decodeRowIndex(self, row, buffers = None):
+		""" Returns the index of the netsnmp_table_row "row" as shown by
+		    "snmptable". "buffers" optionally are the buffers returned by
+		    _indexBuffers(), to be reused across calls.
+
+		    Row indexes never change, so the result is cached. """
+
+		return self._decodeIndexOID(_rowIndexOID(row), buffers)
+
+	def _decodeIndexOID(self, indexoid, buffers = None):
+		""" Returns the row index for the index OID "indexoid", see
+		    _decodeRowIndex(). """
+
+		indices = self._indexcache.get(indexoid)
+		if indices is None:
+			if self._agent.UseMIBFiles:
+				if buffers is None:
+					buffers = self._indexBuffers()
+				fulloid, rootoidlen, oidcstr = buffers
+				indices = self._printRowIndex(indexoid, fulloid, rootoidlen, oidcstr)
+			else:
+				indices = self._parseRowIndex(indexoid)
+			self._indexcache[indexoid] = indices
+		return indices
+
+	def _printRowIndex(self, indexoid, fulloid, rootoidlen, oidcstr):
+		""" Converts the row index OID "indexoid" through the MIB. """
+
+		# We want to return the row index in the same way it is
+		# shown when using "snmptable", eg. "aa" instead of 2.97.97.
+		# This conversion is actually quite complicated (see
+		# net-snmp's sprint_realloc_objid() in snmplib/mib.c and
+		# get*_table_entries() in apps/snmptable.c for details).
+		# All code below assumes eg. that the OID output format was
+		# not changed.
+
+		# Index data
+		indexoidlen = len(indexoid)
+		for i in range(0, indexoidlen):
+			fulloid[rootoidlen + 2 + i] = indexoid[i]
+
+		# Convert the full OID to its string representation
+		libnsa.snprint_objid(
+			oidcstr,
+			MAX_OID_LEN,
+			fulloid,
+			rootoidlen + 2 + indexoidlen
+		)
+
+		# And finally do away with anything left of the first dot
+		# so we keep the row index only
+		indices = oidcstr.value.split(b".", 1)[1]
+
+		# If it's a string, remove the double quotes. If it's a
+		# string containing an integer, make it one
+		try:
+			indices = int(indices)
+		except ValueError:
+			indices = u(indices.replace(b'"', b''))
+
+		return indices
+
+	def _parseRowIndex(self, indexoid):
+		""" Converts the row index OID "indexoid" without the MIB, based on
+		    the types of the table's indexes, into the same representation
+		    _printRowIndex() would return. """
+
+		indices = ".".join(
+			str(x) for x in _decodeIndex(self._agent, self._idxobjs, indexoid)
+		)
+		try:
+			indices = int(indices)
+		except ValueError:
+			pass
+
+		return indices
+
+	def beginRebuild(self):
+		""" Starts rebuilding the table's contents off to the side. Returns a
+		    TableRebuild object whose addRow() method works like ours but
+		    adds rows to a second, unregistered data set. Until its commit()
+		    method is called, SNMP requests keep seeing the current rows;
+		    commit() then swaps in all new rows at once and frees the old
+		    ones, so clients never see a partially populated table.
+
+		    Both data sets are owned by the table and reused by subsequent
+		    rebuilds, so starting a new rebuild aborts an unfinished one.
+		    commit() must be called from the thread processing SNMP requests
+		    (ie. between check_and_process() calls). """
+
+		if self._rebuild is not None:
+			self._rebuild.abort()
+		if self._shadow is None:
+			self._shadow = self._createShadowDataset()
+		self._rebuild = _TableRebuild(self, self._shadow)
+		return self._rebuild
+
+	def _createShadowDataset(self):
+		""" Creates a netsnmp_table_data_set with the same indexes and
+		    default row as the registered one. """
+
+		dataset = libnsX.netsnmp_create_table_data_set(
+			self._dataset.contents.table.contents.name
+		)
+		for idxobj in self._idxobjs:
+			libnsX.netsnmp_table_dataset_add_index(
+				dataset,
+				idxobj._asntype
+			)
+
+		col = self._dataset.contents.default_row
+		while bool(col):
+			result = libnsX.netsnmp_table_set_add_default_row(
+				dataset,
+				col.contents.column,
+				col.contents.type,
+				col.contents.writable,
+				col.contents.data.voidp,
+				col.contents.data_len
+			)
+			if result != SNMPERR_SUCCESS:
+				raise netsnmpAgentException(
+					"netsnmp_table_set_add_default_row() failed with "
+					"error code {0}!".format(result)
+				)
+			col = col.contents.next
+
+		return dataset
+
+	def _commitRebuild(self, rebuild):
+		""" Swaps the rows of the registered data set with those added to
+		    the shadow data set through "rebuild", then frees the old rows. """
+
+		# The handlers registered by netsnmp_register_table_data_set() hold
+		# pointers to our netsnmp_table_data_set and its netsnmp_table_data,
+		# so instead of replacing these we exchange the row lists they point
+		# to. Note that ctypes pointer fields read from a structure share its
+		# memory, hence the detour through plain addresses.
+		live = self._dataset.contents.table.contents
+		shadow = rebuild._dataset.contents.table.contents
+		first_row = ctypes.cast(live.first_row, ctypes.c_void_p).value
+		last_row  = ctypes.cast(live.last_row, ctypes.c_void_p).value
+		live.first_row   = shadow.first_row
+		live.last_row    = shadow.last_row
+		shadow.first_row = ctypes.cast(first_row, netsnmp_table_row_p)
+		shadow.last_row  = ctypes.cast(last_row, netsnmp_table_row_p)
+
+		# The old rows now belong to the shadow data set
+		for tablerow in self._rows.values():
+			tablerow._detach()
+		self._clearDataset(rebuild._dataset)
+		self._rows = rebuild._rows
+		self._rowsByOID = dict(
+			(_rowIndexOID(row._table_row), row) for row in self._rows.values()
+		)
+		self._foreignRows = set()
+		self._indexcache = {}
+		self._generation = next(_generations)
+		self._numRows = self._numCells = self._numBytes = 0
+		for row in self._rows.values():
+			self._account(*_rowUsage(row._table_row))
+		if self._mirror is not None:
+			buffers = self._indexBuffers()
+			self._mirror = dict(
+				(self._decodeRowIndex(row._table_row, buffers), row._mirror)
+				for row in self._rows.values()
+			)
+		if self._expiry is not None:
+			self._expiry = [
+				(row._expires, next(_expirySequence), row)
+				for row in self._rows.values()
+			]
+			heapq.heapify(self._expiry)
+			if self._expiry:
+				self._agent._scheduleExpiry(self._expiry[0][0])
+		if self._counterobj:
+			self._counterobj.update(len(self._rows))
+
+	@staticmethod
+	def _clearDataset(dataset):
+		""" Removes and frees all rows of the netsnmp_table_data_set
+		    "dataset". """
+
+		# ctypes pointers read from a structure share its memory, so we copy
+		# them before the row they live in gets freed
+		row = ctypes.cast(dataset.contents.table.contents.first_row, netsnmp_table_row_p)
+		while bool(row):
+			nextrow = ctypes.cast(row.contents.next, netsnmp_table_row_p)
+			libnsX.netsnmp_table_dataset_remove_and_delete_row(
+				dataset,
+				row
+			)
+			row = nextrow
+
+	def rowValue(self, indices):
+		""" Returns a dictionary mapping column numbers to values for the
+		    row with the index "indices", given as in the dictionary returned
+		    by value(), or None if there is no such row. With a mirror of all
+		    columns, this is a dictionary lookup. """
+
+		if self._mirror is not None and self._mirrorColumns is None:
+			cells = self._mirror.get(indices)
+			return self._mirroredValues(cells) if cells is not None else None
+
+		for rowindices, cells in self.iterRows():
+			if rowindices == indices:
+				return cells
+		return None
+
+	def memoryUsage(self):
+		""" Returns a dictionary with the number of "rows" and "cells" in
+		    the table and the approximate number of "bytes" of C memory
+		    they use. The numbers are maintained as rows and cells get
+		    added, changed and removed, so this is cheap to call. """
+
+		return {
+			"rows":  self._numRows,
+			"cells": self._numCells,
+			"bytes": self._numBytes
+		}
+
+	def _changeGeneration(self, current):
+		""" Returns the generation of the table's last change. Changes of
+		    bound cells are not tracked. """
+
+		return self._generation
+
+	def _account(self, rows, cells, nbytes):
+		""" Adds to the numbers returned by memoryUsage(). """
+
+		self._numRows  += rows
+		self._numCells += cells
+		self._numBytes += nbytes
+
+	def _followSets(self, handler, reginfo, reqinfo, requests):
+		""" net-snmp handler accounting for and mirroring the rows changed
+		    by SNMP SETs, after the table_data_set handler has done its
+		    work. """
+
+		mode = reqinfo.contents.mode
+		if mode not in _followedSetModes:
+			# GETs and the SET phases in between just pass through
+			return libnsa.netsnmp_call_next_handler(handler, reginfo, reqinfo, requests)
+
+		if mode == MODE_SET_RESERVE1:
+			# Remember the rows' memory usage before they get changed
+			indexoids = self._requestIndexOIDs(reginfo, requests)
+			self._setPending = dict(
+				(indexoid, _rowUsage(self._findRow(indexoid)))
+				for indexoid in indexoids
+			)
+
+			# The rows may get copied and freed, so bound cells need their
+			# original storage back meanwhile
+			self._setSuspended = []
+			for indexoid in indexoids:
+				tablerow = self._rowsByOID.get(indexoid)
+				if tablerow is not None and tablerow._bound:
+					tablerow._suspendBindings()
+					self._setSuspended.append(tablerow)
+
+		ret = SNMP_ERR_NOERROR
+		if bool(handler.contents.next):
+			ret = libnsa.netsnmp_call_next_handler(handler, reginfo, reqinfo, requests)
+
+		if mode == MODE_SET_COMMIT:
+			self._generation = next(_generations)
+			for indexoid in self._requestIndexOIDs(reginfo, requests):
+				row = self._findRow(indexoid)
+				old = self._setPending.pop(indexoid, None) if self._setPending else None
+				if old is not None:
+					new = _rowUsage(row)
+					self._account(*[n - o for n, o in zip(new, old)])
+				tablerow = self._rowsByOID.get(indexoid)
+				if tablerow is not None:
+					self._followRow(indexoid, tablerow, row)
+				elif bool(row):
+					self._foreignRows.add(indexoid)
+				else:
+					self._foreignRows.discard(indexoid)
+				if self._mirror is not None:
+					self._mirrorRow(indexoid, row)
+		if mode in (MODE_SET_COMMIT, MODE_SET_FREE, MODE_SET_UNDO):
+			self._setPending = None
+			if self._setSuspended:
+				for tablerow in self._setSuspended:
+					if tablerow._table_row is not None:
+						tablerow._resumeBindings()
+			self._setSuspended = None
+
+		return ret
+
+	def _followRow(self, indexoid, tablerow, row):
+		""" Points the TableRow object "tablerow" at the netsnmp_table_row
+		    "row" that now has the index OID "indexoid", or drops it if "row"
+		    is a NULL pointer.
+
+		    The table_data_set handler applies SETs to a copy of the row,
+		    which then replaces and frees the original, and deletes rows
+		    destroyed through a RowStatus column. """
+
+		if bool(row):
+			tablerow._table_row = row
+			return
+
+		del self._rowsByOID[indexoid]
+		self._rows.pop(tablerow._key, None)
+		self._indexcache.pop(indexoid, None)
+		tablerow._bound = None
+		tablerow._table_row = None
+		if self._counterobj:
+			self._counterobj.update(self._counterobj.value() - 1)
+
+	@staticmethod
+	def _requestIndexOIDs(reginfo, requests):
+		""" Returns the set of row index OIDs addressed by "requests". """
+
+		# Request OIDs consist of the table OID, the entry, the column and
+		# the row's index OID
+		rootlen = reginfo.contents.rootoid_len
+		indexoids = set()
+		request = requests
+		while bool(request):
+			vb = request.contents.requestvb.contents
+			indexoids.add(tuple(vb.name[rootlen + 2:vb.name_length]))
+			request = ctypes.cast(request.contents.next, netsnmp_request_info_p)
+		return indexoids
+
+	def _findRow(self, indexoid):
+		""" Returns the netsnmp_table_row with the index OID "indexoid",
+		    which may be a NULL pointer. """
+
+		return libnsX.netsnmp_table_data_get_from_oid(
+			self._dataset.contents.table,
+			(c_oid * len(indexoid))(*indexoid),
+			len(indexoid)
+		)
+
+	def _mirrorRow(self, indexoid, row):
+		""" Updates the mirror's copy of the row with the index OID
+		    "indexoid" from the netsnmp_table_row "row", removing it if "row"
+		    is a NULL pointer. """
+
+		indices = self._decodeIndexOID(indexoid)
+		if not bool(row):
+			self._mirror.pop(indices, None)
+			return
+
+		cells = self._storageCells(row.contents.data, self._mirrorColumns)
+		mirrored = self._mirror.get(indices)
+		if mirrored is None:
+			self._mirror[indices] = cells
+		else:
+			# Keep the dictionary referenced by the TableRow, if any
+			mirrored.clear()
+			mirrored.update(cells)
+
+			# Bound cells had their original storage back during the SET
+			tablerow = self._rowsByOID.get(indexoid)
+			if tablerow is not None and tablerow._bound:
+				for column, bound in tablerow._bound.items():
+					if column in mirrored:
+						mirrored[column] = bound[0]
+
+	def clear(self):
+		for tablerow in self._rows.values():
+			tablerow._detach()
+		self._clearDataset(self._dataset)
+		self._rows = {}
+		self._rowsByOID = {}
+		self._foreignRows = set()
+		self._indexcache = {}
+		self._generation = next(_generations)
+		self._numRows = self._numCells = self._numBytes = 0
+		if self._mirror is not None:
+			self._mirror = {}
+		if self._expiry is not None:
+			self._expiry = []
+		if self._counterobj:
+			self._counterobj.update(0)
+
+	def _unregister(self):
+		""" Unregisters the table from net-snmp and frees its rows. """
+
+		if self._rebuild is not None:
+			self._rebuild.abort()
+		libnsa.netsnmp_unregister_handler(self._handler_reginfo)
+		self._handler_reginfo = None
+		self.clear()
+		if self._expiry is not None:
+			self._agent._expiryTables.remove(self)
+
+	def _expireRows(self, now):
+		""" Removes the rows whose deadline has passed at "now". Returns the
+		    earliest deadline left, if any. """
+
+		expiry = self._expiry
+		while expiry and expiry[0][0] <= now:
+			deadline, seq, row = heapq.heappop(expiry)
+
+			# Rows removed or replaced in the meantime
+			if row._table_row is None:
+				continue
+
+			if row._expires > now:
+				heapq.heappush(expiry, (row._expires, next(_expirySequence), row))
+			else:
+				self.removeRow(row._key)
+
+		return expiry[0][0] if expiry else None
+_Table.__name__ = "Table"
+
+class _TableRebuild(object):
+	""" The new contents of a Table being rebuilt, as returned by
+	    Table.beginRebuild(). """
+
+	__slots__ = ("_table", "_dataset", "_rows")
+
+	def __init__(self, table, dataset):
+		self._table   = table
+		self._dataset = dataset
+		self._rows    = {}
+
+	def addRow(self, idxobjs):
+		""" Adds a row with the index values given by the SNMP objects in
+		    "idxobjs" to the new contents, replacing an earlier one with the
+		    same index values. Returns the new row's TableRow object. """
+
+		if self._dataset is None:
+			raise netsnmpAgentException("Table rebuild has already ended!")
+
+		key = self._table._rowKey(idxobjs)
+		self._removeRow(key)
+
+		row = _TableRow(self._dataset, idxobjs, key, self._table)
+		libnsX.netsnmp_table_dataset_add_row(
+			self._dataset,
+			row._table_row
+		)
+		self._rows[key] = row
+
+		return row
+
+	def addRows(self, rows):
+		""" Adds many rows at once, see Table.addRows(). """
+
+		if self._dataset is None:
+			raise netsnmpAgentException("Table rebuild has already ended!")
+
+		newrows = self._table._createRows(self._dataset, rows)
+		for row in newrows:
+			self._removeRow(row._key)
+		self._table._linkRows(self._dataset, newrows)
+		for row in newrows:
+			self._rows[row._key] = row
+
+		return newrows
+
+	def _removeRow(self, key):
+		""" Removes the row added earlier with the index values "key", if
+		    any. """
+
+		oldrow = self._rows.pop(key, None)
+		if oldrow is not None:
+			table_row = oldrow._table_row
+			oldrow._detach()
+			libnsX.netsnmp_table_dataset_remove_and_delete_row(
+				self._dataset,
+				table_row
+			)
+
+	def commit(self):
+		""" Makes the rows added so far the table's contents. """
+
+		if self._dataset is None:
+			raise netsnmpAgentException("Table rebuild has already ended!")
+		self._table._commitRebuild(self)
+		self._table._rebuild = None
+		self._dataset = None
+
+	def abort(self):
+		""" Discards the rows added so far, leaving the table unchanged. """
+
+		if self._dataset is None:
+			return
+		for tablerow in self._rows.values():
+			tablerow._detach()
+		self._table._clearDataset(self._dataset)
+		self._rows = {}
+		self._table._rebuild = None
+		self._dataset = None
+_TableRebuild.__name__ = "TableRebuild"
+
+class _TableRow(object):
+	__slots__ = (
+		"_table_row", "_key", "_table", "_bound", "_expires",
+		"_mirror"
+	)
+
+	def __init__(self, dataset, idxobjs, key, table):
+		self._key = key
+
+		# The Table we belong to, for its column types and row TTL
+		self._table = table
+
+		# The time after which the row expires if the table has a row TTL
+		self._expires = None
+		if table._rowTTL is not None:
+			self._expires = _monotonic() + table._rowTTL
+
+		# Our cells' values in the table's mirror, if it has one
+		self._mirror = None
+		if table._mirror is not None:
+			self._mirror = dict(table._mirrorDefaults)
+
+		# Maps the columns of cells bound through bindCell() to tuples of
+		# the SNMP object and the cell's original storage, created on first
+		# use
+		self._bound = None
+
+		# Create the netsnmp_table_set_storage structure for
+		# this row.
+		self._table_row = libnsX.netsnmp_table_data_set_create_row_from_defaults(
+			dataset.contents.default_row
+		)
+
+		# Add the indexes
+		for idxobj in idxobjs:
+			result = libnsa.snmp_varlist_add_variable(
+				ctypes.pointer(self._table_row.contents.indexes),
+				None,
+				0,
+				idxobj._asntype,
+				idxobj.cref(is_table_index=True),
+				idxobj._data_size
+			)
+			if result == None:
+				raise netsnmpAgentException("snmp_varlist_add_variable() failed!")
+
+	def setRowCell(self, column, snmpobj):
+		if self._table_row is None:
+			raise netsnmpAgentException("Table row has been removed!")
+
+		self._setCell(column, snmpobj._asntype, _getRawValue(snmpobj))
+		self.touch()
+
+	def touch(self):
+		""" Restarts the row's time to live if its table was created with a
+		    "rowTTL". Setting cells with setRowCell() or setCells() touches
+		    the row as well, updating bound cells does not. """
+
+		if self._expires is not None:
+			self._expires = _monotonic() + self._table._rowTTL
+
+	def setCells(self, cells):
+		""" Sets the row's cells from the dictionary "cells" mapping column
+		    numbers to plain Python values, eg. { 2: "foo", 3: 42 }. The
+		    values are converted directly to the types of the columns'
+		    defaults, so unlike setRowCell() no SNMP objects are needed. """
+
+		if self._table_row is None:
+			raise netsnmpAgentException("Table row has been removed!")
+
+		for column, val in cells.items():
+			asntype = self._table._coltypes.get(column)
+			if asntype is None:
+				raise netsnmpAgentException(
+					"Table has no column {0}!".format(column)
+				)
+			try:
+				if asntype == ASN_OBJECT_ID:
+					raw = _packObjectIdentifier(self._table._agent, val)
+				else:
+					raw = _cellPackers[asntype](val)
+			except (struct.error, socket.error, TypeError, ValueError) as e:
+				raise netsnmpAgentException(
+					"Invalid value {0!r} for column {1}: {2}".format(
+						val, column, e
+					)
+				)
+
+			# setRowCell() gets OctetStrings, which can't hold more
+			if asntype == ASN_OCTET_STR and len(raw) > MAX_STRING_SIZE:
+				raise netsnmpAgentException(
+					"Value for column {0} exceeds {1} bytes: {2} bytes!".format(
+						column, MAX_STRING_SIZE, len(raw)
+					)
+				)
+			self._setCell(column, asntype, raw)
+		self.touch()
+
+	def _setCell(self, column, asntype, raw):
+		""" Sets the cell in "column" to the C representation "raw" of a
+		    value of type "asntype".
+
+		    netsnmp_set_row_column() frees and reallocates a cell's storage
+		    on every call. For fixed-size types, if the cell already holds a
+		    value of the same type and size, we instead overwrite that value
+		    in place, which saves the allocator churn when eg. counters get
+		    refreshed periodically. """
+
+		if self._bound and column in self._bound:
+			self._unbind(column)
+
+		storage = self._storage(column)
+		oldlen = storage.data_len if storage is not None else 0
+		if asntype in _fixedSizeTypes:
+			if storage is not None \
+			and storage.type == asntype \
+			and storage.data_len == len(raw) \
+			and bool(storage.data.voidp):
+				ctypes.memmove(storage.data.voidp, raw, len(raw))
+				self._cellSet(column, asntype, raw)
+				return
+
+		result = libnsX.netsnmp_set_row_column(
+			self._table_row,
+			column,
+			asntype,
+			raw,
+			len(raw)
+		)
+		if result != SNMPERR_SUCCESS:
+			raise netsnmpAgentException("netsnmp_set_row_column() failed with error code {0}!".format(result))
+		self._cellSet(column, asntype, raw)
+
+		# Account for the changed storage unless we're part of a rebuild,
+		# which accounts for its rows when committed
+		table = self._table
+		if table._rows.get(self._key) is self:
+			if storage is None:
+				table._account(
+					0,
+					1,
+					ctypes.sizeof(netsnmp_table_data_set_storage) + len(raw)
+				)
+			else:
+				table._account(0, 0, len(raw) - oldlen)
+
+	def _cellSet(self, column, asntype, raw):
+		""" Records that the cell in "column" has been set to "raw". """
+
+		self._table._generation = next(_generations)
+		if self._mirror is not None \
+		and (self._table._mirrorColumns is None or column in self._table._mirrorColumns):
+			self._mirror[column] = _rawCellValue(asntype, raw)
+
+	def _storage(self, column):
+		""" Returns the netsnmp_table_data_set_storage structure holding
+		    the cell in "column" or None if the cell has not been set. """
+
+		data = ctypes.cast(self._table_row.contents.data, netsnmp_table_data_set_storage_p)
+		while bool(data):
+			if data.contents.column == column:
+				return data.contents
+			data = data.contents.next
+		return None
+
+	def _holds(self, column, asntype, raw):
+		""" Returns whether the cell in "column" holds the C representation
+		    "raw" of a value of type "asntype", as used by Table.sync() to
+		    skip unchanged cells. The cell's storage is compared, so changes
+		    through SNMP SETs are accounted for. Bound cells never match,
+		    setting them unbinds them. """
+
+		if self._bound and column in self._bound:
+			return False
+
+		storage = self._storage(column)
+		if storage is None \
+		or storage.type != asntype \
+		or storage.data_len != len(raw):
+			return False
+		if not raw:
+			return True
+		return ctypes.string_at(storage.data.voidp, storage.data_len) == raw
+
+	def bindCell(self, column, snmpobj):
+		""" Binds the cell in "column" to "snmpobj", an SNMP object of a
+		    fixed-size type created without "oidstr". Just like with scalar
+		    variables, SNMP requests are then served straight from the
+		    object's own C variable, so "snmpobj.update()" changes the cell
+		    without calling into net-snmp.
+
+		    Bound cells are read-only for SNMP clients, SETs of the row's
+		    other cells keep the binding. Setting a bound cell with
+		    setRowCell() or setCells() unbinds it. """
+
+		if self._table_row is None:
+			raise netsnmpAgentException("Table row has been removed!")
+		if snmpobj._flags != WATCHER_FIXED_SIZE:
+			raise netsnmpAgentException(
+				"Only SNMP objects of fixed-size types can be bound to "
+				"table cells!"
+			)
+
+		# Make sure the cell has storage we can point at snmpobj
+		if self._bound and column in self._bound:
+			self._unbind(column)
+		storage = self._storage(column)
+		if storage is None:
+			self._setCell(column, snmpobj._asntype, _getRawValue(snmpobj))
+			storage = self._storage(column)
+
+		# The original storage was allocated by net-snmp, which will want
+		# to free() it, so we restore it before the row gets deleted
+		if self._bound is None:
+			self._bound = {}
+		self._bind(column, snmpobj, storage, storage.writable)
+		if self._mirror is not None \
+		and (self._table._mirrorColumns is None or column in self._table._mirrorColumns):
+			self._mirror[column] = snmpobj
+
+	def _bind(self, column, snmpobj, storage, writable):
+		""" Points "storage", the netsnmp_table_data_set_storage structure
+		    of the cell in "column", at "snmpobj", remembering its original
+		    contents and "writable" flag. """
+
+		self._bound[column] = (
+			snmpobj,
+			storage.type,
+			storage.data.voidp,
+			storage.data_len,
+			writable
+		)
+		storage.type       = snmpobj._asntype
+		storage.data.voidp = ctypes.addressof(snmpobj._cvar)
+		storage.data_len   = snmpobj._data_size
+		storage.writable   = 0
+
+	def _suspendBindings(self):
+		""" Restores the original storage of the bound cells while an SNMP
+		    SET may copy or free the row, leaving them read-only. """
+
+		for column, bound in self._bound.items():
+			snmpobj, asntype, voidp, data_len, writable = bound
+			storage = self._storage(column)
+			storage.type       = asntype
+			storage.data.voidp = voidp
+			storage.data_len   = data_len
+
+	def _resumeBindings(self):
+		""" Binds the cells again after _suspendBindings(), possibly in the
+		    copy of the row that replaced the original. """
+
+		for column, bound in list(self._bound.items()):
+			snmpobj, asntype, voidp, data_len, writable = bound
+			self._bind(column, snmpobj, self._storage(column), writable)
+
+	def unbindCell(self, column):
+		""" Unbinds the cell in "column" bound with bindCell(), copying the
+		    SNMP object's current value into the cell. """
+
+		if not self._bound or column not in self._bound:
+			raise netsnmpAgentException(
+				"Table cell in column {0} is not bound!".format(column)
+			)
+
+		snmpobj = self._unbind(column)
+		self._setCell(column, snmpobj._asntype, _getRawValue(snmpobj))
+
+	def _unbind(self, column):
+		""" Restores the original storage of the bound cell in "column" and
+		    returns the SNMP object it was bound to. """
+
+		snmpobj, asntype, voidp, data_len, writable = self._bound.pop(column)
+		storage = self._storage(column)
+		storage.type       = asntype
+		storage.data.voidp = voidp
+		storage.data_len   = data_len
+		storage.writable   = writable
+		return snmpobj
+
+	def _detach(self):
+		""" Prepares the row for being deleted by net-snmp. """
+
+		if self._bound:
+			for column in list(self._bound):
+				self._unbind(column)
+		self._table_row = None
+_TableRow.__name__ = "TableRow"
+
+
+class _SubtreeHandler(object):
+	""" Base class of SNMP objects that register a single net-snmp handler
+	    for a whole subtree and answer all requests below it from Python.
+
+	    Derived classes implement _lookup(suffix), returning the SNMP object
+	    serving the instance "suffix" (a tuple of sub-identifiers relative
+	    to the registered OID) or None, and _lookupNext(suffix, inclusive),
+	    returning the (suffix, snmpobj) tuple following "suffix" or None. """
+
+	__slots__ = ("_rootoid", "_handler", "_handler_reginfo", "_undo", "_generation")
+
+	def _registerHandler(self, agent, oidstr, writable, context):
+		""" Registers our handler for the subtree at "oidstr". """
+
+		oid = agent.determine_oid_and_length(oidstr)
+		self._rootoid    = tuple(oid[0][:oid[1].value])
+		self._undo       = {}
+		self._generation = next(_generations)
+
+		# As usual, keep a reference to the ctypes-converted handler
+		# function so it doesn't get garbage collected.
+		self._handler = SNMPNodeHandler(self._handleRequests)
+
+		self._handler_reginfo = agent._prepareRegistration(
+			oidstr, writable, oid, self._handler
+		)
+		self._handler_reginfo.contents.contextName = b(context)
+		result = libnsa.netsnmp_register_handler(self._handler_reginfo)
+		if result != SNMPERR_SUCCESS:
+			raise netsnmpAgentException(
+				"Error code {0} while registering handler with "
+				"net-snmp!".format(result)
+			)
+
+		# Finally, we keep track of all registered SNMP objects for the
+		# getRegistered() method.
+		agent._objs[context].add(self._rootoid, oidstr, self)
+
+	def _unregister(self):
+		""" Unregisters our handler from net-snmp. """
+
+		libnsa.netsnmp_unregister_handler(self._handler_reginfo)
+		self._handler_reginfo = None
+
+	def _handleRequests(self, handler, reginfo, reqinfo, requests):
+		mode = reqinfo.contents.mode
+
+		request = requests
+		while bool(request):
+			try:
+				self._handleRequest(mode, request)
+			except Exception:
+				# We're called from C, so an exception would get lost and
+				# leave the request unanswered
+				libnsa.netsnmp_request_set_error(request, SNMP_ERR_GENERR)
+
+			request = ctypes.cast(request.contents.next, netsnmp_request_info_p)
+
+		return SNMP_ERR_NOERROR
+
+	def _handleRequest(self, mode, request):
+		""" Handles the single request "request" in mode "mode". """
+
+		rootlen = len(self._rootoid)
+		vb = request.contents.requestvb.contents
+		name = tuple(vb.name[:vb.name_length])
+
+		if mode == MODE_GET:
+			snmpobj = None
+			if name[:rootlen] == self._rootoid:
+				snmpobj = self._lookup(name[rootlen:])
+			if snmpobj is None:
+				libnsa.netsnmp_request_set_error(request, SNMP_NOSUCHINSTANCE)
+			else:
+				self._setVarbindValue(request, snmpobj)
+		elif mode == MODE_GET_NEXT:
+			if name[:rootlen] == self._rootoid:
+				found = self._lookupNext(
+					name[rootlen:],
+					bool(request.contents.inclusive)
+				)
+			elif name < self._rootoid:
+				found = self._lookupNext((), True)
+			else:
+				found = None
+
+			# If there is no next instance, leave the request alone so
+			# that net-snmp continues with the next registered subtree.
+			if found is not None:
+				suffix, snmpobj = found
+				fulloid = self._rootoid + suffix
+				libnsa.snmp_set_var_objid(
+					request.contents.requestvb,
+					(c_oid * len(fulloid))(*fulloid),
+					len(fulloid)
+				)
+				self._setVarbindValue(request, snmpobj)
+		else:
+			self._handleSet(mode, request, name[rootlen:] \
+			                if name[:rootlen] == self._rootoid else None)
+
+	def _setVarbindValue(self, request, snmpobj):
+		libnsa.snmp_set_var_typed_value(
+			request.contents.requestvb,
+			snmpobj._asntype,
+			ctypes.cast(snmpobj.cref(), ctypes.c_void_p),
+			snmpobj._data_size
+		)
+
+	def _lookupWritable(self, suffix):
+		""" Returns the SNMP object for the instance "suffix" if it may be
+		    SET, None otherwise. Defaults to no instance being writable. """
+
+		return None
+
+	def _changeGeneration(self, current):
+		""" Returns the generation of the object's last change or None if
+		    it is not known. """
+
+		return self._generation
+
+	def _handleSet(self, mode, request, suffix):
+		""" Implements net-snmp's SET state machine for a single request,
+		    similar to what the watcher helper does for scalars. """
+
+		key = ctypes.addressof(request.contents)
+		vb  = request.contents.requestvb.contents
+
+		if mode == MODE_SET_RESERVE1:
+			snmpobj = self._lookupWritable(suffix) if suffix is not None \
+			                                       else None
+			if snmpobj is None:
+				error = SNMP_ERR_NOTWRITABLE
+			elif vb.type != snmpobj._asntype:
+				error = SNMP_ERR_WRONGTYPE
+			elif snmpobj._flags == WATCHER_FIXED_SIZE \
+			and  vb.val_len != snmpobj._data_size:
+				error = SNMP_ERR_WRONGLENGTH
+			elif vb.val_len > snmpobj._max_size:
+				error = SNMP_ERR_WRONGLENGTH
+			else:
+				error = SNMP_ERR_NOERROR
+			if error != SNMP_ERR_NOERROR:
+				libnsa.netsnmp_request_set_error(request, error)
+		elif mode == MODE_SET_ACTION:
+			snmpobj = self._lookupWritable(suffix)
+			newval  = ctypes.string_at(
+				ctypes.cast(vb.val.bitstring, ctypes.c_void_p),
+				vb.val_len
+			)
+			self._undo[key] = (snmpobj, _getRawValue(snmpobj))
+			_setRawValue(snmpobj, newval)
+		elif mode == MODE_SET_UNDO:
+			if key in self._undo:
+				snmpobj, oldval = self._undo.pop(key)
+				_setRawValue(snmpobj, oldval)
+		elif mode in (MODE_SET_COMMIT, MODE_SET_FREE):
+			self._undo.pop(key, None)
+
+def _getRawValue(snmpobj):
+	""" Returns the bytes of an SNMP object's C representation as served to
+	    SNMP clients. """
+
+	return ctypes.string_at(
+		ctypes.cast(snmpobj.cref(), ctypes.c_void_p),
+		snmpobj._data_size
+	)
+
+def _setRawValue(snmpobj, raw):
+	""" Replaces the C representation of an SNMP object with the bytes
+	    "raw", eg. as received from a SNMP SET request. """
+
+	if snmpobj._flags == WATCHER_FIXED_SIZE:
+		ctypes.memmove(snmpobj.cref(), raw, len(raw))
+	else:
+		# Variable-sized objects are backed by string buffers, which
+		# ctypes NUL-terminates for us
+		snmpobj._cvar.value = raw
+		snmpobj._data_size  = len(raw)
+
+class _ScalarGroup(_SubtreeHandler):
+	__slots__ = ("_suffixes", "_cells")
+
+	def __init__(self, agent, oidstr, context):
+		self._suffixes = []
+		self._cells    = {}
+		self._registerHandler(agent, oidstr, True, context)
+
+	def add(self, suffix, snmpobj, writable = True):
+		""" Adds "snmpobj" as the instance "suffix" below the group's OID.
+
+		    "suffix" is either a dot notation string, eg. "1.0", or a
+		    sequence of integers. "snmpobj" must be an SNMP object that has
+		    been created without an "oidstr", eg. agent.Integer32(42).
+		    "writable" indicates whether "snmpset" is allowed.
+
+		    Returns "snmpobj". """
+
+		if isinstance(suffix, str):
+			suffix = tuple(int(x) for x in suffix.strip(".").split("."))
+		else:
+			suffix = tuple(suffix)
+		if suffix in self._cells:
+			raise netsnmpAgentException(
+				"Instance {0} already present in scalar group!".format(
+					".".join(str(x) for x in suffix)
+				)
+			)
+		if not writable or isinstance(snmpobj, _ObjectIdentifier):
+			writable = False
+
+		bisect.insort(self._suffixes, suffix)
+		self._cells[suffix] = (snmpobj, writable)
+		self._generation = next(_generations)
+
+		return snmpobj
+
+	def _lookup(self, suffix):
+		cell = self._cells.get(suffix)
+		return cell[0] if cell else None
+
+	def _lookupNext(self, suffix, inclusive):
+		if inclusive:
+			pos = bisect.bisect_left(self._suffixes, suffix)
+		else:
+			pos = bisect.bisect_right(self._suffixes, suffix)
+		if pos == len(self._suffixes):
+			return None
+		suffix = self._suffixes[pos]
+		return (suffix, self._cells[suffix][0])
+
+	def _lookupWritable(self, suffix):
+		cell = self._cells.get(suffix)
+		return cell[0] if cell and cell[1] else None
+
+	def _changeGeneration(self, current):
+		# The group changes with its instances, whose changes, be it through
+		# update() or SNMP SETs, get noticed like for registered scalars
+		return max(
+			[self._generation] +
+			[snmpobj._changeGeneration(current) for snmpobj, writable in self._cells.values()]
+		)
+
+	def value(self):
+		retdict = {}
+		for suffix in self._suffixes:
+			retdict[".".join(str(x) for x in suffix)] = self._cells[suffix][0].value()
+		return retdict
+_ScalarGroup.__name__ = "ScalarGroup"
+
+
+class _VirtualTable(_SubtreeHandler):
+	__slots__ = ("_agent", "_idxobjs", "_columns", "_cells", "_provider")
+
+	def __init__(self, agent, oidstr, idxobjs, coldefs, provider, context):
+		self._agent    = agent
+		self._idxobjs  = tuple(idxobjs)
+		self._provider = provider
+
+		# For every column, create a scratch SNMP object of the column's
+		# type that will hold values while they're handed to net-snmp
+		self._cells = {}
+		for coldef in coldefs:
+			defobj = coldef[1]
+			if isinstance(defobj, (_IpAddress, _TruthValue)):
+				initval = defobj.value()
+			else:
+				initval = None
+			self._cells[coldef[0]] = type(defobj)(agent, initval, None, False, "", None)
+		self._columns = sorted(self._cells)
+
+		self._registerHandler(agent, oidstr, False, context)
+
+	def _changeGeneration(self, current):
+		# Our contents come from the provider, so they may change anytime
+		return None
+
+	def encodeIndex(self, values):
+		""" Returns the index OID tuple for the row with the index values
+		    "values", a sequence with one value per table index. """
+
+		return _encodeIndex(self._agent, self._idxobjs, values)
+
+	def decodeIndex(self, indexoid):
+		""" Returns the tuple of index values for the index OID tuple
+		    "indexoid". Values are represented as for Table.value(), so
+		    OBJECT IDENTIFIERs may come back by name. """
+
+		return _decodeIndex(self._agent, self._idxobjs, indexoid)
+
+	def memoryUsage(self):
+		""" Returns a dictionary like Table.memoryUsage(). The rows are
+		    kept by the provider, so only the SNMP objects the cells' values
+		    get served from are accounted for. """
+
+		return {
+			"rows":  0,
+			"cells": 0,
+			"bytes": sum(ctypes.sizeof(cell._cvar) for cell in self._cells.values())
+		}
+
+	def _cell(self, column, val):
+		cell = self._cells[column]
+		if isinstance(cell, _ObjectIdentifier):
+			cell._set_oid_value(val)
+		else:
+			if isinstance(cell, _VarType) and cell._flags & WATCHER_MAX_SIZE:
+				val = b(val)
+			cell.update(val)
+		return cell
+
+	def _lookup(self, suffix):
+		# Instances look like <entry (1)>.<column>.<index OID>
+		if len(suffix) < 3 or suffix[0] != 1 or suffix[1] not in self._cells:
+			return None
+
+		val = self._provider.get(suffix[2:], suffix[1])
+		if val is None:
+			return None
+		return self._cell(suffix[1], val)
+
+	def _lookupNext(self, suffix, inclusive):
+		if suffix[:1] > (1,):
+			return None
+
+		# Determine the column to start at and the index OID in that column
+		# to look for a successor of (None meaning the column's first row).
+		# OIDs sorting before the entry, eg. <table>.0.2.1, precede all cells.
+		indexoid = None
+		if suffix[:1] < (1,) or len(suffix) < 2:
+			pos = 0
+		elif suffix[1] in self._cells:
+			pos = self._columns.index(suffix[1])
+			if len(suffix) > 2:
+				indexoid = suffix[2:]
+				if inclusive:
+					val = self._provider.get(indexoid, suffix[1])
+					if val is not None:
+						return (suffix, self._cell(suffix[1], val))
+		else:
+			pos = bisect.bisect_right(self._columns, suffix[1])
+
+		while pos < len(self._columns):
+			column = self._columns[pos]
+			found = self._provider.next(indexoid, column)
+			if found is not None:
+				indexoid, val = found
+				return ((1, column) + tuple(indexoid), self._cell(column, val))
+			indexoid = None
+			pos += 1
+
+		return None
+
+	def value(self):
+		retdict = {}
+		for column in self._columns:
+			found = self._provider.next(None, column)
+			while found is not None:
+				indexoid, val = found
+				values = self.decodeIndex(indexoid)
+				key = values[0] if len(values) == 1 else values
+				retdict.setdefault(key, {})[column] = val
+				found = self._provider.next(indexoid, column)
+		return retdict
+_VirtualTable.__name__ = "VirtualTable"
+
+
+# array module typecodes able to hold the values of the SNMP variable types
+# with the respective ctypes representation
+_arrayTypecodes = {
+	ctypes.c_long   : "l",
+	ctypes.c_ulong  : "L",
+	counter64       : "Q",
+	ctypes.c_float  : "f",
+	ctypes.c_double : "d",
+}
+
+class _ColumnarTable(_VirtualTable):
+	__slots__ = ("_defaults", "_slots", "_sorted", "_data")
+
+	def __init__(self, agent, oidstr, idxobjs, coldefs, context):
+		self._defaults = dict((coldef[0], coldef[1].value()) for coldef in coldefs)
+		self._slots    = {}
+		self._sorted   = []
+		self._data     = {}
+
+		# We are our own provider
+		_VirtualTable.__init__(self, agent, oidstr, idxobjs, coldefs, self, context)
+
+		for column in self._columns:
+			self._data[column] = self._newColumn(column, [])
+
+	def _newColumn(self, column, values):
+		""" Returns a container holding "values" for the column "column", a
+		    typed array for numeric columns and a list otherwise. Raises
+		    netsnmpAgentException if a value does not fit the column's
+		    type. """
+
+		cell = self._cells[column]
+		if isinstance(cell, _VarType) and cell._props["ctype"] in _arrayTypecodes:
+			try:
+				return array.array(_arrayTypecodes[cell._props["ctype"]], values)
+			except (OverflowError, TypeError) as e:
+				raise netsnmpAgentException(
+					"Invalid value for column {0}: {1}".format(column, e)
+				)
+			except ValueError:
+				# Typecode not supported by this Python version
+				pass
+		values = list(values)
+		for val in values:
+			self._checkValue(column, val)
+		return values
+
+	def _checkColumn(self, column):
+		if column not in self._cells:
+			raise netsnmpAgentException(
+				"Table has no column {0}!".format(column)
+			)
+
+	def _checkValue(self, column, val):
+		""" Raises netsnmpAgentException unless "val" can be converted to
+		    the type of the column "column", as done by TableRow.setCells().
+		    Typed arrays check their values themselves. """
+
+		cell = self._cells[column]
+		try:
+			if isinstance(cell, _ObjectIdentifier):
+				# May be given symbolically, resolved when served
+				raw = b(val)
+			else:
+				raw = _cellPackers[cell._asntype](val)
+		except (struct.error, socket.error, AttributeError, OverflowError,
+		        TypeError, ValueError) as e:
+			raise netsnmpAgentException(
+				"Invalid value {0!r} for column {1}: {2}".format(val, column, e)
+			)
+		if isinstance(cell, _VarType) and cell._flags & WATCHER_MAX_SIZE \
+		and len(raw) > cell._max_size:
+			raise netsnmpAgentException(
+				"Value for column {0} exceeds {1} bytes: {2} bytes!".format(
+					column, cell._max_size, len(raw)
+				)
+			)
+
+	def memoryUsage(self):
+		""" Returns a dictionary like Table.memoryUsage(), "bytes" counting
+		    the typed arrays holding numeric columns. Other columns are kept
+		    in lists whose values are not accounted for. """
+
+		usage = _VirtualTable.memoryUsage(self)
+		usage["rows"]  = len(self._sorted)
+		usage["cells"] = len(self._sorted) * len(self._columns)
+		for values in self._data.values():
+			if isinstance(values, array.array):
+				usage["bytes"] += values.itemsize * len(values)
+		return usage
+
+	def _indexOID(self, idx):
+		if not isinstance(idx, (list, tuple)):
+			idx = (idx,)
+		return self.encodeIndex(idx)
+
+	def setRows(self, indexes, columns):
+		""" Replaces the table's contents.
+
+		    "indexes" is a sequence with the rows' index values (a tuple of
+		    values or, for single-index tables, the value itself), "columns"
+		    a dictionary mapping column numbers to sequences of cell values
+		    in the order of "indexes". Columns not in "columns" get their
+		    default value. The row order given here is also the one expected
+		    by setColumn(). """
+
+		indexoids = [self._indexOID(idx) for idx in indexes]
+		slots = dict((indexoid, slot) for slot, indexoid in enumerate(indexoids))
+		if len(slots) != len(indexoids):
+			raise netsnmpAgentException("Duplicate row indexes passed to setRows()!")
+
+		for column in columns:
+			self._checkColumn(column)
+
+		data = {}
+		for column in self._columns:
+			if column in columns:
+				values = columns[column]
+				if len(values) != len(indexoids):
+					raise netsnmpAgentException(
+						"Column {0} has {1} values for {2} rows!".format(
+							column, len(values), len(indexoids)
+						)
+					)
+			else:
+				values = [self._defaults[column]] * len(indexoids)
+			data[column] = self._newColumn(column, values)
+
+		self._slots  = slots
+		self._sorted = sorted(indexoids)
+		self._data   = data
+		self._generation = next(_generations)
+
+	def setColumn(self, column, values):
+		""" Replaces all values of the column "column" at once. "values" must
+		    be in the row order given to setRows(). """
+
+		self._checkColumn(column)
+		if len(values) != len(self._slots):
+			raise netsnmpAgentException(
+				"Column {0} has {1} values for {2} rows!".format(
+					column, len(values), len(self._slots)
+				)
+			)
+		self._data[column] = self._newColumn(column, values)
+		self._generation = next(_generations)
+
+	def setCell(self, idx, column, value):
+		""" Sets the value of a single cell in the row with the index values
+		    "idx". """
+
+		self._checkColumn(column)
+		slot = self._slots.get(self._indexOID(idx))
+		if slot is None:
+			raise netsnmpAgentException(
+				"No table row with index {0}!".format(idx)
+			)
+
+		values = self._data[column]
+		if isinstance(values, array.array):
+			try:
+				values[slot] = value
+			except (OverflowError, TypeError) as e:
+				raise netsnmpAgentException(
+					"Invalid value {0!r} for column {1}: {2}".format(value, column, e)
+				)
+		else:
+			self._checkValue(column, value)
+			values[slot] = value
+		self._generation = next(_generations)
+
+	def _changeGeneration(self, current):
+		return self._generation
+
+	# Provider interface used by _VirtualTable
+	def get(self, indexoid, column):
+		slot = self._slots.get(tuple(indexoid))
+		if slot is None:
+			return None
+		return self._data[column][slot]
+
+	def next(self, indexoid, column):
+		if indexoid is None:
+			pos = 0
+		else:
+			pos = bisect.bisect_right(self._sorted, tuple(indexoid))
+		if pos == len(self._sorted):
+			return None
+		indexoid = self._sorted[pos]
+		return (indexoid, self._data[column][self._slots[indexoid]])
+_ColumnarTable.__name__ = "ColumnarTable"
+
+
 class netsnmpAgent(object):
 	""" Implements an SNMP agent using the net-snmp libraries. """
 
@@ -142,7 +2906,32 @@ class netsnmpAgent(object):
 		                  be used to prefix the log message, if desired.
 		                  Trailing linefeeds will also have been stripped off.
 		                  If undefined, log messages will be written to stderr
-		                  instead. """
+		                  instead.
+		- OIDCacheSize  : The maximum number of OID strings whose resolution
+		                  by determine_oid_and_length() gets cached. Defaults
+		                  to 4096, 0 disables the cache.
+		- OIDCacheFile  : The filename of an optional compiled OID file. When
+		                  MIB files are in use, the OIDs that names from the
+		                  MIBFiles' modules such as "SIMPLE-MIB::simpleInteger"
+		                  resolve to get written to it by start() (or
+		                  saveOIDCache()), keyed by the modification times and
+		                  hashes of the MIBFiles. If these still match, later
+		                  runs look the names up in the memory-mapped file,
+		                  which also allows them to use symbolic names with
+		                  UseMIBFiles set to False.
+		- LazyMIBs      : Whether to skip loading the MIB modules in the
+		                  default search path when the MIB parser gets
+		                  initialized. Instead, a module is loaded the first
+		                  time an OID string such as "IF-MIB::ifIndex" refers
+		                  to it (along with the modules it imports). Defaults
+		                  to False. See mibLoadReport().
+		- AlarmSignals  : Whether net-snmp's alarms (eg. the AgentX ping and
+		                  reconnect timers) get delivered through SIGALRM, as
+		                  net-snmp does by default. When False, they are run
+		                  from within check_and_process() instead. This is a
+		                  process-wide net-snmp setting. Must be False for
+		                  Tables with a "rowTTL". Defaults to True, while
+		                  asyncio_attach() always sets it to False. """
 
 		# Default settings
 		defaults = {
@@ -152,6 +2941,10 @@ class netsnmpAgent(object):
 			"UseMIBFiles"   : True,
 			"MIBFiles"      : None,
 			"LogHandler"    : None,
+			"OIDCacheSize"  : 4096,
+			"OIDCacheFile"  : None,
+			"LazyMIBs"      : False,
+			"AlarmSignals"  : True,
 		}
 		for key in defaults:
 			setattr(self, key, args.get(key, defaults[key]))
@@ -351,13 +3144,41 @@ class netsnmpAgent(object):
 					"netsnmp_ds_set_string() failed for NETSNMP_DS_LIB_PERSISTENT_DIR!"
 				)
 
+		# Run alarms from within check_and_process() instead of through
+		# SIGALRM?
+		if not self.AlarmSignals:
+			self._disableAlarmSignals()
+
 		# Initialize net-snmp library (see netsnmp_agent_api(3))
 		if libnsa.init_agent(b(self.AgentName)) != 0:
 			raise netsnmpAgentException("init_agent() failed!")
 
-		# Initialize MIB parser
+		# Resolved OIDs, see determine_oid_and_length()
+		self._oidcache = _OIDCache(self.OIDCacheSize)
+
+		# MIB modules and files loaded so far and the time spent doing so,
+		# see mibLoadReport()
+		self._mibModules = []
+		self._mibSeconds = 0.0
+
+		# Initialize MIB parser. With LazyMIBs, an empty MIBS environment
+		# variable keeps it from loading the modules in the default search
+		# path, these get loaded on demand by _loadMIBModule() instead.
 		if self.UseMIBFiles:
-			libnsa.netsnmp_init_mib()
+			started = _monotonic()
+			if self.LazyMIBs:
+				mibs = os.environ.get("MIBS")
+				os.environ["MIBS"] = ""
+				try:
+					libnsa.netsnmp_init_mib()
+				finally:
+					if mibs is None:
+						del os.environ["MIBS"]
+					else:
+						os.environ["MIBS"] = mibs
+			else:
+				libnsa.netsnmp_init_mib()
+			self._mibSeconds += _monotonic() - started
 
 		# If MIBFiles were specified (ie. MIBs that can not be found in
 		# net-snmp's default MIB directory /usr/share/snmp/mibs), read
@@ -365,12 +3186,51 @@ class netsnmpAgent(object):
 		# format.
 		if self.UseMIBFiles and self.MIBFiles:
 			for mib in self.MIBFiles:
-				if libnsa.read_mib(b(mib)) == 0:
-					raise netsnmpAgentException("netsnmp_read_module({0}) " +
-					                            "failed!".format(mib))
-
-		# Initialize our SNMP object registry
-		self._objs = defaultdict(dict)
+				started = _monotonic()
+				if not bool(libnsa.read_mib(b(mib))):
+					raise netsnmpAgentException("read_mib({0}) failed!".format(mib))
+				self._mibSeconds += _monotonic() - started
+				self._mibModules.append(mib)
+			self._mibsChanged()
+
+		# Compiled OID file (see the "OIDCacheFile" argument), if valid for
+		# the MIBFiles, the symbolic names resolved through the MIB parser
+		# that it lacks and, built on demand, the reverse mapping. As the
+		# file is only checked against the MIBFiles, it may only contain
+		# names from the modules they define.
+		self._oidfile    = None
+		self._oidlearned = {}
+		self._oidnames   = None
+		self._oidmodules = frozenset()
+		if self.OIDCacheFile:
+			if self.UseMIBFiles:
+				self._oidmodules = frozenset(_mibModuleNames(self._mibFiles()))
+			self._openOIDFile()
+
+		# Initialize our SNMP object registry, one _OIDRegistry per context
+		self._objs = defaultdict(_OIDRegistry)
+
+		# State for asyncio event loop integration (see asyncio_attach())
+		self._aio_loop    = None
+		self._aio_fds     = set()
+		self._aio_timer   = None
+
+		# State for delegated requests (see delegate()): the executor, the
+		# number of delegations not completed yet, the completed work and
+		# the self-pipe waking up a blocking check_and_process()
+		self._delegate_executor = None
+		self._delegate_pending  = 0
+		self._delegate_done     = deque()
+		self._delegate_pipe     = None
+		self._delegate_wakeup   = ExternalFDCallback(self._delegateWakeup)
+
+		# State for the expiry of rows in Tables with a row TTL: the tables,
+		# the net-snmp alarm registered for the next deadline, if any, and
+		# that deadline
+		self._expiryTables   = []
+		self._expiryAlarm    = 0
+		self._expiryDeadline = None
+		self._expiryCallback = SNMPAlarmCallback(self._expireRows)
 
 	def determine_oid_and_length(self, oidstr):
 		"""
@@ -381,8 +3241,33 @@ class netsnmpAgent(object):
 				"IF-MIB::ifIndex"
 
 			Returns: tuple(oid, oid_len)
+
+		Resolved OIDs are cached (see the "OIDCacheSize" argument), so
+		repeated calls only build a new ctypes array of the OID's actual
+		length.
 		"""
+		parts = self._oidcache.get(oidstr)
+		if parts is None:
+			parts = self._resolveOID(oidstr)
+			self._oidcache.put(oidstr, parts)
+
+		# Callers may modify the returned array, eg. ObjectIdentifier
+		# objects being SET, so it must not be shared
+		return ((c_oid * len(parts))(*parts), ctypes.c_size_t(len(parts)))
+
+	def _resolveOID(self, oidstr):
+		""" Resolves "oidstr" as determine_oid_and_length() describes and
+		    returns the OID as a tuple of sub-identifiers. """
+
+		if self._oidfile is not None:
+			parts = self._oidfile.get(oidstr)
+			if parts is not None:
+				return parts
+
 		if self.UseMIBFiles:
+			if self.LazyMIBs and "::" in oidstr:
+				self._loadMIBModule(oidstr.split("::", 1)[0])
+
 			# We can't know the length of the internal OID representation
 			# beforehand, so we use a MAX_OID_LEN sized buffer for the call to
 			# read_objid() below
@@ -396,29 +3281,148 @@ class netsnmpAgent(object):
 				ctypes.byref(oid_len)
 			) == 0:
 				raise netsnmpAgentException("read_objid({0}) failed!".format(oidstr))
+			parts = tuple(oid[:oid_len.value])
+			if "::" in oidstr and oidstr.split("::", 1)[0] in self._oidmodules:
+				self._oidlearned[oidstr] = parts
+			return parts
 		else:
 			# Interpret the given oidstr as the oid itself.
 			try:
-				parts = [c_oid(long(x) if sys.version_info <= (3,) else int(x)) for x in oidstr.strip('.').split('.')]
+				return tuple(long(x) if sys.version_info <= (3,) else int(x) for x in oidstr.strip('.').split('.'))
 			except ValueError:
 				raise netsnmpAgentException("Invalid OID (not using MIB): {0}".format(oidstr))
 
-			oid = (c_oid * len(parts))(*parts)
-			oid_len = ctypes.c_size_t(len(parts))
-		return (oid, oid_len)
+	def oidCacheStats(self):
+		""" Returns a dictionary with the numbers of "hits" and "misses" of
+		    the cache used by determine_oid_and_length() as well as its
+		    current and maximum "size". """
+
+		return self._oidcache.stats()
+
+	def _mibFiles(self):
+		""" Returns the MIBFiles as a tuple. """
+
+		if self.MIBFiles is None:
+			return ()
+		if type(self.MIBFiles) not in (list, tuple):
+			return (self.MIBFiles,)
+		return tuple(self.MIBFiles)
+
+	def _openOIDFile(self):
+		""" Opens the compiled OID file, unless it is missing, invalid or
+		    outdated with respect to the MIBFiles. """
 
-	def _prepareRegistration(self, oidstr, writable = True):
+		try:
+			oidfile = _OIDFile(self.OIDCacheFile)
+		except (IOError, OSError, netsnmpAgentException):
+			return
+		try:
+			valid = _mibFingerprintValid(oidfile.mibs, self._mibFiles())
+		except (IOError, OSError, KeyError, TypeError):
+			valid = False
+		if not valid:
+			oidfile.close()
+			return
+		self._oidfile  = oidfile
+		self._oidnames = None
+
+	def saveOIDCache(self):
+		""" Writes the compiled OID file (see the "OIDCacheFile" argument)
+		    with all names from the MIBFiles' modules, eg.
+		    "SIMPLE-MIB::simpleInteger", resolved so far. Called by start()
+		    automatically if names had to be resolved through the MIB parser.
+		    Requires MIB files to be in use. """
+
+		if not self.OIDCacheFile:
+			raise netsnmpAgentException("No OIDCacheFile configured!")
+		if not self.UseMIBFiles:
+			raise netsnmpAgentException("Compiling the OIDCacheFile requires "
+			                            "MIB files to be in use!")
+
+		entries = {}
+		if self._oidfile is not None:
+			entries.update(self._oidfile.items())
+			self._oidfile.close()
+			self._oidfile = None
+		entries.update(self._oidlearned)
+		_writeOIDFile(self.OIDCacheFile, _mibFingerprint(self._mibFiles()), entries)
+		self._oidlearned.clear()
+		self._openOIDFile()
+
+	def _oidName(self, oid):
+		""" Returns the symbolic name for the sequence of sub-identifiers
+		    "oid" according to the compiled OID file, eg.
+		    "SIMPLE-MIB::simpleTable.1", or None if it does not know any of
+		    its prefixes. """
+
+		if self._oidfile is None:
+			return None
+		if self._oidnames is None:
+			self._oidnames = self._oidfile.names()
+		oid = tuple(oid)
+		for i in range(len(oid), 0, -1):
+			name = self._oidnames.get(oid[:i])
+			if name is not None:
+				return ".".join([name] + [str(x) for x in oid[i:]])
+		return None
+
+	def _loadMIBModule(self, module):
+		""" Loads the MIB module "module" and the modules it imports, unless
+		    already done. read_module() does not report failure, so we ask
+		    which_module() whether the module is known afterwards. Resolving
+		    names from a module that could not be loaded fails.
+
+		    Unlike with the MIBFiles, the OID cache stays valid: loading
+		    modules adds names but does not change what names resolved
+		    before resolve to, and failed resolutions are not cached. """
+
+		if module in self._mibModules:
+			return
+
+		started = _monotonic()
+		libnsa.read_module(b(module))
+		self._mibSeconds += _monotonic() - started
+		if libnsa.which_module(b(module)) >= 0:
+			self._mibModules.append(module)
+
+	def mibLoadReport(self):
+		""" Returns a dictionary describing the MIBs loaded by the agent
+		    itself: "lazy" indicates whether LazyMIBs is in effect, "modules"
+		    lists the MIBFiles and, in the order of loading, the MIB modules
+		    loaded on demand (not including the modules they import) and
+		    "seconds" is the time spent initializing the MIB parser and
+		    loading all of them. """
+
+		return {
+			"lazy":    bool(self.UseMIBFiles and self.LazyMIBs),
+			"modules": list(self._mibModules),
+			"seconds": self._mibSeconds
+		}
+
+	def _mibsChanged(self):
+		""" Must be called whenever MIBs get loaded, as OID strings may
+		    resolve differently afterwards. """
+
+		self._oidcache.clear()
+
+	def _prepareRegistration(self, oidstr, writable = True, oid = None, handler = None):
 		""" Prepares the registration of an SNMP object.
 
 		    "oidstr" is the OID to register the object at.
-		    "writable" indicates whether "snmpset" is allowed. """
+		    "writable" indicates whether "snmpset" is allowed.
+		    "oid" optionally is the (oid, oid_len) tuple "oidstr" has already
+		    been resolved to.
+		    "handler" optionally is a SNMPNodeHandler that will handle all
+		    requests for the OID. """
 
 		# Make sure the agent has not been start()ed yet
 		if self._status != netsnmpAgentStatus.REGISTRATION:
 			raise netsnmpAgentException("Attempt to register SNMP object "
 			                            "after agent has been started!")
 
-		oid, oid_len = self.determine_oid_and_length(oidstr)
+		if oid is None:
+			oid = self.determine_oid_and_length(oidstr)
+		oid, oid_len = oid
 
 		# Do we allow SNMP SETting to this OID?
 		handler_modes = HANDLER_CAN_RWRITE if writable \
@@ -426,11 +3430,11 @@ class netsnmpAgent(object):
 
 		# Create the netsnmp_handler_registration structure. It notifies
 		# net-snmp that we will be responsible for anything below the given
-		# OID. We use this for leaf nodes only, processing of subtrees will be
-		# left to net-snmp.
+		# OID. Unless a custom "handler" was given, we use this for leaf nodes
+		# only, processing of subtrees will be left to net-snmp.
 		handler_reginfo = libnsa.netsnmp_create_handler_registration(
 			b(oidstr),
-			None,
+			handler,
 			oid,
 			oid_len,
 			handler_modes
@@ -439,8 +3443,8 @@ class netsnmpAgent(object):
 		return handler_reginfo
 
 	def VarTypeClass(property_func):
-		""" Decorator that transforms a simple property_func into a class
-		    factory returning instances of a class for the particular SNMP
+		""" Decorator that transforms a simple property_func into a factory
+		    method returning instances of a class for the particular SNMP
 		    variable type. property_func is supposed to return a dictionary with
 		    the following elements:
 		    - "ctype"           : A reference to the ctypes constructor method
@@ -456,143 +3460,38 @@ class netsnmpAgent(object):
 		                          eg. 0 or "".
 		    - "asntype"         : A constant defining the SNMP variable type
 		                          from an ASN.1 perspective, eg. ASN_INTEGER.
-		    - "context"         : A string defining the context name for the
-		                          SNMP variable
-		    - "callback"        : An optional function that is called when a
-		                          SNMP variable is retrieved or set
 
-		    The class instance returned will have no association with net-snmp
-		    yet. Use the Register() method to associate it with an OID. """
+		    The class is created once, at decoration time, and shared by all
+		    SNMP objects of that type. If the factory method is called without
+		    "oidstr", the instance returned will have no association with
+		    net-snmp. """
 
-		# This is the replacement function, the "decoration"
-		def create_vartype_class(self, initval = None, oidstr = None, writable = True, context = "", callback = None):
-			agent = self
-
-			# Call the original property_func to retrieve this variable type's
-			# properties. Passing "initval" to property_func may seem pretty
-			# useless as it won't have any effect and we use it ourselves below.
-			# However we must supply it nevertheless since it's part of
-			# property_func's function signature which THIS function shares.
-			# That's how Python's decorators work.
-			props = property_func(self, initval)
-
-			# Use variable type's default initval if we weren't given one
-			if initval == None:
-				initval = props["initval"]
-
-			# Create a class to wrap ctypes' access semantics and enable
-			# Register() to do class-specific registration work.
-			#
-			# Since the part behind the "class" keyword can't be a variable, we
-			# use the proxy name "cls" and overwrite its __name__ property
-			# after class creation.
-			class cls(object):
-				def __init__(self):
-					for prop in ["flags", "asntype"]:
-						setattr(self, "_{0}".format(prop), props[prop])
-
-					# Create the ctypes class instance representing the variable
-					# to be handled by the net-snmp C API. If this variable type
-					# has no fixed size, pass the maximum size as second
-					# argument to the constructor.
-					if props["flags"] == WATCHER_FIXED_SIZE:
-						self._cvar      = props["ctype"](initval if isnum(initval) else b(initval))
-						self._data_size = ctypes.sizeof(self._cvar)
-						self._max_size  = self._data_size
-					else:
-						self._cvar      = props["ctype"](initval if isnum(initval) else b(initval), props["max_size"])
-						self._data_size = len(self._cvar.value)
-						self._max_size  = max(self._data_size, props["max_size"])
-
-					if oidstr:
-						# Prepare the netsnmp_handler_registration structure.
-						self._callback_handler = None
-						if callback != None:
-							# We defined a Python function that needs a ctypes conversion so it can
-							# be called by C code such as net-snmp. That's what SNMPNodeHandler() is
-							# used for. However we also need to store the reference in "self" as it
-							# will otherwise be lost at the exit of this function so that net-snmp's
-							# attempt to call it would end in nirvana...
-							self._callback_handler = _build_callback_handler(callback)
-
-						handler_reginfo = agent._prepareRegistration(oidstr, writable)
-						handler_reginfo.contents.contextName = b(context)
-
-						# Create the netsnmp_watcher_info structure.
-						self._watcher = libnsX.netsnmp_create_watcher_info(
-							self.cref(),
-							self._data_size,
-							self._asntype,
-							self._flags
-						)
+		# Call the original property_func once to retrieve this variable
+		# type's properties. They are the same for every SNMP object of this
+		# type and thus become class attributes.
+		props = property_func(None)
 
-						# Explicitly set netsnmp_watcher_info structure's
-						# max_size parameter. netsnmp_create_watcher_info6 would
-						# have done that for us but that function was not yet
-						# available in net-snmp 5.4.x.
-						self._watcher.contents.max_size = self._max_size
+		# Create the class to wrap ctypes' access semantics and to do the
+		# class-specific registration work.
+		if props["asntype"] in [ASN_COUNTER, ASN_COUNTER64]:
+			base = _CounterVarType
+		else:
+			base = _VarType
+		cls = type(property_func.__name__, (base,), {
+			"__slots__" : (),
+			"_props"    : props,
+			"_flags"    : props["flags"],
+			"_asntype"  : props["asntype"],
+		})
 
-						# Register handler and watcher with net-snmp.
-						result = libnsX.netsnmp_register_watched_scalar(
-							handler_reginfo,
-							self._watcher
-						)
-						if result != 0:
-							raise netsnmpAgentException("Error registering variable with net-snmp!")
-
-						# If present, inject the custom callback handler before the watcher
-						if self._callback_handler is not None:
-							_inject_custom_handler(self._callback_handler, handler_reginfo)
-
-						# Finally, we keep track of all registered SNMP objects for the
-						# getRegistered() method.
-						agent._objs[context][oidstr] = self
-
-				def value(self):
-					val = self._cvar.value
-
-					if self._asntype != ASN_OPAQUE_FLOAT and self._asntype != ASN_OPAQUE_DOUBLE:
-						if isnum(val):
-							# Python 2.x will automatically switch from the "int"
-							# type to the "long" type, if necessary. Python 3.x
-							# has no limits on the "int" type anymore.
-							val = int(val)
-						else:
-							val = u(val)
-
-					return val
-
-				def cref(self, **kwargs):
-					return ctypes.byref(self._cvar) if self._flags == WATCHER_FIXED_SIZE \
-					                                else self._cvar
-
-				def update(self, val):
-					if self._asntype == ASN_COUNTER and val >> 32:
-						val = val & 0xFFFFFFFF
-					elif self._asntype == ASN_COUNTER64 and val >> 64:
-						val = val & 0xFFFFFFFFFFFFFFFF
-					elif self.__class__.__name__ == 'Gauge32' and val >> 32:
-						val = 0xFFFFFFFF
-					self._cvar.value = val
-					if props["flags"] & WATCHER_MAX_SIZE == WATCHER_MAX_SIZE:
-						if len(val) > self._max_size:
-							raise netsnmpAgentException(
-								"Value passed to update() truncated: {0} > {1} "
-								"bytes!".format(len(val), self._max_size)
-							)
-						self._data_size = self._watcher.contents.data_size = len(val)
-
-				if props["asntype"] in [ASN_COUNTER, ASN_COUNTER64]:
-					def increment(self, count=1):
-						self.update(self.value() + count)
-
-			cls.__name__ = property_func.__name__
-
-			# Return an instance of the just-defined class to the agent
-			return cls()
+		# This is the replacement function, the "decoration"
+		def create_vartype_class(self, initval = None, oidstr = None, writable = True, context = "", callback = None):
+			# Return an instance of the variable type's class to the agent
+			return cls(self, initval, oidstr, writable, context, callback)
 
 		return create_vartype_class
 
+
 	@VarTypeClass
 	def Integer32(self, initval = None, oidstr = None, writable = True, context = "", callback = None):
 		return {
@@ -698,517 +3597,286 @@ class netsnmpAgent(object):
 	# or alternatively if MIB support is enabled the fully qualified MIB value,
 	#   eg: "IF-MIB::ifIndex"
 	def ObjectIdentifier(self, initval = None, oidstr = None, writable = False, context = "", callback = None):
-		agent = self
-
-		class ObjectIdentifier(object):
-			def __init__(self):
-				self._flags     = WATCHER_MAX_SIZE & WATCHER_SIZE_UNIT_OIDS
-				self._asntype   = ASN_OBJECT_ID
-				self._max_size  = MAX_OID_LEN * ctypes.sizeof(c_oid)
-				self._set_oid_value(initval)
-
-				if oidstr:
-					# Prepare the netsnmp_handler_registration structure.
-					self._callback_handler = None
-					if callback != None:
-						# We defined a Python function that needs a ctypes conversion so it can
-						# be called by C code such as net-snmp. That's what SNMPNodeHandler() is
-						# used for. However we also need to store the reference in "self" as it
-						# will otherwise be lost at the exit of this function so that net-snmp's
-						# attempt to call it would end in nirvana...
-						self._callback_handler = _build_callback_handler(callback)
-
-					handler_reginfo = agent._prepareRegistration(oidstr, writable)
-					handler_reginfo.contents.contextName = b(context)
-
-					# Create the netsnmp_watcher_info structure.
-					watcher = libnsX.netsnmp_create_watcher_info(
-						self.cref(),
-						self._data_size,
-						self._asntype,
-						self._flags
-					)
-					watcher._maxsize = self._max_size
-
-					# Register handler and watcher with net-snmp.
-					result = libnsX.netsnmp_register_watched_instance(
-						handler_reginfo,
-						watcher
-					)
-					if result != 0:
-						raise netsnmpAgentException("Error registering variable with net-snmp!")
-
-					if self._callback_handler is not None:
-						_inject_custom_handler(self._callback_handler, handler_reginfo)
-
-					# Finally, we keep track of all registered SNMP objects for the
-					# getRegistered() method.
-					agent._objs[context][oidstr] = self
-
-			def _set_oid_value(self, oid_value):
-				if oid_value is not None:
-					oid, oid_len = agent.determine_oid_and_length(oid_value)
-					self._object_id = oid
-					self._cvar      = self._object_id
-					self._data_size = oid_len.value * ctypes.sizeof(c_oid)
-				else:
-					self._object_id = (c_oid * 0)()
-					self._cvar      = self._object_id
-					self._data_size = 0
-
-			def value(self):
-				return "." + ".".join([str(oid) for oid in self._object_id])
-
-			def cref(self):
-				return ctypes.byref(self._cvar)
-
-			def update(self, val):
-				raise NotImplementedError("ObjectIdentifier type does not currently support update!")
-
-		# Return an instance of the just-defined class to the agent
-		return ObjectIdentifier()
-
+		return _ObjectIdentifier(self, initval, oidstr, writable, context, callback)
 
 	# IP addresses are stored as unsigned integers, but the Python interface
 	# should use strings. So we need a special class.
 	def IpAddress(self, initval = "0.0.0.0", oidstr = None, writable = True, context = "", callback = None):
-		agent = self
-
-		class IpAddress(object):
-			def __init__(self):
-				self._flags     = WATCHER_FIXED_SIZE
-				self._asntype   = ASN_IPADDRESS
-				self._cvar      = ctypes.c_uint(0)
-				self._data_size = ctypes.sizeof(self._cvar)
-				self._max_size  = self._data_size
-				self.update(initval)
-
-				if oidstr:
-					# Prepare the netsnmp_handler_registration structure.
-					self._callback_handler = None
-					if callback != None:
-						# We defined a Python function that needs a ctypes conversion so it can
-						# be called by C code such as net-snmp. That's what SNMPNodeHandler() is
-						# used for. However we also need to store the reference in "self" as it
-						# will otherwise be lost at the exit of this function so that net-snmp's
-						# attempt to call it would end in nirvana...
-						self._callback_handler = _build_callback_handler(callback)
-
-					handler_reginfo = agent._prepareRegistration(oidstr, writable)
-					handler_reginfo.contents.contextName = b(context)
-
-					# Create the netsnmp_watcher_info structure.
-					watcher = libnsX.netsnmp_create_watcher_info(
-						self.cref(),
-						ctypes.sizeof(self._cvar),
-						ASN_IPADDRESS,
-						WATCHER_FIXED_SIZE
-					)
-					watcher._maxsize = ctypes.sizeof(self._cvar)
-
-					# Register handler and watcher with net-snmp.
-					result = libnsX.netsnmp_register_watched_instance(
-						handler_reginfo,
-						watcher
-					)
-					if result != 0:
-						raise netsnmpAgentException("Error registering variable with net-snmp!")
-
-					if self._callback_handler is not None:
-						_inject_custom_handler(self._callback_handler, handler_reginfo)
-
-					# Finally, we keep track of all registered SNMP objects for the
-					# getRegistered() method.
-					agent._objs[context][oidstr] = self
-
-			def value(self):
-				# Get string representation of IP address.
-				return socket.inet_ntoa(
-					struct.pack("I", self._cvar.value)
-				)
-
-			def cref(self, **kwargs):
-				# Due to an unfixed Net-SNMP issue (see
-				# https://sourceforge.net/p/net-snmp/bugs/2136/) we have
-				# to convert the value to host byte order if it shall be
-				# used as table index.
-				if kwargs.get("is_table_index", False) == False:
-					return ctypes.byref(self._cvar)
-				else:
-					_cidx = ctypes.c_uint(0)
-					_cidx.value = struct.unpack("I", struct.pack("!I", self._cvar.value))[0]
-					return ctypes.byref(_cidx)
-
-			def update(self, val):
-				# Convert dotted decimal IP address string to ctypes
-				# unsigned int in network byte order.
-				self._cvar.value = struct.unpack(
-					"I",
-					socket.inet_aton(val)
-				)[0]
-
-		# Return an instance of the just-defined class to the agent
-		return IpAddress()
+		return _IpAddress(self, initval, oidstr, writable, context, callback)
 
 	# TruthValues are stored as integers, but the Python interface
 	# should use bool, so we need a special class.
 	def TruthValue(self, initval = False, oidstr = None, writable = True, context = "", callback = None):
-		agent = self
-
-		class TruthValue(object):
-			def __init__(self):
-				self._flags     = WATCHER_FIXED_SIZE
-				self._asntype   = ASN_INTEGER
-				self._cvar      = ctypes.c_int(0)
-				self._data_size = ctypes.sizeof(self._cvar)
-				self._max_size  = self._data_size
-				self.update(initval)
-
-				if oidstr:
-					# Prepare the netsnmp_handler_registration structure.
-					self._callback_handler = None
-					if callback != None:
-						# We defined a Python function that needs a ctypes conversion so it can
-						# be called by C code such as net-snmp. That's what SNMPNodeHandler() is
-						# used for. However we also need to store the reference in "self" as it
-						# will otherwise be lost at the exit of this function so that net-snmp's
-						# attempt to call it would end in nirvana...
-						self._callback_handler = _build_callback_handler(callback)
-
-					handler_reginfo = agent._prepareRegistration(oidstr, writable)
-					handler_reginfo.contents.contextName = b(context)
-
-					# Create the netsnmp_watcher_info structure.
-					watcher = libnsX.netsnmp_create_watcher_info(
-						self.cref(),
-						ctypes.sizeof(self._cvar),
-						ASN_INTEGER,
-						WATCHER_FIXED_SIZE
-					)
-					watcher._maxsize = ctypes.sizeof(self._cvar)
-
-					# Register handler and watcher with net-snmp.
-					result = libnsX.netsnmp_register_watched_instance(
-						handler_reginfo,
-						watcher
-					)
-					if result != 0:
-						raise netsnmpAgentException("Error registering variable with net-snmp!")
-
-					if self._callback_handler is not None:
-						_inject_custom_handler(self._callback_handler, handler_reginfo)
+		return _TruthValue(self, initval, oidstr, writable, context, callback)
+
+	def Table(self, oidstr, indexes, columns, counterobj = None, extendable = False, context = "", callback = None, rowTTL = None, mirror = False):
+		return _Table(self, oidstr, indexes, columns, counterobj, extendable, context, callback, rowTTL, mirror)
+
+	def ScalarGroup(self, oidstr, context = ""):
+		""" Creates a group of scalars served by a single handler registered
+		    for the subtree at "oidstr", instead of one registration per
+		    scalar. Instances are added to the group with its add() method,
+		    eg. group.add("1.0", agent.Integer32(42)). """
+
+		return _ScalarGroup(self, oidstr, context)
+
+	def VirtualTable(self, oidstr, indexes, columns, provider, context = ""):
+		""" Creates a read-only table whose rows are never copied into
+		    net-snmp but served by a single handler asking "provider".
+
+		    "indexes" and "columns" are specified as for Table(). "provider"
+		    is an object implementing two methods, both addressing rows by
+		    their index OID, ie. a tuple of integers (see the returned
+		    object's encodeIndex() and decodeIndex() methods):
+		    - get(index, column) returns the value of the cell in the row
+		      "index" and column "column" or None if there is no such cell.
+		    - next(index, column) returns an (index, value) tuple for the
+		      cell in column "column" with the lexicographically next index
+		      OID following "index", or for the column's first cell if
+		      "index" is None. Returns None if there is no further cell.
+		    Values are plain Python values which get converted according to
+		    the type of the column's default SNMP object. """
+
+		return _VirtualTable(self, oidstr, indexes, columns, provider, context)
+
+	def ColumnarTable(self, oidstr, indexes, columns, context = ""):
+		""" Creates a read-only table that keeps its data column-wise in
+		    typed arrays (lists for non-numeric columns) instead of a
+		    netsnmp_table_data_set. It is served by a single handler that
+		    looks up rows by hash for GET and by binary search over the
+		    sorted index OIDs for GETNEXT.
+
+		    "indexes" and "columns" are specified as for Table(). The
+		    contents are set in bulk through the returned object's setRows()
+		    and setColumn() methods or cell by cell through setCell(). """
+
+		return _ColumnarTable(self, oidstr, indexes, columns, context)
+
+	# SNMP object types supported by registerMany()
+	_scalarTypes = (
+		"Integer32", "Unsigned32", "Gauge32", "Counter32", "Counter64",
+		"TimeTicks", "Float", "Double", "OctetString", "DisplayString",
+		"ObjectIdentifier", "IpAddress", "TruthValue"
+	)
+
+	def registerMany(self, spec):
+		""" Registers a large number of SNMP scalar objects in one go.
+
+		    "spec" is an iterable of (type, oidstr, initval, writable,
+		    context) records, where "type" is the name of the SNMP object
+		    type, eg. "Integer32". Trailing record elements may be omitted
+		    and default to the same values as the single object methods,
+		    eg. Integer32(), do.
+
+		    All records are validated and all OIDs resolved before the first
+		    object is registered with net-snmp, so that an invalid record
+		    leaves the agent unchanged.
+
+		    Returns a tuple with the registered SNMP objects in the order of
+		    "spec". """
 
-					# Finally, we keep track of all registered SNMP objects for the
-					# getRegistered() method.
-					agent._objs[context][oidstr] = self
-
-			def value(self):
-				# Get boolean representation of TruthValue.
-				return True if self._cvar.value == TV_TRUE else False
-
-			def cref(self, **kwargs):
-				return ctypes.byref(self._cvar)
+		# Make sure the agent has not been start()ed yet
+		if self._status != netsnmpAgentStatus.REGISTRATION:
+			raise netsnmpAgentException("Attempt to register SNMP object "
+			                            "after agent has been started!")
 
-			def update(self, val):
-				# Convert boolean to corresponding integer values
-				if isinstance(val, bool):
-					self._cvar.value = TV_TRUE if val == True else TV_FALSE
-				else:
-					raise netsnmpAgentException("TruthValue must be True or False")
-
-		# Return an instance of the just-defined class to the agent
-		return TruthValue()
-
-	def Table(self, oidstr, indexes, columns, counterobj = None, extendable = False, context = "", callback = None):
-		agent = self
-
-		# Define a Python class to provide access to the table.
-		class Table(object):
-			def __init__(self, oidstr, idxobjs, coldefs, counterobj, extendable, context):
-				# Create a netsnmp_table_data_set structure, representing both
-				# the table definition and the data stored inside it. We use the
-				# oidstr as table name.
-				self._dataset = libnsX.netsnmp_create_table_data_set(
-					ctypes.c_char_p(b(oidstr))
+		# First pass: create the SNMP objects without associating them with
+		# net-snmp and resolve their OIDs
+		records = []
+		seen    = set()
+		for record in spec:
+			if not 2 <= len(record) <= 5:
+				raise netsnmpAgentException(
+					"Invalid registerMany() record: {0}".format(record)
 				)
+			vartype, oidstr = record[0], record[1]
+			initval  = record[2] if len(record) > 2 else None
+			context  = record[4] if len(record) > 4 else ""
 
-				# Define the table row's indexes
-				for idxobj in idxobjs:
-					libnsX.netsnmp_table_dataset_add_index(
-						self._dataset,
-						idxobj._asntype
-					)
-
-				# Define the table's columns and their default values
-				for coldef in coldefs:
-					colno    = coldef[0]
-					defobj   = coldef[1]
-					writable = coldef[2] if len(coldef) > 2 \
-					                     else 0
-
-					result = libnsX.netsnmp_table_set_add_default_row(
-						self._dataset,
-						colno,
-						defobj._asntype,
-						writable,
-						defobj.cref(),
-						defobj._data_size
-					)
-					if result != SNMPERR_SUCCESS:
-						raise netsnmpAgentException(
-							"netsnmp_table_set_add_default_row() failed with "
-							"error code {0}!".format(result)
-						)
-
-				self._callback_handler = None
-				if callback != None:
-					# We defined a Python function that needs a ctypes conversion so it can
-					# be called by C code such as net-snmp. That's what SNMPNodeHandler() is
-					# used for. However we also need to store the reference in "self" as it
-					# will otherwise be lost at the exit of this function so that net-snmp's
-					# attempt to call it would end in nirvana...
-					self._callback_handler = _build_callback_handler(callback)
-
-				# Register handler and table_data_set with net-snmp.
-				self._handler_reginfo = agent._prepareRegistration(oidstr, extendable)
-				self._handler_reginfo.contents.contextName = b(context)
-				result = libnsX.netsnmp_register_table_data_set(
-					self._handler_reginfo,
-					self._dataset,
-					None
+			if vartype not in self._scalarTypes:
+				raise netsnmpAgentException(
+					"Unsupported SNMP object type for registerMany(): "
+					"{0}".format(vartype)
 				)
-				if result != SNMP_ERR_NOERROR:
-					raise netsnmpAgentException(
-						"Error code {0} while registering table with "
-						"net-snmp!".format(result)
+			oid = self.determine_oid_and_length(oidstr)
+			key = (context, tuple(oid[0]))
+			if key in seen or (context in self._objs and key[1] in self._objs[context]):
+				raise netsnmpAgentException(
+					"Duplicate registration of {0} in context \"{1}\"!".format(
+						oidstr, context
 					)
-
-				if self._callback_handler is not None:
-					_inject_custom_handler(self._callback_handler, self._handler_reginfo)
-
-				# Finally, we keep track of all registered SNMP objects for the
-				# getRegistered() method.
-				agent._objs[context][oidstr] = self
-
-				# If "counterobj" was specified, use it to track the number
-				# of table rows
-				if counterobj:
-					counterobj.update(0)
-				self._counterobj = counterobj
-
-			def addRow(self, idxobjs):
-				dataset = self._dataset
-
-				# Define a Python class to provide access to the table row.
-				class TableRow(object):
-					def __init__(self, idxobjs):
-						# Create the netsnmp_table_set_storage structure for
-						# this row.
-						self._table_row = libnsX.netsnmp_table_data_set_create_row_from_defaults(
-							dataset.contents.default_row
-						)
-
-						# Add the indexes
-						for idxobj in idxobjs:
-							result = libnsa.snmp_varlist_add_variable(
-								ctypes.pointer(self._table_row.contents.indexes),
-								None,
-								0,
-								idxobj._asntype,
-								idxobj.cref(is_table_index=True),
-								idxobj._data_size
-							)
-							if result == None:
-								raise netsnmpAgentException("snmp_varlist_add_variable() failed!")
-
-					def setRowCell(self, column, snmpobj):
-						result = libnsX.netsnmp_set_row_column(
-							self._table_row,
-							column,
-							snmpobj._asntype,
-							snmpobj.cref(),
-							snmpobj._data_size
-						)
-						if result != SNMPERR_SUCCESS:
-							raise netsnmpAgentException("netsnmp_set_row_column() failed with error code {0}!".format(result))
-
-				row = TableRow(idxobjs)
-
-				libnsX.netsnmp_table_dataset_add_row(
-					dataset,        # *table
-					row._table_row  # row
 				)
+			seen.add(key)
 
-				if self._counterobj:
-					self._counterobj.update(self._counterobj.value() + 1)
-
-				return row
-
-			def value(self):
-				# Because tables are more complex than scalar variables, we
-				# return a dictionary representing the table's structure and
-				# contents instead of a simple string.
-				retdict = {}
-
-				# The first entry will contain the defined columns, their types
-				# and their defaults, if set. We use array index 0 since it's
-				# impossible for SNMP tables to have a row with that index.
-				retdict[0] = {}
-				col = self._dataset.contents.default_row
-				while bool(col):
-					retdict[0][int(col.contents.column)] = {}
-
-					asntypes = {
-						ASN_INTEGER:    "Integer",
-						ASN_OBJECT_ID:  "ObjectIdentifier",
-						ASN_OCTET_STR:  "OctetString",
-						ASN_IPADDRESS:  "IPAddress",
-						ASN_COUNTER:    "Counter32",
-						ASN_COUNTER64:  "Counter64",
-						ASN_UNSIGNED:   "Unsigned32",
-						ASN_TIMETICKS:  "TimeTicks"
-					}
-					retdict[0][int(col.contents.column)]["type"] = asntypes[col.contents.type]
-					if bool(col.contents.data):
-						if col.contents.type == ASN_OCTET_STR:
-							retdict[0][int(col.contents.column)]["value"] = u(ctypes.string_at(col.contents.data.string, col.contents.data_len))
-						elif col.contents.type == ASN_IPADDRESS:
-							uint_value = ctypes.cast(
-								(ctypes.c_int*1)(col.contents.data.integer.contents.value),
-								ctypes.POINTER(ctypes.c_uint)
-							).contents.value
-							retdict[0][int(col.contents.column)]["value"] = socket.inet_ntoa(struct.pack("I", uint_value))
-						else:
-							retdict[0][int(col.contents.column)]["value"] = col.contents.data.integer.contents.value
-					col = col.contents.next
-
-				# Next we iterate over the table's rows, creating a dictionary
-				# entry for each row after that row's index.
-				row = self._dataset.contents.table.contents.first_row
-				while bool(row):
-					# We want to return the row index in the same way it is
-					# shown when using "snmptable", eg. "aa" instead of 2.97.97.
-					# This conversion is actually quite complicated (see
-					# net-snmp's sprint_realloc_objid() in snmplib/mib.c and
-					# get*_table_entries() in apps/snmptable.c for details).
-					# All code below assumes eg. that the OID output format was
-					# not changed.
-
-					# snprint_objid() below requires a _full_ OID whereas the
-					# table row contains only the current row's identifer.
-					# Unfortunately, net-snmp does not have a ready function to
-					# get the full OID. The following code was modelled after
-					# similar code in netsnmp_table_data_build_result().
-					fulloid = ctypes.cast(
-						ctypes.create_string_buffer(
-							MAX_OID_LEN * ctypes.sizeof(c_oid)
-						),
-						c_oid_p
-					)
+			factory = getattr(self, vartype)
+			if initval is None:
+				snmpobj = factory()
+			else:
+				snmpobj = factory(initval)
 
-					# Registered OID
-					rootoidlen = self._handler_reginfo.contents.rootoid_len
-					for i in range(0, rootoidlen):
-						fulloid[i] = self._handler_reginfo.contents.rootoid[i]
-
-					# Entry
-					fulloid[rootoidlen] = 1
-
-					# Fake the column number. Unlike the table_data and
-					# table_data_set handlers, we do not have one here. No
-					# biggie, using a fixed value will do for our purposes as
-					# we'll do away with anything left of the first dot below.
-					fulloid[rootoidlen + 1] = 2
-
-					# Index data
-					indexoidlen = row.contents.index_oid_len
-					for i in range(0, indexoidlen):
-						fulloid[rootoidlen + 2 + i] = row.contents.index_oid[i]
-
-					# Convert the full OID to its string representation
-					oidcstr = ctypes.create_string_buffer(MAX_OID_LEN)
-					libnsa.snprint_objid(
-						oidcstr,
-						MAX_OID_LEN,
-						fulloid,
-						rootoidlen + 2 + indexoidlen
-					)
+			# ObjectIdentifiers are read-only by default
+			if len(record) > 3:
+				writable = record[3]
+			else:
+				writable = vartype != "ObjectIdentifier"
+
+			records.append((
+				snmpobj,
+				oidstr,
+				writable,
+				context,
+				oid
+			))
+
+		# Second pass: register everything with net-snmp
+		for snmpobj, oidstr, writable, context, oid in records:
+			snmpobj._register(self, oidstr, writable, context, None, oid)
+
+		return tuple(record[0] for record in records)
+
+	def unregister(self, oidstr, context = ""):
+		""" Unregisters the SNMP object registered at "oidstr" in "context"
+		    and returns it. "oidstr" may also be the OID of one of the
+		    object's instances, eg. a scalar's ".0" instance or a table
+		    cell.
+
+		    Scalar variables keep their value and may be used further, but
+		    not registered again. Tables lose their rows and must not be
+		    used anymore. Once the agent has been started, this must be
+		    called from the thread processing SNMP requests (ie. between
+		    check_and_process() calls). """
 
-					# And finally do away with anything left of the first dot
-					# so we keep the row index only
-					indices = oidcstr.value.split(b".", 1)[1]
-
-					# If it's a string, remove the double quotes. If it's a
-					# string containing an integer, make it one
-					try:
-						indices = int(indices)
-					except ValueError:
-						indices = u(indices.replace(b'"', b''))
-
-					# Finally, iterate over all columns for this row and add
-					# stored data, if present
-					retdict[indices] = {}
-					data = ctypes.cast(row.contents.data, ctypes.POINTER(netsnmp_table_data_set_storage))
-					while bool(data):
-						if bool(data.contents.data):
-							if data.contents.type == ASN_OCTET_STR:
-								retdict[indices][int(data.contents.column)] = u(ctypes.string_at(data.contents.data.string, data.contents.data_len))
-							elif data.contents.type == ASN_COUNTER64:
-								retdict[indices][int(data.contents.column)] = data.contents.data.counter64.contents.value
-							elif data.contents.type == ASN_IPADDRESS:
-								uint_value = ctypes.cast((ctypes.c_int*1)(
-									data.contents.data.integer.contents.value),
-									ctypes.POINTER(ctypes.c_uint)
-									).contents.value
-								retdict[indices][int(data.contents.column)] = socket.inet_ntoa(struct.pack("I", uint_value))
-							else:
-								retdict[indices][int(data.contents.column)] = data.contents.data.integer.contents.value
-						else:
-							retdict[indices] += {}
-						data = data.contents.next
-
-					row = row.contents.next
-
-				return retdict
-
-			def clear(self):
-				row = self._dataset.contents.table.contents.first_row
-				while bool(row):
-					nextrow = row.contents.next
-					libnsX.netsnmp_table_dataset_remove_and_delete_row(
-						self._dataset,
-						row
-					)
-					row = nextrow
-				if self._counterobj:
-					self._counterobj.update(0)
+		oid, oid_len = self.determine_oid_and_length(oidstr)
+		objs = self._objs.get(context)
+		entry = objs.find(oid[:oid_len.value]) if objs is not None else None
+		if entry is None:
+			raise netsnmpAgentException(
+				"No SNMP object registered at {0} in context \"{1}\"!".format(
+					oidstr, context
+				)
+			)
 
-		# Return an instance of the just-defined class to the agent
-		return Table(oidstr, indexes, columns, counterobj, extendable, context)
+		regoid, regoidstr, snmpobj = entry
+		snmpobj._unregister()
+		objs.remove(regoid)
+		return snmpobj
 
 	def getContexts(self):
 		""" Returns the defined contexts. """
 
 		return self._objs.keys()
 
-	def getRegistered(self, context = ""):
+	def getRegistered(self, context = "", prefix = None, types = None, includeTables = True):
 		""" Returns a dictionary with the currently registered SNMP objects.
 
 		    Returned is a dictionary objects for the specified "context",
-		    which defaults to the default context. """
+		    which defaults to the default context.
+
+		    The objects can be narrowed down to those registered at or below
+		    the OID "prefix" and to those whose type name, eg. "Integer32" or
+		    "Table", is in "types". With "includeTables" set to False, tables
+		    (including VirtualTables, ColumnarTables and ScalarGroups) are
+		    left out, which saves dumping their contents. """
 		myobjs = {}
-		try:
-			# Python 2.x
-			objs_iterator = self._objs[context].iteritems()
-		except AttributeError:
-			# Python 3.x
-			objs_iterator = self._objs[context].items()
-		for oidstr, snmpobj in objs_iterator:
+		for oid, oidstr, snmpobj in self._selectRegistered(context, prefix, types, includeTables):
+			myobjs[oidstr] = {
+				"type": type(snmpobj).__name__,
+				"value": snmpobj.value()
+			}
+		return myobjs
+
+	def changedSince(self, token = None, context = "", prefix = None, types = None, includeTables = True):
+		""" Like getRegistered(), but returns a tuple of a new token and a
+		    dictionary with only those objects that changed since the call
+		    that returned "token". Without a "token", all objects are
+		    returned. Feeding each call the token returned by the previous
+		    one thus yields the changes incrementally.
+
+		    VirtualTables get their contents from their provider, so they
+		    are always returned. Changes of Table cells bound with
+		    TableRow.bindCell() are not noticed.
+
+		    Every object carries the generation of its last change. The
+		    token is the generation current when the call started, so
+		    objects changing while it runs get returned (again) next time. """
+		current = next(_generations)
+		myobjs = {}
+		for oid, oidstr, snmpobj in self._selectRegistered(context, prefix, types, includeTables):
+			generation = snmpobj._changeGeneration(current)
+			if token is not None and generation is not None and generation <= token:
+				continue
 			myobjs[oidstr] = {
 				"type": type(snmpobj).__name__,
 				"value": snmpobj.value()
 			}
-		return dict(myobjs)
+		return (current, myobjs)
+
+	def _selectRegistered(self, context, prefix, types, includeTables):
+		""" Yields the (oid, oidstr, snmpobj) tuples for getRegistered() and
+		    changedSince(). """
+
+		objs = self._objs.get(context)
+		if objs is None:
+			return
+
+		if prefix is None:
+			prefix = ()
+		elif not isinstance(prefix, tuple):
+			oid, oid_len = self.determine_oid_and_length(prefix)
+			prefix = tuple(oid[:oid_len.value])
+		if types is not None:
+			types = frozenset(types)
+
+		for oid, oidstr, snmpobj in objs.items(prefix):
+			if not includeTables \
+			and isinstance(snmpobj, (_Table, _SubtreeHandler)):
+				continue
+			if types is not None and type(snmpobj).__name__ not in types:
+				continue
+			yield (oid, oidstr, snmpobj)
+
+	def memoryReport(self):
+		""" Returns a dictionary describing the C memory used by the
+		    registered SNMP objects, to find out eg. which table grows:
+
+		    - "tables" maps context names to dictionaries mapping the OIDs
+		      of the Tables, VirtualTables and ColumnarTables registered in
+		      that context to the dictionaries returned by their
+		      memoryUsage() methods.
+		    - "scalars" is the number of registered scalar variables,
+		      including the instances of ScalarGroups, and "scalarBytes"
+		      the size of their C variables.
+		    - "rows", "cells" and "bytes" are the totals over all tables,
+		      "bytes" including "scalarBytes".
+
+		    All numbers are maintained incrementally, so the cost of the
+		    report depends on the number of registered objects only. """
+
+		report = {
+			"tables":      {},
+			"scalars":     0,
+			"scalarBytes": 0,
+			"rows":        0,
+			"cells":       0,
+			"bytes":       0
+		}
+		for context, objs in self._objs.items():
+			for oid, oidstr, snmpobj in objs.items():
+				if isinstance(snmpobj, (_Table, _VirtualTable)):
+					usage = snmpobj.memoryUsage()
+					report["tables"].setdefault(context, {})[oidstr] = usage
+					report["rows"]  += usage["rows"]
+					report["cells"] += usage["cells"]
+					report["bytes"] += usage["bytes"]
+				elif isinstance(snmpobj, _ScalarGroup):
+					for instance, writable in snmpobj._cells.values():
+						report["scalars"]     += 1
+						report["scalarBytes"] += ctypes.sizeof(instance._cvar)
+				elif isinstance(snmpobj, _SNMPObject):
+					report["scalars"]     += 1
+					report["scalarBytes"] += ctypes.sizeof(snmpobj._cvar)
+		report["bytes"] += report["scalarBytes"]
+		return report
 
 	def get_agent_uptime(self):
 		"""
@@ -1229,11 +3897,345 @@ class netsnmpAgent(object):
 				msg = msg.format(self.MasterSocket)
 				raise netsnmpAgentException(msg)
 
+			# Compile the names resolved during registration for the next
+			# run. The file is an optimization only, so failing to write it
+			# must not keep the agent from running.
+			if self._oidlearned and self.UseMIBFiles:
+				try:
+					self.saveOIDCache()
+				except (IOError, OSError):
+					pass
+
 	def check_and_process(self, block=True):
 		""" Processes incoming SNMP requests.
 		    If optional "block" argument is True (default), the function
 		    will block until a SNMP packet is received. """
-		return libnsa.agent_check_and_process(int(bool(block)))
+
+		# Requests delegated so far must be able to wake up a blocking call.
+		# Delegations completed before the self-pipe existed are handled
+		# right away.
+		if block and self._delegate_pending and self._delegate_pipe is None:
+			self._openDelegatePipe()
+			self._completeDelegated()
+
+		res = libnsa.agent_check_and_process(int(bool(block)))
+		self._completeDelegated()
+		return res
+
+	def delegate(self, handler, reginfo, reqinfo, requests, func, complete = None, executor = None):
+		""" Delegates the processing of requests to a thread or process pool.
+
+		    Meant to be called from a custom callback (see the "callback"
+		    argument of the SNMP object methods) whose processing would take
+		    too long to do synchronously, eg.
+
+		      def callback(handler, reginfo, reqinfo, requests):
+		          return agent.delegate(handler, reginfo, reqinfo, requests,
+		                                lookup_data, complete=store_data)
+
+		    "handler", "reginfo", "reqinfo" and "requests" are the callback's
+		    arguments. The requests get marked delegated and "func" is
+		    submitted to "executor", a concurrent.futures executor that
+		    defaults to a thread pool owned by the agent. Meanwhile other SNMP
+		    requests continue to be served.
+
+		    Once "func" has finished, the optional "complete" function is
+		    called with its result from within the thread processing SNMP
+		    requests, so it may safely update SNMP objects. Afterwards the
+		    remaining handlers, eg. the one serving a scalar's value, are
+		    called and the response gets sent. If "func" or "complete" raise
+		    an exception, the requests fail with a genErr.
+
+		    Completed requests are answered from within the asyncio event
+		    loop, if asyncio_attach() was used, or otherwise from within
+		    check_and_process(). A blocking check_and_process() gets woken
+		    up through a self-pipe, which is only created for this purpose.
+
+		    Returns SNMP_ERR_NOERROR so it can be used as the callback's
+		    return value. """
+
+		if executor is None:
+			if self._delegate_executor is None:
+				import concurrent.futures
+				self._delegate_executor = concurrent.futures.ThreadPoolExecutor(4)
+			executor = self._delegate_executor
+
+		# Have net-snmp keep the request information around until we're done
+		cache = libnsa.netsnmp_create_delegated_cache(
+			handler,
+			reginfo,
+			reqinfo,
+			requests,
+			None
+		)
+		request = requests
+		while bool(request):
+			request.contents.delegated = 1
+			request = ctypes.cast(request.contents.next, netsnmp_request_info_p)
+		self._delegate_pending += 1
+
+		def done(future):
+			# Called from the executor's thread, so we only queue the
+			# completion
+			self._delegate_done.append((cache, future, complete))
+			if self._aio_loop is not None:
+				self._aio_loop.call_soon_threadsafe(self._completeDelegated)
+			elif self._delegate_pipe is not None:
+				try:
+					os.write(self._delegate_pipe[1], b"x")
+				except OSError:
+					# The pipe is full, so a wakeup is pending anyway
+					pass
+
+		executor.submit(func).add_done_callback(done)
+
+		return SNMP_ERR_NOERROR
+
+	def _openDelegatePipe(self):
+		""" Creates the self-pipe through which finished delegations wake up
+		    a check_and_process() call blocking in select(). Its read end is
+		    watched by agent_check_and_process() along with net-snmp's own
+		    file descriptors. Not used with asyncio_attach(), where finished
+		    delegations are scheduled on the event loop directly. """
+
+		import fcntl
+
+		self._delegate_pipe = os.pipe()
+		for fd in self._delegate_pipe:
+			flags = fcntl.fcntl(fd, fcntl.F_GETFL)
+			fcntl.fcntl(fd, fcntl.F_SETFL, flags | os.O_NONBLOCK)
+		if libnsa.register_readfd(self._delegate_pipe[0], self._delegate_wakeup, None) != 0:
+			raise netsnmpAgentException("register_readfd() failed!")
+
+	def _delegateWakeup(self, fd, data):
+		""" net-snmp external event callback for the self-pipe's read end. """
+
+		try:
+			while os.read(fd, 4096):
+				pass
+		except OSError:
+			pass
+		self._completeDelegated()
+
+	def _completeDelegated(self):
+		""" Completes delegated requests whose work has been done. """
+
+		if not self._delegate_done:
+			return
+
+		while self._delegate_done:
+			cache, future, complete = self._delegate_done.popleft()
+			self._delegate_pending -= 1
+
+			# The requests may have timed out or the session may have gone
+			# away in the meantime
+			if not bool(libnsa.netsnmp_handler_check_cache(cache)):
+				continue
+
+			requests = cache.contents.requests
+			request = requests
+			while bool(request):
+				request.contents.delegated = 0
+				request = ctypes.cast(request.contents.next, netsnmp_request_info_p)
+
+			try:
+				result = future.result()
+				if complete is not None:
+					complete(result)
+				ret = SNMP_ERR_NOERROR
+			except Exception:
+				ret = SNMP_ERR_GENERR
+
+			if ret == SNMP_ERR_NOERROR and bool(cache.contents.handler.contents.next):
+				ret = libnsa.netsnmp_call_next_handler(
+					cache.contents.handler,
+					cache.contents.reginfo,
+					cache.contents.reqinfo,
+					requests
+				)
+			if ret != SNMP_ERR_NOERROR:
+				request = requests
+				while bool(request):
+					libnsa.netsnmp_request_set_error(request, ret)
+					request = ctypes.cast(request.contents.next, netsnmp_request_info_p)
+
+			libnsa.netsnmp_free_delegated_cache(cache)
+
+		# Send the responses for requests no longer delegated
+		libnsa.netsnmp_check_outstanding_agent_requests()
+
+	def asyncio_attach(self, loop = None):
+		""" Processes incoming SNMP requests from within an asyncio event loop.
+
+		    Instead of blocking inside check_and_process(), the file
+		    descriptors and the next timeout net-snmp is interested in are
+		    obtained through snmp_select_info() and registered with "loop".
+		    net-snmp is then only called when there is actually work to do,
+		    so the same event loop can serve SNMP requests and run other
+		    coroutines, eg. the ones updating the SNMP objects' data.
+
+		    If "loop" is not specified, the running event loop is used, so
+		    asyncio_attach() must then be called from within a coroutine or
+		    an event loop callback (requires Python 3.7 or newer).
+
+		    net-snmp's alarms get run from within the event loop, too, so
+		    "AlarmSignals" is set to False. If the agent was started with
+		    AlarmSignals, the interval timer net-snmp may have armed for
+		    them is cancelled, so that no SIGALRM arrives afterwards.
+
+		    Should be called after start(). """
+
+		import asyncio
+
+		if self._aio_loop is not None:
+			raise netsnmpAgentException("Agent already attached to an event loop!")
+		if loop is None:
+			if not hasattr(asyncio, "get_running_loop"):
+				raise netsnmpAgentException(
+					"asyncio_attach() requires a \"loop\" argument with "
+					"Python versions older than 3.7!"
+				)
+			loop = asyncio.get_running_loop()
+		self._aio_loop = loop
+		if self.AlarmSignals:
+			self._disableAlarmSignals()
+			self.AlarmSignals = False
+
+			# With the alarms now reported through snmp_select_info(),
+			# net-snmp no longer arms the timer itself, but one armed
+			# during start() would still run them from the signal handler
+			if self._status != netsnmpAgentStatus.REGISTRATION:
+				signal.setitimer(signal.ITIMER_REAL, 0)
+		self._aio_reschedule()
+
+	def _disableAlarmSignals(self):
+		""" By default net-snmp implements its alarms (eg. the AgentX ping and
+		    reconnect timers) through SIGALRM. Tells it to report them through
+		    snmp_select_info()'s timeout instead, so that select() loops such
+		    as agent_check_and_process() or our event loop get woken up in
+		    time without any signals involved and alarm callbacks run in the
+		    thread processing SNMP requests. """
+
+		if libnsa.netsnmp_ds_set_boolean(
+			NETSNMP_DS_LIBRARY_ID,
+			NETSNMP_DS_LIB_ALARM_DONT_USE_SIG,
+			1
+		) != SNMPERR_SUCCESS:
+			raise netsnmpAgentException(
+				"netsnmp_ds_set_boolean() failed for NETSNMP_DS_LIB_ALARM_DONT_USE_SIG!"
+			)
+
+	def _scheduleExpiry(self, deadline):
+		""" Makes sure the rows of Tables with a row TTL get expired no
+		    later than at "deadline" by registering a net-snmp alarm. Rows
+		    thus get removed from within check_and_process() or the event
+		    loop, even if no SNMP requests come in. """
+
+		if self._expiryDeadline is not None and self._expiryDeadline <= deadline:
+			return
+
+		if self._expiryAlarm:
+			libnsa.snmp_alarm_unregister(self._expiryAlarm)
+
+		delay = max(deadline - _monotonic(), 0)
+		self._expiryAlarm = libnsa.snmp_alarm_register_hr(
+			timeval(int(delay), int((delay % 1) * 1000000)),
+			0,
+			self._expiryCallback,
+			None
+		)
+		if not self._expiryAlarm:
+			raise netsnmpAgentException("snmp_alarm_register_hr() failed!")
+		self._expiryDeadline = deadline
+
+		# Our event loop must learn about the new timeout
+		if self._aio_loop is not None:
+			self._aio_reschedule()
+
+	def _expireRows(self, clientreg, clientarg):
+		""" net-snmp alarm callback removing expired table rows. """
+
+		self._expiryAlarm    = 0
+		self._expiryDeadline = None
+
+		now = _monotonic()
+		deadlines = [
+			deadline for deadline in (
+				table._expireRows(now) for table in self._expiryTables
+			) if deadline is not None
+		]
+		if deadlines:
+			self._scheduleExpiry(min(deadlines))
+
+	def asyncio_detach(self):
+		""" Stops processing SNMP requests from within the asyncio event loop
+		    previously specified to asyncio_attach(). """
+
+		if self._aio_loop is None:
+			return
+
+		for fd in self._aio_fds:
+			self._aio_loop.remove_reader(fd)
+		self._aio_fds = set()
+		if self._aio_timer is not None:
+			self._aio_timer.cancel()
+			self._aio_timer = None
+		self._aio_loop = None
+
+	def _aio_reschedule(self):
+		""" Asks net-snmp which file descriptors to watch and when to wake
+		    up next and updates the event loop's registrations accordingly. """
+
+		numfds  = ctypes.c_int(0)
+		fdset   = fd_set()
+		timeout = timeval(0, 0)
+		block   = ctypes.c_int(1)
+		libnsa.snmp_select_info(
+			ctypes.byref(numfds),
+			ctypes.byref(fdset),
+			ctypes.byref(timeout),
+			ctypes.byref(block)
+		)
+
+		fds = set(fd for fd in range(numfds.value) if fdset.isset(fd))
+		for fd in self._aio_fds - fds:
+			self._aio_loop.remove_reader(fd)
+		for fd in fds - self._aio_fds:
+			self._aio_loop.add_reader(fd, self._aio_process, fd)
+		self._aio_fds = fds
+
+		if self._aio_timer is not None:
+			self._aio_timer.cancel()
+			self._aio_timer = None
+		if not block.value:
+			self._aio_timer = self._aio_loop.call_later(
+				timeout.tv_sec + timeout.tv_usec / 1000000.0,
+				self._aio_process,
+				None
+			)
+
+	def _aio_process(self, fd):
+		""" Event loop callback doing the same work agent_check_and_process()
+		    does after select() returned, either because "fd" became readable
+		    or, if "fd" is None, because the timeout expired. """
+
+		if self._aio_loop is None:
+			return
+
+		if fd is not None:
+			fdset = fd_set()
+			fdset.set(fd)
+			libnsa.snmp_read(ctypes.byref(fdset))
+		else:
+			self._aio_timer = None
+			libnsa.snmp_timeout()
+		libnsa.run_alarms()
+		libnsa.netsnmp_check_outstanding_agent_requests()
+		self._completeDelegated()
+
+		# Processing may have opened or closed sessions (eg. on reconnects)
+		# or scheduled new alarms
+		self._aio_reschedule()
 
 	def shutdown(self):
 		libnsa.snmp_shutdown(b(self.AgentName))
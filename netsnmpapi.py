@@ -109,6 +109,7 @@ SNMPERR_SUCCESS                         = 0
 NETSNMP_DS_LIBRARY_ID                   = 0
 NETSNMP_DS_APPLICATION_ID               = 1
 NETSNMP_DS_LIB_PERSISTENT_DIR           = 8
+NETSNMP_DS_LIB_ALARM_DONT_USE_SIG       = 11
 
 for f in [ libnsa.netsnmp_ds_set_boolean ]:
 	f.argtypes = [
@@ -139,9 +140,15 @@ SNMP_ERR_READONLY                       = 4
 SNMP_ERR_GENERR                         = 5
 SNMP_ERR_NOACCESS                       = 6
 SNMP_ERR_WRONGTYPE                      = 7
+SNMP_ERR_WRONGLENGTH                    = 8
 SNMP_ERR_RESOURCEUNAVAILABLE            = 13
 SNMP_ERR_COMMITFAILED                   = 14
 SNMP_ERR_UNDOFAILED                     = 15
+SNMP_ERR_NOTWRITABLE                    = 17
+
+SNMP_NOSUCHOBJECT                       = 128 # 0x80
+SNMP_NOSUCHINSTANCE                     = 129 # 0x81
+SNMP_ENDOFMIBVIEW                       = 130 # 0x82
 
 for f in [ libnsa.init_snmp ]:
 	f.argtypes = [
@@ -155,6 +162,76 @@ for f in [ libnsa.snmp_shutdown ]:
 	]
 	f.restype = None
 
+# /usr/include/sys/select.h
+FD_SETSIZE                              = 1024
+
+class fd_set(ctypes.Structure):
+	_NFDBITS = 8 * ctypes.sizeof(ctypes.c_long)
+
+	def set(self, fd):
+		self.fds_bits[fd // self._NFDBITS] |= 1 << (fd % self._NFDBITS)
+
+	def isset(self, fd):
+		return bool(self.fds_bits[fd // self._NFDBITS] & (1 << (fd % self._NFDBITS)))
+fd_set_p = ctypes.POINTER(fd_set)
+fd_set._fields_ = [
+	("fds_bits",            ctypes.c_long * (FD_SETSIZE // fd_set._NFDBITS))
+]
+
+# /usr/include/sys/time.h
+class timeval(ctypes.Structure): pass
+timeval_p = ctypes.POINTER(timeval)
+timeval._fields_ = [
+	("tv_sec",              ctypes.c_long),
+	("tv_usec",             ctypes.c_long)
+]
+
+# include/net-snmp/session_api.h
+for f in [ libnsa.snmp_select_info ]:
+	f.argtypes = [
+		ctypes.POINTER(ctypes.c_int),   # int *numfds
+		fd_set_p,                       # fd_set *fdset
+		timeval_p,                      # struct timeval *timeout
+		ctypes.POINTER(ctypes.c_int)    # int *block
+	]
+	f.restype = ctypes.c_int
+
+for f in [ libnsa.snmp_read ]:
+	f.argtypes = [
+		fd_set_p                        # fd_set *fdset
+	]
+	f.restype = None
+
+for f in [ libnsa.snmp_timeout ]:
+	f.argtypes = None
+	f.restype = None
+
+# include/net-snmp/library/snmp_alarm.h
+for f in [ libnsa.run_alarms ]:
+	f.argtypes = None
+	f.restype = None
+
+SNMPAlarmCallback = ctypes.CFUNCTYPE(
+	None,                               # result type
+	ctypes.c_uint,                      # unsigned int clientreg
+	ctypes.c_void_p                     # void *clientarg
+)
+
+for f in [ libnsa.snmp_alarm_register_hr ]:
+	f.argtypes = [
+		timeval,                        # struct timeval t
+		ctypes.c_uint,                  # unsigned int flags
+		SNMPAlarmCallback,              # SNMPAlarmCallback *cb
+		ctypes.c_void_p                 # void *cd
+	]
+	f.restype = ctypes.c_uint
+
+for f in [ libnsa.snmp_alarm_unregister ]:
+	f.argtypes = [
+		ctypes.c_uint                   # unsigned int clientreg
+	]
+	f.restype = None
+
 # include/net-snmp/library/oid.h
 c_oid   = ctypes.c_ulong
 c_oid_p = ctypes.POINTER(c_oid)
@@ -174,7 +251,96 @@ for f in [ libnsa.shutdown_agent ]:
 	f.restype = ctypes.c_int
 
 # include/net-snmp/library/parse.h
+class enum_list(ctypes.Structure): pass
+enum_list_p = ctypes.POINTER(enum_list)
+enum_list._fields_ = [
+	("next",                enum_list_p),
+	("value",               ctypes.c_int),
+	("label",               ctypes.c_char_p)
+]
+
+class index_list(ctypes.Structure): pass
+index_list_p = ctypes.POINTER(index_list)
+index_list._fields_ = [
+	("next",                index_list_p),
+	("ilabel",              ctypes.c_char_p),
+	("isimplied",           ctypes.c_char)
+]
+
 class tree(ctypes.Structure): pass
+tree_p = ctypes.POINTER(tree)
+tree._fields_ = [
+	("child_list",          tree_p),
+	("next_peer",           tree_p),
+	("next",                tree_p),
+	("parent",              tree_p),
+	("label",               ctypes.c_char_p),
+	("subid",               ctypes.c_ulong),
+	("modid",               ctypes.c_int),
+	("number_modules",      ctypes.c_int),
+	("module_list",         ctypes.POINTER(ctypes.c_int)),
+	("tc_index",            ctypes.c_int),
+	("type",                ctypes.c_int),
+	("access",              ctypes.c_int),
+	("status",              ctypes.c_int),
+	("enums",               enum_list_p),
+	("ranges",              ctypes.c_void_p),
+	("indexes",             index_list_p),
+	("augments",            ctypes.c_char_p),
+	("varbinds",            ctypes.c_void_p),
+	("hint",                ctypes.c_char_p),
+	("units",               ctypes.c_char_p),
+	("printomat",           ctypes.c_void_p),
+	("printer",             ctypes.c_void_p),
+	("description",         ctypes.c_char_p),
+	("reference",           ctypes.c_char_p),
+	("reported",            ctypes.c_int),
+	("defaultValue",        ctypes.c_char_p)
+]
+
+# Object types in struct tree's "type" field
+TYPE_OTHER                              = 0
+TYPE_OBJID                              = 1
+TYPE_OCTETSTR                           = 2
+TYPE_INTEGER                            = 3
+TYPE_NETADDR                            = 4
+TYPE_IPADDR                             = 5
+TYPE_COUNTER                            = 6
+TYPE_GAUGE                              = 7
+TYPE_TIMETICKS                          = 8
+TYPE_OPAQUE                             = 9
+TYPE_NULL                               = 10
+TYPE_COUNTER64                          = 11
+TYPE_BITSTRING                          = 12
+TYPE_NSAPADDRESS                        = 13
+TYPE_UINTEGER                           = 14
+TYPE_UNSIGNED32                         = 15
+TYPE_INTEGER32                          = 16
+
+# Access modes in struct tree's "access" field
+MIB_ACCESS_READONLY                     = 18
+MIB_ACCESS_READWRITE                    = 19
+MIB_ACCESS_WRITEONLY                    = 20
+MIB_ACCESS_NOACCESS                     = 21
+MIB_ACCESS_NOTIFY                       = 67
+MIB_ACCESS_CREATE                       = 48
+
+for f in [ libnsa.get_tree_head ]:
+	f.argtypes = None
+	f.restype = tree_p
+
+for f in [ libnsa.which_module ]:
+	f.argtypes = [
+		ctypes.c_char_p                 # const char *name
+	]
+	f.restype = ctypes.c_int
+
+for f in [ libnsa.find_tree_node ]:
+	f.argtypes = [
+		ctypes.c_char_p,                # const char *name
+		ctypes.c_int                    # int modid
+	]
+	f.restype = tree_p
 
 # include/net-snmp/mib_api.h
 for f in [ libnsa.netsnmp_init_mib ]:
@@ -185,7 +351,13 @@ for f in [ libnsa.read_mib ]:
 	f.argtypes = [
 		ctypes.c_char_p                 # const char *filename
 	]
-	f.restype = ctypes.POINTER(tree)
+	f.restype = tree_p
+
+for f in [ libnsa.read_module ]:
+	f.argtypes = [
+		ctypes.c_char_p                 # const char *name
+	]
+	f.restype = tree_p
 
 for f in [ libnsa.read_objid ]:
 	f.argtypes = [
@@ -330,6 +502,46 @@ for f in [ libnsa.netsnmp_create_handler_registration ]:
 	]
 	f.restype = netsnmp_handler_registration_p
 
+class netsnmp_delegated_cache(ctypes.Structure): pass
+netsnmp_delegated_cache_p = ctypes.POINTER(netsnmp_delegated_cache)
+netsnmp_delegated_cache._fields_ = [
+	("transaction_id",      ctypes.c_int),
+	("handler",             netsnmp_mib_handler_p),
+	("reginfo",             netsnmp_handler_registration_p),
+	("reqinfo",             netsnmp_agent_request_info_p),
+	("requests",            netsnmp_request_info_p),
+	("localinfo",           ctypes.c_void_p)
+]
+
+for f in [ libnsa.netsnmp_create_delegated_cache ]:
+	f.argtypes = [
+		netsnmp_mib_handler_p,          # netsnmp_mib_handler *handler
+		netsnmp_handler_registration_p, # netsnmp_handler_registration *reginfo
+		netsnmp_agent_request_info_p,   # netsnmp_agent_request_info *reqinfo
+		netsnmp_request_info_p,         # netsnmp_request_info *requests
+		ctypes.c_void_p                 # void *localinfo
+	]
+	f.restype = netsnmp_delegated_cache_p
+
+for f in [ libnsa.netsnmp_handler_check_cache ]:
+	f.argtypes = [
+		netsnmp_delegated_cache_p       # netsnmp_delegated_cache *dcache
+	]
+	f.restype = netsnmp_delegated_cache_p
+
+for f in [ libnsa.netsnmp_free_delegated_cache ]:
+	f.argtypes = [
+		netsnmp_delegated_cache_p       # netsnmp_delegated_cache *dcache
+	]
+	f.restype = None
+
+for f in [ libnsa.netsnmp_register_handler,
+           libnsa.netsnmp_unregister_handler ]:
+	f.argtypes = [
+		netsnmp_handler_registration_p  # netsnmp_handler_registration *reginfo
+	]
+	f.restype = ctypes.c_int
+
 for f in [ libnsa.netsnmp_request_set_error ]:
     f.argtypes = [
         netsnmp_request_info_p,         # netsnmp_request_info *request
@@ -410,6 +622,23 @@ for f in [ libnsa.snmp_varlist_add_variable ]:
 	]
 	f.restype = netsnmp_variable_list_p
 
+for f in [ libnsa.snmp_set_var_typed_value ]:
+	f.argtypes = [
+		netsnmp_variable_list_p,         # netsnmp_variable_list *newvar
+		ctypes.c_ubyte,                  # u_char type
+		ctypes.c_void_p,                 # const void *val_str
+		ctypes.c_size_t                  # size_t val_len
+	]
+	f.restype = ctypes.c_int
+
+for f in [ libnsa.snmp_set_var_objid ]:
+	f.argtypes = [
+		netsnmp_variable_list_p,         # netsnmp_variable_list *var
+		c_oid_p,                         # const oid *name
+		ctypes.c_size_t                  # size_t name_length
+	]
+	f.restype = ctypes.c_int
+
 # include/net-snmp/agent/table_data.h
 class netsnmp_table_row(ctypes.Structure): pass
 netsnmp_table_row_p = ctypes.POINTER(netsnmp_table_row)
@@ -433,6 +662,20 @@ netsnmp_table_data._fields_ = [
 	("last_row",			netsnmp_table_row_p)
 ]
 
+for f in [ libnsX.netsnmp_table_data_get_from_oid ]:
+	f.argtypes = [
+		netsnmp_table_data_p,           # netsnmp_table_data *table
+		c_oid_p,                        # oid *searchfor
+		ctypes.c_size_t                 # size_t searchfor_len
+	]
+	f.restype = netsnmp_table_row_p
+
+for f in [ libnsX.netsnmp_table_data_generate_index_oid ]:
+	f.argtypes = [
+		netsnmp_table_row_p             # netsnmp_table_row *row
+	]
+	f.restype = ctypes.c_int
+
 # include/net-snmp/agent/table_dataset.h
 class netsnmp_table_data_set_storage_udata(ctypes.Union): pass
 netsnmp_table_data_set_storage_udata._fields_ = [
@@ -528,6 +771,7 @@ for f in [ libnsX.netsnmp_table_dataset_remove_and_delete_row ]:
 		netsnmp_table_data_set_p,       # netsnmp_table_data_set *table
 		netsnmp_table_row_p             # netsnmp_table_row *row
 	]
+	f.restype = None
 
 # include/net-snmp/agent/snmp_agent.h
 for f in [ libnsa.agent_check_and_process ]:
@@ -536,6 +780,31 @@ for f in [ libnsa.agent_check_and_process ]:
 	]
 	f.restype = ctypes.c_int
 
+for f in [ libnsa.netsnmp_check_outstanding_agent_requests ]:
+	f.argtypes = None
+	f.restype = None
+
+# include/net-snmp/agent/fd_event_manager.h
+ExternalFDCallback = ctypes.CFUNCTYPE(
+	None,                               # result type
+	ctypes.c_int,                       # int fd
+	ctypes.c_void_p                     # void *data
+)
+
+for f in [ libnsa.register_readfd ]:
+	f.argtypes = [
+		ctypes.c_int,                   # int fd
+		ExternalFDCallback,             # void (*func)(int, void *)
+		ctypes.c_void_p                 # void *data
+	]
+	f.restype = ctypes.c_int
+
+for f in [ libnsa.unregister_readfd ]:
+	f.argtypes = [
+		ctypes.c_int                    # int fd
+	]
+	f.restype = ctypes.c_int
+
 for f in [ libnsa.netsnmp_get_agent_uptime ]:
 	f.restype = ctypes.c_ulong
 
@@ -0,0 +1,349 @@
+#!/usr/bin/env python
+#
+# python-netsnmpagent module
+# Copyright (c) 2013-2016 Pieter Hollants <pieter@hollants.com>
+# Licensed under the GNU Lesser Public License (LGPL) version 3
+#
+# MIB-to-Python code generator
+#
+
+""" Generates a Python module from a MIB that contains the numeric OIDs,
+    types, access modes and table layouts of the SNMP objects the MIB
+    defines, as resolved by net-snmp's MIB parser at generation time, and a
+    register(agent) function that registers them all with a netsnmpAgent.
+
+    Agents using such a module need neither parse MIBs nor resolve names at
+    startup, ie. they can run with UseMIBFiles set to False:
+
+      python netsnmpmibgen.py -o simple_mib.py examples/SIMPLE-MIB.txt
+
+    and then:
+
+      import simple_mib
+      objs = simple_mib.register(agent)
+      objs["simpleInteger"].update(42) """
+
+import sys, os, re, optparse, hashlib
+from netsnmpapi import *
+
+class netsnmpMIBGenException(Exception):
+	pass
+
+# The netsnmpAgent methods creating the SNMP object types for struct tree's
+# "type" values. TruthValue and DisplayString are recognized separately.
+_typeNames = {
+	TYPE_INTEGER:    "Integer32",
+	TYPE_INTEGER32:  "Integer32",
+	TYPE_UNSIGNED32: "Unsigned32",
+	TYPE_UINTEGER:   "Unsigned32",
+	TYPE_GAUGE:      "Gauge32",
+	TYPE_COUNTER:    "Counter32",
+	TYPE_COUNTER64:  "Counter64",
+	TYPE_TIMETICKS:  "TimeTicks",
+	TYPE_IPADDR:     "IpAddress",
+	TYPE_OBJID:      "ObjectIdentifier",
+	TYPE_OCTETSTR:   "OctetString"
+}
+
+_integerTypes = ("Integer32", "Unsigned32", "Gauge32", "Counter32",
+                 "Counter64", "TimeTicks")
+
+_writableAccess = (MIB_ACCESS_READWRITE, MIB_ACCESS_WRITEONLY, MIB_ACCESS_CREATE)
+
+def _str(s):
+	""" Decodes byte strings returned by net-snmp, if necessary. """
+
+	if s is None or isinstance(s, str):
+		return s
+	return s.decode("ascii", "replace")
+
+def _children(node):
+	""" Returns the children of the struct tree "node" ordered by subid. """
+
+	children = []
+	child = node.child_list
+	while bool(child):
+		children.append(child.contents)
+		child = child.contents.next_peer
+	return sorted(children, key=lambda c: c.subid)
+
+def _oidstr(node):
+	""" Returns the numeric OID of the struct tree "node", eg. ".1.3.6.1". """
+
+	subids = [node.subid]
+	parent = node.parent
+	while bool(parent):
+		subids.append(parent.contents.subid)
+		parent = parent.contents.parent
+	return "." + ".".join(str(subid) for subid in reversed(subids))
+
+def _enums(node):
+	""" Returns the enumeration of the struct tree "node" as a dictionary. """
+
+	enums = {}
+	enum = node.enums
+	while bool(enum):
+		enums[_str(enum.contents.label)] = enum.contents.value
+		enum = enum.contents.next
+	return enums
+
+def _typeName(node):
+	""" Returns the name of the netsnmpAgent method creating SNMP objects of
+	    the type of the struct tree "node" or None if it is not supported. """
+
+	if node.type in (TYPE_INTEGER, TYPE_INTEGER32) \
+	and _enums(node) == { "true": 1, "false": 2 }:
+		return "TruthValue"
+	if node.type == TYPE_OCTETSTR and _str(node.hint) == "255a":
+		return "DisplayString"
+	return _typeNames.get(node.type)
+
+def _initialValue(node, vartype):
+	""" Returns the DEFVAL of the struct tree "node" converted for SNMP
+	    objects of type "vartype" or None if there is none or it can not be
+	    represented. """
+
+	defval = _str(node.defaultValue)
+	if defval is None:
+		return None
+
+	if vartype == "TruthValue":
+		return { "true": True, "false": False }.get(defval)
+	if vartype in _integerTypes:
+		try:
+			return int(defval)
+		except ValueError:
+			return _enums(node).get(defval)
+	if vartype in ("OctetString", "DisplayString"):
+		if len(defval) >= 2 and defval[0] == defval[-1] == '"':
+			return defval[1:-1]
+	return None
+
+def _indexTypes(entry):
+	""" Returns the types of the indexes of the table row "entry", following
+	    AUGMENTS clauses. Raises netsnmpMIBGenException for indexes of
+	    unsupported types and IMPLIED indexes, which Table can't encode. """
+
+	indexes = entry.indexes
+	augments = _str(entry.augments)
+	if not bool(indexes) and augments:
+		augmented = libnsa.find_tree_node(augments.encode("ascii"), -1)
+		if bool(augmented):
+			indexes = augmented.contents.indexes
+
+	idxtypes = []
+	while bool(indexes):
+		label  = indexes.contents.ilabel
+		idxobj = libnsa.find_tree_node(label, -1)
+		vartype = _typeName(idxobj.contents) if bool(idxobj) else None
+		if vartype is None:
+			raise netsnmpMIBGenException(
+				"unsupported type of index {0}".format(_str(label))
+			)
+		if ord(indexes.contents.isimplied):
+			raise netsnmpMIBGenException(
+				"IMPLIED index {0}".format(_str(label))
+			)
+		idxtypes.append(vartype)
+		indexes = indexes.contents.next
+	return idxtypes
+
+def _isEntry(node):
+	return bool(node.indexes) or bool(node.augments)
+
+def scan(mibfile):
+	""" Loads "mibfile" with net-snmp's MIB parser and returns a tuple with
+	    the MIB module's name, a list of (name, type, oidstr, initval,
+	    writable) records describing its scalars, a list of (name, oidstr,
+	    index types, columns, extendable) records describing its tables,
+	    with columns being (column, type, initval, writable) records, and a
+	    list of "name (reason)" strings describing the objects and tables
+	    that were skipped, eg. because of unsupported types. """
+
+	with open(mibfile, "rb") as f:
+		contents = f.read().decode("ascii", "replace")
+	match = re.search(r"^\s*([A-Za-z][-A-Za-z0-9]*)\s+DEFINITIONS\s*::=\s*BEGIN",
+	                  contents, re.MULTILINE)
+	if not match:
+		raise netsnmpMIBGenException("{0} is not a MIB file!".format(mibfile))
+	module = match.group(1)
+
+	libnsa.netsnmp_init_mib()
+	if not bool(libnsa.read_mib(mibfile.encode(sys.getfilesystemencoding()))):
+		raise netsnmpMIBGenException("read_mib({0}) failed!".format(mibfile))
+	modid = libnsa.which_module(module.encode("ascii"))
+	if modid < 0:
+		raise netsnmpMIBGenException("MIB module {0} not loaded!".format(module))
+
+	scalars = []
+	tables  = []
+	skipped = []
+	stack   = [libnsa.get_tree_head().contents]
+	while stack:
+		node = stack.pop()
+		children = _children(node)
+
+		if node.modid == modid and children and _isEntry(children[0]):
+			# A table: its single child is the row, whose children in turn
+			# are the columns
+			entry   = children[0]
+			try:
+				idxtypes = _indexTypes(entry)
+			except netsnmpMIBGenException as e:
+				skipped.append("{0} ({1})".format(_str(node.label), e))
+				continue
+			columns = []
+			extendable = False
+			for column in _children(entry):
+				if column.access not in _writableAccess \
+				and column.access != MIB_ACCESS_READONLY:
+					continue
+				vartype = _typeName(column)
+				if vartype is None:
+					skipped.append("{0} (unsupported type)".format(_str(column.label)))
+					continue
+				columns.append((
+					int(column.subid),
+					vartype,
+					_initialValue(column, vartype),
+					column.access in _writableAccess
+				))
+				extendable |= column.access == MIB_ACCESS_CREATE
+			tables.append((
+				_str(node.label),
+				_oidstr(node),
+				idxtypes,
+				columns,
+				extendable
+			))
+			continue
+
+		if node.modid == modid and not children and not _isEntry(node) \
+		and (node.access in _writableAccess or node.access == MIB_ACCESS_READONLY):
+			vartype = _typeName(node)
+			if vartype is None:
+				skipped.append("{0} (unsupported type)".format(_str(node.label)))
+			else:
+				scalars.append((
+					_str(node.label),
+					vartype,
+					_oidstr(node),
+					_initialValue(node, vartype),
+					node.access in _writableAccess
+				))
+
+		# Push the children in reverse so they get visited in OID order.
+		# The tree head has peers of its own (ccitt, iso, joint-iso-ccitt).
+		if not bool(node.parent) and bool(node.next_peer):
+			stack.append(node.next_peer.contents)
+		stack.extend(reversed(children))
+
+	return module, scalars, tables, skipped
+
+_template = '''\
+#
+# Generated by netsnmpmibgen.py from {mibfile} -- do not edit
+#
+# {module} (SHA-1 {digest})
+#
+
+""" The SNMP objects and tables defined by {module}, with OIDs resolved at
+    generation time. register() registers them with a netsnmpAgent. """
+
+MODULE = {module!r}
+
+# (name, type, oidstr, initval, writable)
+SCALARS = (
+{scalars})
+
+# (name, oidstr, index types, (column, type, initval, writable), extendable)
+TABLES = (
+{tables})
+{skipped}
+def _create(agent, vartype, initval):
+	if initval is None:
+		return getattr(agent, vartype)()
+	return getattr(agent, vartype)(initval)
+
+def register(agent, context = ""):
+	""" Registers all SNMP objects and tables with the netsnmpAgent "agent"
+	    in the SNMP context "context" and returns a dictionary mapping their
+	    names in the MIB to them. The scalars are registered in one go
+	    through registerMany(). """
+
+	objs = agent.registerMany(
+		(vartype, oidstr, initval, writable, context)
+		for name, vartype, oidstr, initval, writable in SCALARS
+	)
+	result = dict(zip((scalar[0] for scalar in SCALARS), objs))
+
+	for name, oidstr, indexes, columns, extendable in TABLES:
+		result[name] = agent.Table(
+			oidstr     = oidstr,
+			indexes    = [_create(agent, vartype, None) for vartype in indexes],
+			columns    = [
+				(column, _create(agent, vartype, initval), writable)
+				for column, vartype, initval, writable in columns
+			],
+			extendable = extendable,
+			context    = context
+		)
+
+	return result
+'''
+
+def generate(mibfile):
+	""" Returns the source code of the Python module generated for
+	    "mibfile". """
+
+	module, scalars, tables, skipped = scan(mibfile)
+
+	with open(mibfile, "rb") as f:
+		digest = hashlib.sha1(f.read()).hexdigest()
+
+	scalarsrc = "".join("\t{0!r},\n".format(scalar) for scalar in scalars)
+	tablesrc  = ""
+	for name, oidstr, indexes, columns, extendable in tables:
+		tablesrc += "\t({0!r}, {1!r}, {2!r}, (\n".format(name, oidstr, tuple(indexes))
+		tablesrc += "".join("\t\t{0!r},\n".format(column) for column in columns)
+		tablesrc += "\t), {0!r}),\n".format(extendable)
+	skippedsrc = ""
+	if skipped:
+		skippedsrc = "\n# Skipped: {0}\n".format(", ".join(skipped))
+
+	return _template.format(
+		mibfile = os.path.basename(mibfile),
+		module  = module,
+		digest  = digest,
+		scalars = scalarsrc,
+		tables  = tablesrc,
+		skipped = skippedsrc
+	)
+
+def main():
+	parser = optparse.OptionParser(usage="%prog [-o OUTPUT] MIBFILE")
+	parser.add_option(
+		"-o",
+		"--output",
+		dest="output",
+		help="Sets the file to write the generated module to instead of stdout",
+		default=None
+	)
+	(options, args) = parser.parse_args()
+	if len(args) != 1:
+		parser.error("Exactly one MIB file must be given!")
+
+	try:
+		source = generate(args[0])
+	except (netsnmpMIBGenException, IOError, OSError) as e:
+		sys.stderr.write("{0}: {1}\n".format(sys.argv[0], e))
+		sys.exit(1)
+
+	if options.output:
+		with open(options.output, "w") as f:
+			f.write(source)
+	else:
+		sys.stdout.write(source)
+
+if __name__ == "__main__":
+	main()
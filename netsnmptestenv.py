@@ -110,7 +110,8 @@ class netsnmpTestEnv(object):
 	def snmpcmd(op, oid, data=None, datatype=None):
 		""" Executes a SNMP client operation in the net-snmp test environment.
 		    
-		    "op" is either "get", "set", "walk" or "table".
+		    "op" is either "get", "getnext", "set", "walk", "bulkwalk" or
+		    "table".
 		    "oid" is the OID to run the operation against.
 		    "data" is the data to set in case of a "set" operation.
 			"datatype" is the type of the data (as specified to "snmpset"). """
@@ -194,6 +195,25 @@ class netsnmpTestEnv(object):
 
 		return self.snmpcmd("set", oid, data, datatype)
 
+	@classmethod
+	def snmpgetnext(self, oid):
+		""" Executes a "snmpgetnext" operation in the net-snmp test environment.
+
+		    "oid" is the OID to run the operation against.
+
+		    Returns a three-tuple (oid, data, datatype) for the next OID. """
+
+		(nextoid, data) = self.snmpcmd("getnext", oid).split(" = ", 1)
+		if ":" in data:
+			(datatype, data) = data.split(":", 1)
+			datatype = datatype.strip()
+		else:
+			datatype = "STRING"
+		data = data.strip()
+		if data.startswith('"') and data.endswith('"'):
+			data = data[1:-1]
+		return (nextoid.strip(), data, datatype)
+
 	@classmethod
 	def snmpwalk(self, oid):
 		""" Executes a "snmpwalk" operation in the net-snmp test environment.
@@ -202,6 +222,14 @@ class netsnmpTestEnv(object):
 
 		return self.snmpcmd("walk", oid)
 
+	@classmethod
+	def snmpbulkwalk(self, oid):
+		""" Executes a "snmpbulkwalk" operation in the net-snmp test environment.
+
+		    "oid" is the OID to run the operation against. """
+
+		return self.snmpcmd("bulkwalk", oid)
+
 	@classmethod
 	def snmptable(self, oid):
 		""" Executes a "snmpwalk" operation in the net-snmp test environment.
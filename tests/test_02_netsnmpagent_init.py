@@ -75,6 +75,24 @@ def test_Instantiation():
 		LogHandler     = NetSNMPLogHandler,
 	)
 
+@timed(1)
+@raises(netsnmpagent.netsnmpAgentException)
+def test_Table_rowTTL_with_AlarmSignals_raises_Exception():
+	""" Table(rowTTL=...) raises Exception with AlarmSignals=True
+
+	This tests that creating a table with a row TTL does not silently change
+	how net-snmp delivers its alarms for the whole process. The agent has
+	not been started yet, so the table could be registered otherwise. """
+
+	global agent
+
+	agent.Table(
+		oidstr  = "TEST-MIB::testMIBObjects.11",
+		indexes = [ agent.Integer32() ],
+		columns = [ (2, agent.Integer32(0)) ],
+		rowTTL  = 0.5,
+	)
+
 @nottest
 def in_netsnmp_log(regexp):
 	""" Checks whether "regexp" was logged by net-snmp. """
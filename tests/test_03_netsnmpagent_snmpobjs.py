@@ -14,10 +14,40 @@ sys.path.insert(1, "..")
 from netsnmptestenv import netsnmpTestEnv
 import netsnmpagent
 
+class DictProvider(object):
+	""" A VirtualTable provider serving the cells from a dictionary mapping
+	    index OIDs to dictionaries mapping column numbers to values. """
+
+	def __init__(self, rows):
+		self.rows = rows
+
+	def get(self, index, column):
+		return self.rows.get(index, {}).get(column)
+
+	def next(self, index, column):
+		for idx in sorted(self.rows):
+			if (index is None or idx > index) and column in self.rows[idx]:
+				return (idx, self.rows[idx][column])
+		return None
+
+class RaisingProvider(object):
+	""" A VirtualTable provider failing on every request. """
+
+	def get(self, index, column):
+		raise RuntimeError("get() failed")
+
+	def next(self, index, column):
+		raise RuntimeError("next() failed")
+
 def setUp(self):
 	global testenv, agent
 	global settableInteger32, settableUnsigned32, settableTimeTicks
 	global settableOctetString
+	global settableTable, boundTable, boundCounter32
+	global registeredMany, columnarTable, stringVirtualTable
+	global bulkTable, rebuiltTable, scalarGroupInteger32
+	global mirroredTable, plainTable, mirroredCounter32, plainCounter32
+	global cellTable, sharedInteger32s, oidTable
 
 	testenv = netsnmpTestEnv()
 
@@ -249,6 +279,159 @@ def setUp(self):
 		initval = "Ä" * 256,
 	)
 
+	# Test OIDs for scalars registered in bulk. TEST-MIB does not define
+	# them, so they live in an unused subtree of testMIBObjects.
+	registeredMany = agent.registerMany([
+		("Integer32",        "TEST-MIB::testMIBObjects.2.1", 42),
+		("DisplayString",    "TEST-MIB::testMIBObjects.2.2", "bulk"),
+		("ObjectIdentifier", "TEST-MIB::testMIBObjects.2.3", ".1.3", True),
+	])
+
+	# Test OIDs for a table with a writable column whose rows get changed
+	# both through SNMP SETs and from Python
+	settableTable = agent.Table(
+		oidstr     = "TEST-MIB::testMIBObjects.3",
+		indexes    = [ agent.Integer32() ],
+		columns    = [ (2, agent.Integer32(0), True) ],
+		extendable = True,
+	)
+	for idx in (1, 2, 3):
+		row = settableTable.addRow([ agent.Integer32(idx) ])
+		row.setRowCell(2, agent.Integer32(idx * 10))
+
+	# Test OIDs for a table with a writable column and a bound cell
+	boundTable = agent.Table(
+		oidstr  = "TEST-MIB::testMIBObjects.4",
+		indexes = [ agent.Integer32() ],
+		columns = [
+			(2, agent.Integer32(0), True),
+			(3, agent.Counter32(0), False),
+		],
+	)
+	boundCounter32 = agent.Counter32(5)
+	boundTable.addRow([ agent.Integer32(1) ]).bindCell(3, boundCounter32)
+
+	# Test OIDs for a VirtualTable
+	agent.VirtualTable(
+		oidstr   = "TEST-MIB::testMIBObjects.5",
+		indexes  = [ agent.Integer32() ],
+		columns  = [
+			(2, agent.Integer32(0)),
+			(3, agent.DisplayString("")),
+		],
+		provider = DictProvider({
+			(1,): { 2: 10, 3: "a" },
+			(2,): { 2: 20, 3: "b" },
+		}),
+	)
+
+	# Test OIDs for a VirtualTable whose provider fails. They are kept far
+	# away from the other test OIDs so that GETBULKs don't run into them.
+	agent.VirtualTable(
+		oidstr   = "TEST-MIB::testMIBObjects.99",
+		indexes  = [ agent.Integer32() ],
+		columns  = [ (2, agent.Integer32(0)) ],
+		provider = RaisingProvider(),
+	)
+
+	# Test OIDs for a VirtualTable indexed by strings
+	stringVirtualTable = agent.VirtualTable(
+		oidstr   = "TEST-MIB::testMIBObjects.10",
+		indexes  = [ agent.DisplayString() ],
+		columns  = [ (2, agent.Integer32(0)) ],
+		provider = DictProvider({
+			(1, 97): { 2: 1 },
+		}),
+	)
+
+	# Test OIDs for a ColumnarTable
+	columnarTable = agent.ColumnarTable(
+		oidstr  = "TEST-MIB::testMIBObjects.6",
+		indexes = [ agent.Integer32() ],
+		columns = [
+			(2, agent.Integer32(0)),
+			(3, agent.DisplayString("")),
+		],
+	)
+	# Test OIDs for a ScalarGroup
+	scalarGroup = agent.ScalarGroup("TEST-MIB::testMIBObjects.9")
+	scalarGroupInteger32 = scalarGroup.add("1.0", agent.Integer32(1))
+	scalarGroup.add("2.0", agent.DisplayString("two"))
+	scalarGroup.add("3.0", agent.Integer32(3), writable = False)
+
+	# Test OIDs for a table filled through addRows()
+	bulkTable = agent.Table(
+		oidstr  = "TEST-MIB::testMIBObjects.7",
+		indexes = [ agent.Integer32() ],
+		columns = [ (2, agent.Integer32(0)) ],
+	)
+
+	# Test OIDs for a table whose contents get rebuilt
+	rebuiltTable = agent.Table(
+		oidstr  = "TEST-MIB::testMIBObjects.8",
+		indexes = [ agent.Integer32() ],
+		columns = [ (2, agent.Integer32(0)) ],
+	)
+	rebuiltTable.addRows(tableRows([ (1, 10), (2, 20) ]))
+
+	# Test OIDs for two tables getting the same changes, one of them with
+	# a mirror and one without
+	mirroredTable = agent.Table(
+		oidstr  = "TEST-MIB::testMIBObjects.12",
+		indexes = [ agent.Integer32() ],
+		columns = [
+			(2, agent.Integer32(0), True),
+			(3, agent.Counter32(0), False),
+		],
+		mirror  = True,
+	)
+	plainTable = agent.Table(
+		oidstr  = "TEST-MIB::testMIBObjects.13",
+		indexes = [ agent.Integer32() ],
+		columns = [
+			(2, agent.Integer32(0), True),
+			(3, agent.Counter32(0), False),
+		],
+	)
+	mirroredCounter32 = agent.Counter32(1)
+	plainCounter32    = agent.Counter32(1)
+
+	# Test OIDs for a table whose cells get set to values of varying types
+	# and sizes
+	cellTable = agent.Table(
+		oidstr  = "TEST-MIB::testMIBObjects.14",
+		indexes = [ agent.Integer32() ],
+		columns = [
+			(2, agent.Integer32(0)),
+			(3, agent.DisplayString("")),
+		],
+	)
+	cellTable.addRow([ agent.Integer32(1) ])
+
+	# Test OIDs for several scalars of the same type, whose instances share
+	# a single class
+	sharedInteger32s = [
+		agent.Integer32(
+			oidstr  = "TEST-MIB::testMIBObjects.15.{0}".format(idx),
+			initval = idx,
+		)
+		for idx in (1, 2, 3)
+	]
+
+	# Test OIDs for a table with an OBJECT IDENTIFIER column
+	oidTable = agent.Table(
+		oidstr  = "TEST-MIB::testMIBObjects.16",
+		indexes = [ agent.Integer32() ],
+		columns = [ (2, agent.ObjectIdentifier(".0.0")) ],
+	)
+	oidTable.addRow([ agent.Integer32(1) ])
+	oidTable.addRow([ agent.Integer32(2) ])
+
+	columnarTable.setRows([ 3, 1, 2 ], {
+		2: [ 300, 100, 200 ],
+		3: [ "z", "x", "y" ],
+	})
+
 	# Connect to master snmpd instance
 	agent.start()
 
@@ -1000,3 +1183,804 @@ def test_GET_SET_OctetStringWithoutInterval_abcdef_eq_abcdef():
 	(data, datatype) = testenv.snmpget("TEST-MIB::testOctetStringNoInitval.0")
 	eq_(datatype, "STRING")
 	eq_(data, "abcdef")
+
+@timed(1)
+def test_GET_RegisterManyInteger32_eq_42():
+	""" GET(registerMany(Integer32, initval=42)) == 42
+
+	This tests that scalars registered through registerMany() are served
+	at their instance OID ".0" just like those created individually. """
+
+	global testenv
+
+	(data, datatype) = testenv.snmpget("TEST-MIB::testMIBObjects.2.1.0")
+	eq_(datatype, "INTEGER")
+	eq_(int(data), 42)
+
+@timed(1)
+def test_GET_RegisterManyDisplayString_eq_bulk():
+	""" GET(registerMany(DisplayString, initval="bulk")) == "bulk" """
+
+	global testenv
+
+	(data, datatype) = testenv.snmpget("TEST-MIB::testMIBObjects.2.2.0")
+	eq_(datatype, "STRING")
+	eq_(data, "bulk")
+
+@timed(1)
+def test_SET_RegisterManyObjectIdentifier_longer_OID():
+	""" SET(registerMany(ObjectIdentifier, initval=".1.3"), longer OID)
+
+	This tests that a writable ObjectIdentifier registered through
+	registerMany() can be set to an OID longer than its initval. """
+
+	global testenv, registeredMany
+
+	oid = ".1.3.6.1.4.1.99999.1.2.3.4.5.6.7.8.9.10"
+	print(testenv.snmpset("TEST-MIB::testMIBObjects.2.3.0", oid, "o"))
+
+	eq_(registeredMany[2].value(), oid)
+
+@timed(1)
+def test_SET_RegisterManyObjectIdentifier_shorter_OID():
+	""" SET(registerMany(ObjectIdentifier), shorter OID)
+
+	This tests that after setting a writable ObjectIdentifier to an OID
+	shorter than its current one, value() returns the new OID only. """
+
+	global testenv, registeredMany
+
+	oid = ".1.3.6.1"
+	print(testenv.snmpset("TEST-MIB::testMIBObjects.2.3.0", oid, "o"))
+
+	eq_(registeredMany[2].value(), oid)
+	(data, datatype) = testenv.snmpget("TEST-MIB::testMIBObjects.2.3.0")
+	eq_(datatype, "OID")
+
+def walkTableColumn(oid):
+	""" Walks the Integer32 table column "oid" and returns a list of
+	    (index, value) tuples. """
+
+	global testenv
+
+	output = testenv.snmpwalk(oid)
+	return [
+		(int(idx), int(val))
+		for idx, val in re.findall(re.escape(oid) + r"\.(\d+) = INTEGER: (-?\d+)", output)
+	]
+
+@timed(1)
+def test_SET_TableCell_42_eq_42():
+	""" SET(Table cell, 42) == 42
+
+	This tests that calling snmpset on a writable table cell changes the
+	value returned by snmpget. """
+
+	global testenv
+
+	print(testenv.snmpset("TEST-MIB::testMIBObjects.3.1.2.2", 42, "i"))
+
+	(data, datatype) = testenv.snmpget("TEST-MIB::testMIBObjects.3.1.2.2")
+	eq_(datatype, "INTEGER")
+	eq_(int(data), 42)
+
+@timed(1)
+def test_SET_TableCell_removeRow_leaves_other_rows():
+	""" removeRow() after SET(Table cell) removes only that row
+
+	net-snmp applies SETs to a copy of the row which replaces the original,
+	so this tests that the TableRow object follows the copy and that
+	removing it afterwards leaves the other rows intact. """
+
+	global settableTable
+
+	settableTable.removeRow(2)
+	eq_(settableTable.getRow(2), None)
+	eq_(walkTableColumn("TEST-MIB::testMIBObjects.3.1.2"), [ (1, 10), (3, 30) ])
+
+@timed(1)
+def test_SET_TableCell_addRow_replaces_SET_created_row():
+	""" addRow() replaces a row created through SET(Table cell)
+
+	This tests that a row created by snmpset in an extendable table gets
+	replaced, not duplicated, when a row with the same index is added from
+	Python, and that the latter can be removed again. """
+
+	global testenv, agent, settableTable
+
+	print(testenv.snmpset("TEST-MIB::testMIBObjects.3.1.2.4", 99, "i"))
+	eq_(walkTableColumn("TEST-MIB::testMIBObjects.3.1.2"), [ (1, 10), (3, 30), (4, 99) ])
+
+	row = settableTable.addRow([ agent.Integer32(4) ])
+	row.setRowCell(2, agent.Integer32(40))
+	eq_(walkTableColumn("TEST-MIB::testMIBObjects.3.1.2"), [ (1, 10), (3, 30), (4, 40) ])
+
+	settableTable.removeRow(4)
+	eq_(walkTableColumn("TEST-MIB::testMIBObjects.3.1.2"), [ (1, 10), (3, 30) ])
+
+@timed(1)
+def test_SET_TableCell_removeRow_first_row():
+	""" removeRow() after SET(Table cell) of the first row
+
+	This tests that removing the first row after it was changed through
+	snmpset does not lose the rows following it. """
+
+	global testenv, settableTable
+
+	print(testenv.snmpset("TEST-MIB::testMIBObjects.3.1.2.1", 11, "i"))
+	settableTable.removeRow(1)
+	eq_(walkTableColumn("TEST-MIB::testMIBObjects.3.1.2"), [ (3, 30) ])
+
+@timed(1)
+def test_SET_TableCell_keeps_bound_cell():
+	""" SET(Table cell) keeps the row's bound cells bound
+
+	This tests that after calling snmpset on a writable cell in a row with
+	a cell bound with bindCell(), which makes net-snmp replace the row with
+	a copy, updates of the bound SNMP object still show up in the table and
+	the row can be removed. """
+
+	global testenv, boundTable, boundCounter32
+
+	print(testenv.snmpset("TEST-MIB::testMIBObjects.4.1.2.1", 42, "i"))
+	boundCounter32.update(6)
+
+	(data, datatype) = testenv.snmpget("TEST-MIB::testMIBObjects.4.1.3.1")
+	eq_(datatype, "Counter32")
+	eq_(int(data), 6)
+
+	boundTable.removeRow(1)
+	eq_(list(boundTable.iterRows()), [])
+
+@timed(1)
+def test_SET_TableCell_sync_restores_value():
+	""" sync() after SET(Table cell) restores the snapshot's value
+
+	This tests that Table.sync() does not skip a cell as unchanged when it
+	has been changed through snmpset since the last sync(). """
+
+	global testenv, agent, settableTable
+
+	snapshot = { 3: { 2: agent.Integer32(30) } }
+	eq_(settableTable.sync(snapshot)["skipped"], 1)
+
+	print(testenv.snmpset("TEST-MIB::testMIBObjects.3.1.2.3", 33, "i"))
+	eq_(walkTableColumn("TEST-MIB::testMIBObjects.3.1.2"), [ (3, 33) ])
+
+	eq_(settableTable.sync(snapshot)["set"], 1)
+	eq_(walkTableColumn("TEST-MIB::testMIBObjects.3.1.2"), [ (3, 30) ])
+
+	# Cells are compared to what the table holds, so a SET to the
+	# snapshot's value does not make sync() set them again
+	print(testenv.snmpset("TEST-MIB::testMIBObjects.3.1.2.3", 30, "i"))
+	eq_(settableTable.sync(snapshot)["skipped"], 1)
+
+@timed(1)
+def test_GET_VirtualTableCell_eq_20():
+	""" GET(VirtualTable cell) == 20
+
+	This tests that a VirtualTable serves the provider's cells. """
+
+	global testenv
+
+	(data, datatype) = testenv.snmpget("TEST-MIB::testMIBObjects.5.1.2.2")
+	eq_(datatype, "INTEGER")
+	eq_(int(data), 20)
+
+@timed(1)
+def test_GET_VirtualTableMissingRow_eq_NoSuchInstance():
+	""" GET(VirtualTable cell of a missing row) == No Such Instance """
+
+	global testenv
+
+	(data, datatype) = testenv.snmpget("TEST-MIB::testMIBObjects.5.1.2.3")
+	ok_(data.startswith("No Such Instance"))
+
+@timed(1)
+def test_GETNEXT_VirtualTable_before_entry_eq_first_cell():
+	""" GETNEXT(VirtualTable OID before the entry) == first cell
+
+	This tests that GETNEXT for an OID sorting before the table's entry,
+	but with a valid column and index following, returns the first cell of
+	the first column instead of skipping it. """
+
+	global testenv
+
+	(oid, data, datatype) = testenv.snmpgetnext("TEST-MIB::testMIBObjects.5.0.2.1")
+	eq_(oid, "TEST-MIB::testMIBObjects.5.1.2.1")
+	eq_(datatype, "INTEGER")
+	eq_(int(data), 10)
+
+@timed(1)
+def test_GETNEXT_VirtualTable_last_row_eq_next_column():
+	""" GETNEXT(VirtualTable cell in the last row) == next column's first cell """
+
+	global testenv
+
+	(oid, data, datatype) = testenv.snmpgetnext("TEST-MIB::testMIBObjects.5.1.2.2")
+	eq_(oid, "TEST-MIB::testMIBObjects.5.1.3.1")
+	eq_(datatype, "STRING")
+	eq_(data, "a")
+
+@timed(1)
+def test_GETBULK_VirtualTable_eq_all_cells():
+	""" GETBULK(VirtualTable) == all cells in column order """
+
+	global testenv
+
+	output = testenv.snmpbulkwalk("TEST-MIB::testMIBObjects.5")
+	eq_(
+		re.findall(r"testMIBObjects\.5\.1\.(\d+\.\d+) = \w+: (\S+)", output),
+		[ ("2.1", "10"), ("2.2", "20"), ("3.1", '"a"'), ("3.2", '"b"') ]
+	)
+
+@timed(1)
+@raises(netsnmpTestEnv.NotWritableError)
+def test_SET_VirtualTableCell_raises_Exception():
+	""" SET(VirtualTable cell, 42) raises Exception
+
+	This tests that VirtualTables are read-only. """
+
+	global testenv
+
+	testenv.snmpset("TEST-MIB::testMIBObjects.5.1.2.1", 42, "i")
+
+@timed(1)
+def test_GET_VirtualTable_provider_raising_eq_genError():
+	""" GET(VirtualTable cell, provider raising) == genError
+
+	This tests that an exception raised by a VirtualTable's provider makes
+	the request fail with a genError instead of leaving it unanswered, and
+	that other requests keep being served afterwards. """
+
+	global testenv
+
+	try:
+		testenv.snmpget("TEST-MIB::testMIBObjects.99.1.2.1")
+		ok_(False, "GET did not fail")
+	except subprocess.CalledProcessError as e:
+		ok_(re.search(r"genError", e.output), e.output)
+
+	(data, datatype) = testenv.snmpget("TEST-MIB::testMIBObjects.5.1.2.2")
+	eq_(int(data), 20)
+
+@timed(1)
+def test_GETNEXT_VirtualTable_provider_raising_eq_genError():
+	""" GETNEXT(VirtualTable, provider raising) == genError """
+
+	global testenv
+
+	try:
+		testenv.snmpgetnext("TEST-MIB::testMIBObjects.99")
+		ok_(False, "GETNEXT did not fail")
+	except subprocess.CalledProcessError as e:
+		ok_(re.search(r"genError", e.output), e.output)
+
+@timed(1)
+def test_VirtualTable_encodeIndex_decodeIndex_eq_values():
+	""" decodeIndex(encodeIndex(values)) == values """
+
+	global stringVirtualTable
+
+	eq_(stringVirtualTable.encodeIndex(("ab",)), (2, 97, 98))
+	eq_(stringVirtualTable.decodeIndex((2, 97, 98)), ("ab",))
+
+@timed(1)
+def test_VirtualTable_decodeIndex_invalid_string_eq_dot_notation():
+	""" decodeIndex(index OID of undecodable string) == octets in dot notation
+
+	This tests that VirtualTables decode string indexes like Tables do,
+	falling back to the dot notation for octets that can't be decoded. """
+
+	global stringVirtualTable
+
+	eq_(stringVirtualTable.decodeIndex((2, 255, 0)), ("255.0",))
+	eq_(stringVirtualTable.value(), { "a": { 2: 1 } })
+
+@timed(1)
+def test_GET_ColumnarTableCell_eq_200():
+	""" GET(ColumnarTable cell) == 200
+
+	This tests that a ColumnarTable serves the cells given to setRows(). """
+
+	global testenv
+
+	(data, datatype) = testenv.snmpget("TEST-MIB::testMIBObjects.6.1.2.2")
+	eq_(datatype, "INTEGER")
+	eq_(int(data), 200)
+
+@timed(1)
+def test_GETNEXT_ColumnarTable_last_row_eq_next_column():
+	""" GETNEXT(ColumnarTable cell in the last row) == next column's first cell
+
+	This tests that GETNEXT follows the rows' index order, not the order
+	given to setRows(). """
+
+	global testenv
+
+	(oid, data, datatype) = testenv.snmpgetnext("TEST-MIB::testMIBObjects.6.1.2.3")
+	eq_(oid, "TEST-MIB::testMIBObjects.6.1.3.1")
+	eq_(datatype, "STRING")
+	eq_(data, "x")
+
+@timed(1)
+def test_GETBULK_ColumnarTable_eq_all_cells():
+	""" GETBULK(ColumnarTable) == all cells in index order """
+
+	global testenv
+
+	output = testenv.snmpbulkwalk("TEST-MIB::testMIBObjects.6")
+	eq_(
+		re.findall(r"testMIBObjects\.6\.1\.(\d+\.\d+) = \w+: (\S+)", output),
+		[
+			("2.1", "100"), ("2.2", "200"), ("2.3", "300"),
+			("3.1", '"x"'), ("3.2", '"y"'), ("3.3", '"z"')
+		]
+	)
+
+@timed(1)
+@raises(netsnmpTestEnv.NotWritableError)
+def test_SET_ColumnarTableCell_raises_Exception():
+	""" SET(ColumnarTable cell, 42) raises Exception
+
+	This tests that ColumnarTables are read-only for SNMP clients. """
+
+	global testenv
+
+	testenv.snmpset("TEST-MIB::testMIBObjects.6.1.2.1", 42, "i")
+
+@timed(1)
+def test_GET_ColumnarTable_setCell_42_eq_42():
+	""" GET(ColumnarTable.setCell(42)) == 42 """
+
+	global testenv, columnarTable
+
+	columnarTable.setCell(1, 2, 42)
+
+	(data, datatype) = testenv.snmpget("TEST-MIB::testMIBObjects.6.1.2.1")
+	eq_(datatype, "INTEGER")
+	eq_(int(data), 42)
+
+@timed(1)
+@raises(netsnmpagent.netsnmpAgentException)
+def test_ColumnarTable_setCell_out_of_range_raises_Exception():
+	""" ColumnarTable.setCell(out of range value) raises Exception """
+
+	global columnarTable
+
+	columnarTable.setCell(1, 2, 2 ** 70)
+
+@timed(1)
+@raises(netsnmpagent.netsnmpAgentException)
+def test_ColumnarTable_setColumn_wrong_type_raises_Exception():
+	""" ColumnarTable.setColumn(values of the wrong type) raises Exception """
+
+	global columnarTable
+
+	columnarTable.setColumn(3, [ "a", 2, "c" ])
+
+def tableRows(rows):
+	""" Returns (idxobjs, cells) tuples as expected by Table.addRows() for
+	    the (index, value) tuples "rows". """
+
+	global agent
+
+	return [
+		([ agent.Integer32(idx) ], { 2: agent.Integer32(val) })
+		for idx, val in rows
+	]
+
+@timed(1)
+def test_WALK_Table_addRows_interleaved_eq_sorted():
+	""" WALK(Table.addRows() with interleaved indexes) == rows in index order
+
+	This tests that rows added through addRows(), unsorted and interleaved
+	with the rows of an earlier call, can be walked in index order. """
+
+	global bulkTable
+
+	bulkTable.addRows(tableRows([ (5, 50), (1, 10), (3, 30) ]))
+	eq_(walkTableColumn("TEST-MIB::testMIBObjects.7.1.2"), [
+		(1, 10), (3, 30), (5, 50)
+	])
+
+	bulkTable.addRows(tableRows([ (6, 60), (4, 40), (2, 20) ]))
+	eq_(walkTableColumn("TEST-MIB::testMIBObjects.7.1.2"), [
+		(1, 10), (2, 20), (3, 30), (4, 40), (5, 50), (6, 60)
+	])
+
+@timed(1)
+def test_WALK_Table_addRows_duplicates_replace_rows():
+	""" WALK(Table.addRows() with duplicate indexes) == last values
+
+	This tests that addRows() replaces existing rows with the same index
+	and that of duplicates within one call the last one wins. """
+
+	global bulkTable
+
+	bulkTable.addRows(tableRows([ (3, 33), (7, 70), (7, 77), (0, 0) ]))
+	eq_(walkTableColumn("TEST-MIB::testMIBObjects.7.1.2"), [
+		(0, 0), (1, 10), (2, 20), (3, 33), (4, 40), (5, 50), (6, 60),
+		(7, 77)
+	])
+	eq_(bulkTable.memoryUsage()["rows"], 8)
+
+@timed(1)
+def test_WALK_Table_beginRebuild_commit_eq_new_rows():
+	""" WALK(Table rebuilt with beginRebuild() and commit()) == new rows
+
+	This tests that rows added to a rebuild are not visible until it gets
+	committed and then replace the table's rows entirely. """
+
+	global agent, rebuiltTable
+
+	rebuild = rebuiltTable.beginRebuild()
+	rebuild.addRow([ agent.Integer32(4) ]).setRowCell(2, agent.Integer32(40))
+	rebuild.addRows(tableRows([ (5, 50), (3, 30) ]))
+	eq_(walkTableColumn("TEST-MIB::testMIBObjects.8.1.2"), [ (1, 10), (2, 20) ])
+
+	rebuild.commit()
+	eq_(walkTableColumn("TEST-MIB::testMIBObjects.8.1.2"), [
+		(3, 30), (4, 40), (5, 50)
+	])
+	eq_(rebuiltTable.getRow(1), None)
+
+@timed(1)
+def test_WALK_Table_beginRebuild_abort_eq_old_rows():
+	""" WALK(Table rebuilt with beginRebuild() and abort()) == old rows
+
+	This tests that aborting a rebuild leaves the table unchanged and that
+	the table's rows can still be changed afterwards. """
+
+	global agent, rebuiltTable
+
+	rebuild = rebuiltTable.beginRebuild()
+	rebuild.addRows(tableRows([ (1, 10), (9, 90) ]))
+	rebuild.abort()
+	eq_(walkTableColumn("TEST-MIB::testMIBObjects.8.1.2"), [
+		(3, 30), (4, 40), (5, 50)
+	])
+
+	rebuiltTable.removeRow(4)
+	rebuiltTable.addRows(tableRows([ (6, 60) ]))
+	eq_(walkTableColumn("TEST-MIB::testMIBObjects.8.1.2"), [
+		(3, 30), (5, 50), (6, 60)
+	])
+
+@timed(1)
+def test_GET_ScalarGroupInteger32_eq_1():
+	""" GET(ScalarGroup Integer32(1)) == 1
+
+	This tests that a scalar added to a ScalarGroup is served at its
+	instance OID. """
+
+	global testenv
+
+	(data, datatype) = testenv.snmpget("TEST-MIB::testMIBObjects.9.1.0")
+	eq_(datatype, "INTEGER")
+	eq_(int(data), 1)
+
+@timed(1)
+def test_GET_ScalarGroup_missing_instance_eq_NoSuchInstance():
+	""" GET(ScalarGroup OID without instance) == No Such Instance """
+
+	global testenv
+
+	(data, datatype) = testenv.snmpget("TEST-MIB::testMIBObjects.9.1")
+	ok_(data.startswith("No Such Instance"))
+
+@timed(1)
+def test_GETNEXT_ScalarGroup_object_eq_instance():
+	""" GETNEXT(ScalarGroup object OID) == its instance """
+
+	global testenv
+
+	(oid, data, datatype) = testenv.snmpgetnext("TEST-MIB::testMIBObjects.9.2")
+	eq_(oid, "TEST-MIB::testMIBObjects.9.2.0")
+	eq_(datatype, "STRING")
+	eq_(data, "two")
+
+@timed(1)
+def test_GETBULK_ScalarGroup_eq_all_instances():
+	""" GETBULK(ScalarGroup) == all instances in OID order """
+
+	global testenv
+
+	output = testenv.snmpbulkwalk("TEST-MIB::testMIBObjects.9")
+	eq_(
+		re.findall(r"testMIBObjects\.9\.(\d+\.\d+) = \w+: (\S+)", output),
+		[ ("1.0", "1"), ("2.0", '"two"'), ("3.0", "3") ]
+	)
+
+@timed(1)
+def test_GET_SET_ScalarGroupInteger32_42_eq_42():
+	""" GET(SET(ScalarGroup Integer32(1), 42)) == 42
+
+	This tests that snmpset on a writable instance of a ScalarGroup changes
+	the SNMP object's value. """
+
+	global testenv, scalarGroupInteger32
+
+	print(testenv.snmpset("TEST-MIB::testMIBObjects.9.1.0", 42, "i"))
+	eq_(scalarGroupInteger32.value(), 42)
+
+	(data, datatype) = testenv.snmpget("TEST-MIB::testMIBObjects.9.1.0")
+	eq_(datatype, "INTEGER")
+	eq_(int(data), 42)
+
+@timed(1)
+@raises(netsnmpTestEnv.NotWritableError)
+def test_SET_ScalarGroupReadOnly_raises_Exception():
+	""" SET(ScalarGroup read-only Integer32, 42) raises Exception """
+
+	global testenv
+
+	testenv.snmpset("TEST-MIB::testMIBObjects.9.3.0", 42, "i")
+
+@nottest
+def eq_mirror_reads():
+	""" Checks that reading the table with a mirror returns the same as
+	    reading the table without one, including the order of the rows. """
+
+	global mirroredTable, plainTable
+
+	eq_(list(mirroredTable.value().items()), list(plainTable.value().items()))
+	eq_(list(mirroredTable.iterRows()), list(plainTable.iterRows()))
+	eq_(list(mirroredTable.iterRows([ 2 ])), list(plainTable.iterRows([ 2 ])))
+	for indices in plainTable.value():
+		if indices != 0:
+			eq_(mirroredTable.rowValue(indices), plainTable.rowValue(indices))
+
+@timed(1)
+def test_Table_mirror_addRow_eq_no_mirror():
+	""" Table(mirror=True).value() == Table().value() after addRow()
+
+	This tests that rows added out of order come back in index order from
+	a table with a mirror just like from one without. """
+
+	global mirroredTable, plainTable, mirroredCounter32, plainCounter32
+
+	for table, counter in ((mirroredTable, mirroredCounter32),
+	                       (plainTable, plainCounter32)):
+		for idx in (3, 1, 2):
+			row = table.addRow([ agent.Integer32(idx) ])
+			row.setRowCell(2, agent.Integer32(idx * 10))
+		table.getRow(1).bindCell(3, counter)
+
+	eq_([ indices for indices, cells in mirroredTable.iterRows() ], [ 1, 2, 3 ])
+	eq_mirror_reads()
+
+@timed(1)
+def test_Table_mirror_bound_cell_eq_no_mirror():
+	""" Table(mirror=True).value() == Table().value() after bound cell updates
+
+	This tests that a table's mirror returns the current values of bound
+	cells. """
+
+	global mirroredTable, plainTable, mirroredCounter32, plainCounter32
+
+	mirroredCounter32.increment(5)
+	plainCounter32.increment(5)
+
+	eq_(mirroredTable.rowValue(1)[3], 6)
+	eq_mirror_reads()
+
+@timed(1)
+def test_Table_mirror_setRowCell_eq_no_mirror():
+	""" Table(mirror=True).value() == Table().value() after setRowCell() """
+
+	global mirroredTable, plainTable
+
+	for table in (mirroredTable, plainTable):
+		table.getRow(3).setRowCell(2, agent.Integer32(33))
+		table.getRow(1).setRowCell(3, agent.Counter32(7))
+
+	eq_(mirroredTable.rowValue(3)[2], 33)
+	eq_mirror_reads()
+
+@timed(1)
+def test_Table_mirror_SET_eq_no_mirror():
+	""" Table(mirror=True).value() == Table().value() after SNMP SETs """
+
+	global testenv, mirroredTable, mirroredCounter32, plainCounter32
+
+	testenv.snmpset("TEST-MIB::testMIBObjects.12.1.2.2", 42, "i")
+	testenv.snmpset("TEST-MIB::testMIBObjects.13.1.2.2", 42, "i")
+
+	eq_(mirroredTable.rowValue(2)[2], 42)
+	eq_mirror_reads()
+
+@timed(1)
+def test_Table_mirror_removeRow_eq_no_mirror():
+	""" Table(mirror=True).value() == Table().value() after removeRow() """
+
+	global mirroredTable, plainTable
+
+	for table in (mirroredTable, plainTable):
+		table.removeRow(2)
+
+	eq_(mirroredTable.rowValue(2), None)
+	eq_mirror_reads()
+
+@timed(1)
+def test_Table_mirror_clear_eq_no_mirror():
+	""" Table(mirror=True).value() == Table().value() after clear() """
+
+	global mirroredTable, plainTable
+
+	for table in (mirroredTable, plainTable):
+		table.clear()
+
+	eq_(list(mirroredTable.iterRows()), [])
+	eq_mirror_reads()
+
+@timed(1)
+def test_Integer32_instances_share_class():
+	""" type(Integer32()) is type(Integer32()), without instance dictionaries
+
+	This tests that SNMP objects of the same type, registered or not, are
+	instances of one class named after the type, which keeps their fields
+	in slots rather than a dictionary per instance. """
+
+	global agent, settableInteger32, sharedInteger32s
+
+	snmpobjs = sharedInteger32s + [ settableInteger32, agent.Integer32() ]
+	for snmpobj in snmpobjs:
+		ok_(type(snmpobj) is type(settableInteger32))
+		ok_(not hasattr(snmpobj, "__dict__"))
+	eq_(type(settableInteger32).__name__, "Integer32")
+	ok_(type(agent.Unsigned32()) is not type(settableInteger32))
+	assert_raises(AttributeError, setattr, settableInteger32, "foo", 1)
+
+@timed(1)
+def test_WALK_Integer32_instances_sharing_class():
+	""" WALK(Integer32 instances sharing a class) == their own values
+
+	This tests that SNMP objects sharing a class each serve their own C
+	variable, also after one of them got updated. """
+
+	global testenv, sharedInteger32s
+
+	oid = "TEST-MIB::testMIBObjects.15"
+	output = testenv.snmpwalk(oid)
+	eq_(
+		re.findall(re.escape(oid) + r"\.(\d+)\.0 = INTEGER: (-?\d+)", output),
+		[ ("1", "1"), ("2", "2"), ("3", "3") ]
+	)
+
+	sharedInteger32s[1].update(42)
+	(data, datatype) = testenv.snmpget("TEST-MIB::testMIBObjects.15.2.0")
+	eq_(int(data), 42)
+	(data, datatype) = testenv.snmpget("TEST-MIB::testMIBObjects.15.3.0")
+	eq_(int(data), 3)
+	eq_([ snmpobj.value() for snmpobj in sharedInteger32s ], [ 1, 42, 3 ])
+
+@nottest
+def cellStorage(column):
+	""" Returns a tuple of the address and the length of the value held by
+	    the cell in "column" of cellTable's row 1. """
+
+	global cellTable
+
+	storage = cellTable.getRow(1)._storage(column)
+	return (storage.data.voidp, storage.data_len)
+
+@timed(1)
+def test_GET_setCells_same_size_eq_value():
+	""" GET(Table cell) == value after setCells() of a same-size value
+
+	This tests that setting a cell to a value of the same fixed-size type
+	overwrites it in place instead of reallocating its storage. """
+
+	global testenv, agent, cellTable
+
+	row = cellTable.getRow(1)
+	row.setCells({ 2: 1 })
+	storage = cellStorage(2)
+
+	row.setCells({ 2: 2 })
+	eq_(cellStorage(2), storage)
+	(data, datatype) = testenv.snmpget("TEST-MIB::testMIBObjects.14.1.2.1")
+	eq_(datatype, "INTEGER")
+	eq_(int(data), 2)
+
+	row.setRowCell(2, agent.Integer32(3))
+	eq_(cellStorage(2), storage)
+	(data, datatype) = testenv.snmpget("TEST-MIB::testMIBObjects.14.1.2.1")
+	eq_(int(data), 3)
+
+@timed(1)
+def test_GET_setCells_shorter_and_longer_string_eq_value():
+	""" GET(Table cell) == value after setCells() of shorter and longer strings
+
+	This tests that setting a string cell to values of a different length
+	reallocates its storage, both when shrinking and when growing it. """
+
+	global testenv, cellTable
+
+	row = cellTable.getRow(1)
+	for value in ("abcdef", "ab", "abcdefgh", ""):
+		row.setCells({ 3: value })
+		eq_(cellStorage(3)[1], len(value))
+		(data, datatype) = testenv.snmpget("TEST-MIB::testMIBObjects.14.1.3.1")
+		eq_(datatype, "STRING")
+		eq_(data, value)
+
+@timed(1)
+def test_GET_setRowCell_other_type_eq_value():
+	""" GET(Table cell) == value after setRowCell() of a value of another type
+
+	This tests that setting a cell to a value of the same size but another
+	type reallocates its storage, so that the new type gets served. """
+
+	global testenv, agent, cellTable
+
+	row = cellTable.getRow(1)
+	row.setRowCell(2, agent.Counter32(7))
+	(data, datatype) = testenv.snmpget("TEST-MIB::testMIBObjects.14.1.2.1")
+	eq_(datatype, "Counter32")
+	eq_(int(data), 7)
+
+	row.setRowCell(2, agent.Integer32(8))
+	(data, datatype) = testenv.snmpget("TEST-MIB::testMIBObjects.14.1.2.1")
+	eq_(datatype, "INTEGER")
+	eq_(int(data), 8)
+	eq_(cellTable.rowValue(1), { 2: 8, 3: "" })
+
+@timed(1)
+def test_GET_setCells_symbolic_OID_eq_numeric_OID():
+	""" GET(Table cell) after setCells(symbolic OID) == after setCells(numeric OID)
+
+	This tests that setCells() resolves OBJECT IDENTIFIERs given by name,
+	just like the index values of addRow() do. """
+
+	global testenv, oidTable
+
+	oidTable.getRow(1).setCells({ 2: "TEST-MIB::testMIBObjects" })
+	oidTable.getRow(2).setCells({ 2: ".1.3.6.1.2.1.74.1.101.1" })
+
+	(data, datatype) = testenv.snmpget("TEST-MIB::testMIBObjects.16.1.2.1")
+	eq_(datatype, "OID")
+	eq_(testenv.snmpget("TEST-MIB::testMIBObjects.16.1.2.2"), (data, datatype))
+
+@timed(1)
+@raises(netsnmpagent.netsnmpAgentException)
+def test_setCells_unknown_symbolic_OID_raises_Exception():
+	""" setCells(unknown symbolic OID) raises Exception """
+
+	global oidTable
+
+	oidTable.getRow(1).setCells({ 2: "TEST-MIB::noSuchObject" })
+
+@timed(1)
+def test_setCells_too_long_string_raises_Exception():
+	""" setCells(string longer than MAX_STRING_SIZE) raises Exception
+
+	This tests that setCells() refuses strings an OctetString passed to
+	setRowCell() could not hold either, leaving the cell unchanged, while
+	strings of exactly MAX_STRING_SIZE bytes get set. """
+
+	global testenv, cellTable
+
+	row = cellTable.getRow(1)
+	value = "x" * netsnmpagent.MAX_STRING_SIZE
+	row.setCells({ 3: value })
+
+	assert_raises(
+		netsnmpagent.netsnmpAgentException,
+		row.setCells,
+		{ 3: value + "x" }
+	)
+	(data, datatype) = testenv.snmpget("TEST-MIB::testMIBObjects.14.1.3.1")
+	eq_(data, value)
+
+@timed(1)
+def test_memoryReport_includes_handler_based_tables():
+	""" memoryReport() includes VirtualTables and ColumnarTables """
+
+	global agent
+
+	tables = agent.memoryReport()["tables"][""]
+	eq_(tables["TEST-MIB::testMIBObjects.5"]["rows"], 0)
+	eq_(tables["TEST-MIB::testMIBObjects.6"]["rows"], 3)
+	eq_(tables["TEST-MIB::testMIBObjects.6"]["cells"], 6)
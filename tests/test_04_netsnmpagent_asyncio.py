@@ -0,0 +1,156 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# python-netsnmpagent module
+# Copyright (c) 2013-2016 Pieter Hollants <pieter@hollants.com>
+# Licensed under the GNU Lesser Public License (LGPL) version 3
+#
+# Integration tests for the netsnmpagent module (asyncio integration)
+#
+
+import sys, os, signal
+from nose.tools import *
+from nose.plugins.skip import SkipTest
+sys.path.insert(1, "..")
+from netsnmptestenv import netsnmpTestEnv
+import netsnmpagent
+
+try:
+	import asyncio
+except ImportError:
+	asyncio = None
+
+def setUp(self):
+	global testenv, agent, settableInteger32
+
+	if asyncio is None:
+		raise SkipTest("asyncio not available")
+
+	testenv = netsnmpTestEnv()
+
+	# Create a new netsnmpAgent instance which
+	# - connects to the net-snmp test environment's snmpd instance
+	# - uses its statedir
+	# - loads the TEST-MIB from our tests directory
+	testMIBPath = os.path.abspath(os.path.dirname(__file__)) + \
+				  "/TEST-MIB.txt"
+	agent = netsnmpagent.netsnmpAgent(
+		AgentName      = "netsnmpAgentTestAgent",
+		MasterSocket   = testenv.mastersocket,
+		PersistenceDir = testenv.statedir,
+		MIBFiles       = [ testMIBPath ],
+	)
+
+	settableInteger32 = agent.Integer32(
+		oidstr  = "TEST-MIB::testInteger32NoInitval",
+		initval = 1,
+	)
+
+	# Connect to master snmpd instance. Unlike in the other tests, requests
+	# are processed from within an event loop, so there is no thread
+	# calling check_and_process().
+	agent.start()
+
+def tearDown(self):
+	global testenv, agent
+
+	if "agent" in globals():
+		agent.asyncio_detach()
+		agent.shutdown()
+
+	if "testenv" in globals():
+		testenv.shutdown()
+
+@nottest
+def new_attached_event_loop():
+	""" Creates a new event loop the agent gets attached to from within the
+	    loop, ie. without passing the loop to asyncio_attach(). """
+
+	loop = asyncio.new_event_loop()
+	loop.call_soon(agent.asyncio_attach)
+	return loop
+
+@nottest
+def snmpget_in_event_loop(loop, oid):
+	""" Runs a snmpget in the default executor of "loop" and runs the loop
+	    until it has finished, so the only thread processing SNMP requests
+	    is the one running the event loop. """
+
+	return loop.run_until_complete(
+		loop.run_in_executor(None, testenv.snmpget, oid)
+	)
+
+@timed(1)
+def test_asyncio_attach_cancels_alarm_timer():
+	""" asyncio_attach() after start() cancels the alarm timer
+
+	This tests that attaching an agent started with AlarmSignals switches
+	it to running net-snmp's alarms from the event loop and cancels the
+	interval timer armed for them, so that no SIGALRM runs them from the
+	signal handler in the meantime. """
+
+	global agent
+
+	eq_(agent.AlarmSignals, True)
+	signal.setitimer(signal.ITIMER_REAL, 10)
+
+	loop = new_attached_event_loop()
+	try:
+		loop.run_until_complete(asyncio.sleep(0))
+	finally:
+		agent.asyncio_detach()
+		loop.close()
+
+	eq_(agent.AlarmSignals, False)
+	eq_(signal.getitimer(signal.ITIMER_REAL), (0.0, 0.0))
+
+@timed(1)
+def test_GET_Integer32_from_event_loop_eq_1():
+	""" GET(Integer32(initval=1)) == 1 from within an event loop
+
+	This tests that an agent attached to an asyncio event loop serves a
+	snmpget while the loop is waiting for it. """
+
+	loop = new_attached_event_loop()
+	try:
+		(data, datatype) = snmpget_in_event_loop(loop, "TEST-MIB::testInteger32NoInitval.0")
+	finally:
+		agent.asyncio_detach()
+		loop.close()
+
+	eq_(datatype, "INTEGER")
+	eq_(int(data), 1)
+
+@timed(2)
+def test_GET_Integer32_updated_inbetween_eq_42():
+	""" GET(Integer32()) == 42 after update inbetween requests
+
+	This tests that after a first request has been served, the agent's file
+	descriptors and timeout have been registered with the event loop again
+	so that a second snmpget is served as well, returning the value the SNMP
+	object has been updated with in the meantime. """
+
+	global settableInteger32
+
+	loop = new_attached_event_loop()
+	try:
+		(data, datatype) = snmpget_in_event_loop(loop, "TEST-MIB::testInteger32NoInitval.0")
+		eq_(int(data), 1)
+		settableInteger32.update(42)
+		(data, datatype) = snmpget_in_event_loop(loop, "TEST-MIB::testInteger32NoInitval.0")
+	finally:
+		agent.asyncio_detach()
+		loop.close()
+
+	eq_(datatype, "INTEGER")
+	eq_(int(data), 42)
+
+@timed(1)
+@raises(RuntimeError)
+def test_asyncio_attach_without_running_loop_raises_Exception():
+	""" asyncio_attach() outside of an event loop raises Exception
+
+	This tests that asyncio_attach() does not silently pick up or create an
+	event loop nobody is running when called without a "loop" argument. """
+
+	agent.asyncio_attach()
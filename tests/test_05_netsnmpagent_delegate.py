@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# python-netsnmpagent module
+# Copyright (c) 2013-2016 Pieter Hollants <pieter@hollants.com>
+# Licensed under the GNU Lesser Public License (LGPL) version 3
+#
+# Integration tests for the netsnmpagent module (delegated requests)
+#
+
+import sys, os, threading, time
+from nose.tools import *
+sys.path.insert(1, "..")
+from netsnmptestenv import netsnmpTestEnv
+import netsnmpagent
+import netsnmpapi
+
+# How long the delegated work for the slow SNMP object takes
+DELAY = 0.5
+
+def setUp(self):
+	global testenv, agent, slowInteger32
+
+	testenv = netsnmpTestEnv()
+
+	# Create a new netsnmpAgent instance which
+	# - connects to the net-snmp test environment's snmpd instance
+	# - uses its statedir
+	# - loads the TEST-MIB from our tests directory
+	testMIBPath = os.path.abspath(os.path.dirname(__file__)) + \
+				  "/TEST-MIB.txt"
+	agent = netsnmpagent.netsnmpAgent(
+		AgentName      = "netsnmpAgentTestAgent",
+		MasterSocket   = testenv.mastersocket,
+		PersistenceDir = testenv.statedir,
+		MIBFiles       = [ testMIBPath ],
+	)
+
+	# A scalar whose GETs get delegated to work taking DELAY seconds, after
+	# which it gets updated with the work's result
+	def slowWork():
+		time.sleep(DELAY)
+		return 42
+
+	def slowCallback(handler, reginfo, reqinfo, requests):
+		if reqinfo.contents.mode != netsnmpapi.MODE_GET:
+			return netsnmpapi.SNMP_ERR_NOERROR
+		return agent.delegate(handler, reginfo, reqinfo, requests,
+		                      slowWork, complete = slowInteger32.update)
+
+	slowInteger32 = agent.Integer32(
+		oidstr   = "TEST-MIB::testInteger32NoInitval",
+		writable = False,
+		callback = slowCallback,
+	)
+
+	# A scalar answered right away
+	agent.Integer32(
+		oidstr  = "TEST-MIB::testInteger32OneInitval",
+		initval = 1,
+	)
+
+	# Connect to master snmpd instance
+	agent.start()
+
+	# Unlike in the other tests, the thread processing requests blocks in
+	# check_and_process(), so completed delegations must wake it up
+	agent.loop = True
+	def RequestHandler():
+		while agent.loop:
+			agent.check_and_process(True)
+
+	agent.thread = threading.Thread(target=RequestHandler)
+	agent.thread.daemon = True
+	agent.thread.start()
+
+def tearDown(self):
+	global testenv, agent
+
+	if "agent" in globals():
+		agent.loop = False
+		if hasattr(agent, "thread"):
+			# Wake up the blocking check_and_process() call
+			try:
+				testenv.snmpget("TEST-MIB::testInteger32OneInitval.0")
+			except Exception:
+				pass
+			agent.thread.join()
+		agent.shutdown()
+
+	if "testenv" in globals():
+		testenv.shutdown()
+
+@timed(2)
+def test_GET_delegated_Integer32_does_not_block_other_GETs():
+	""" GET(delegated Integer32) == 42 while GET(Integer32(initval=1)) == 1
+
+	This tests that while the work for a GET delegated through
+	agent.delegate() is being done, another snmpget gets answered, and that
+	the delegated GET's response arrives once the work has finished, with
+	the value the "complete" function updated the SNMP object with. The
+	thread processing SNMP requests blocks in check_and_process() all the
+	time, so it has to be woken up for the delayed response to be sent. """
+
+	slow = {}
+	def slowGet():
+		slow["start"] = time.time()
+		slow["result"] = testenv.snmpget("TEST-MIB::testInteger32NoInitval.0")
+		slow["end"] = time.time()
+
+	slowThread = threading.Thread(target=slowGet)
+	slowThread.start()
+
+	# Give the slow GET the time to get delegated
+	time.sleep(DELAY / 5)
+	(data, datatype) = testenv.snmpget("TEST-MIB::testInteger32OneInitval.0")
+	fastEnd = time.time()
+	eq_(datatype, "INTEGER")
+	eq_(int(data), 1)
+
+	slowThread.join()
+	ok_("result" in slow, "Delegated GET failed")
+	ok_(fastEnd < slow["end"], "GET was blocked by delegated GET")
+	ok_(slow["end"] - slow["start"] >= DELAY, "Delegated GET answered too early")
+
+	(data, datatype) = slow["result"]
+	eq_(datatype, "INTEGER")
+	eq_(int(data), 42)
@@ -0,0 +1,149 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# python-netsnmpagent module
+# Copyright (c) 2013-2016 Pieter Hollants <pieter@hollants.com>
+# Licensed under the GNU Lesser Public License (LGPL) version 3
+#
+# Integration tests for the netsnmpmibgen code generator
+#
+
+import sys, os, subprocess, threading
+from nose.tools import *
+sys.path.insert(1, "..")
+from netsnmptestenv import netsnmpTestEnv
+import netsnmpagent
+
+def setUp(self):
+	global testenv, agent, testMIB, testMIBFile, testMIBObjs
+
+	testenv = netsnmpTestEnv()
+
+	# Generate the module for the TEST-MIB from our tests directory. This
+	# happens in a separate process, just like it would at build time, so
+	# that net-snmp's MIB parser used by generate() doesn't interfere with
+	# our agent.
+	testsDir    = os.path.abspath(os.path.dirname(__file__))
+	testMIBPath = os.path.join(testsDir, "TEST-MIB.txt")
+	testMIBFile = os.path.join(testenv.statedir, "test_mib.py")
+	subprocess.check_call([
+		sys.executable,
+		"-c",
+		"import sys; sys.path.insert(1, sys.argv[1]); import netsnmpmibgen; "
+		"open(sys.argv[3], 'w').write(netsnmpmibgen.generate(sys.argv[2]))",
+		os.path.join(testsDir, ".."),
+		testMIBPath,
+		testMIBFile
+	])
+
+	# Execute the generated module
+	testMIB = {}
+	with open(testMIBFile) as f:
+		exec(compile(f.read(), testMIBFile, "exec"), testMIB)
+
+	# Create a new netsnmpAgent instance which
+	# - connects to the net-snmp test environment's snmpd instance
+	# - uses its statedir
+	# - does not use MIB files at all, relying on the generated module
+	agent = netsnmpagent.netsnmpAgent(
+		AgentName      = "netsnmpAgentTestAgent",
+		MasterSocket   = testenv.mastersocket,
+		PersistenceDir = testenv.statedir,
+		UseMIBFiles    = False,
+	)
+
+	testMIBObjs = testMIB["register"](agent)
+	testMIBObjs["testTable"].addRow([ agent.Integer32(1) ])
+
+	# Connect to master snmpd instance
+	agent.start()
+
+	# Create a separate thread to implement the absolutely most
+	# minimalistic possible agent doing nothing but request handling
+	agent.loop = True
+	def RequestHandler():
+		while agent.loop:
+			agent.check_and_process(False)
+
+	agent.thread = threading.Thread(target=RequestHandler)
+	agent.thread.daemon = True
+	agent.thread.start()
+
+def tearDown(self):
+	global testenv, agent
+
+	if "agent" in globals():
+		agent.loop = False
+		if hasattr(agent, "thread"):
+			agent.thread.join()
+		agent.shutdown()
+
+	if "testenv" in globals():
+		testenv.shutdown()
+
+@timed(1)
+def test_generated_module_describes_TEST_MIB():
+	""" generate(TEST-MIB) describes TEST-MIB's scalars and tables
+
+	This tests that the generated module contains the numeric OIDs of
+	TEST-MIB's objects and the layout of its tables, as resolved by net-snmp's
+	MIB parser. """
+
+	global testMIB
+
+	eq_(testMIB["MODULE"], "TEST-MIB")
+
+	scalars = dict((scalar[0], scalar) for scalar in testMIB["SCALARS"])
+	eq_(
+		scalars["testInteger32NoInitval"],
+		("testInteger32NoInitval", "Integer32", ".1.3.6.1.2.1.74.1.101.1.1.1.1", None, True)
+	)
+
+	tables = dict((table[0], table) for table in testMIB["TABLES"])
+	eq_(
+		tables["testTable"],
+		("testTable", ".1.3.6.1.2.1.74.1.101.1.20.1", ("Integer32",), (
+			(2, "Integer32", 42, True),
+		), False)
+	)
+
+@timed(1)
+def test_generated_module_skips_IMPLIED_index():
+	""" generate(TEST-MIB) skips tables with IMPLIED indexes
+
+	This tests that tables with IMPLIED indexes, which Table can't encode,
+	are not generated with length-prefixed indexes but recorded as skipped
+	instead. """
+
+	global testMIB, testMIBFile, testMIBObjs
+
+	with open(testMIBFile) as f:
+		ok_("testImpliedTable (IMPLIED index testImpliedTableName)" in f.read())
+	ok_("testImpliedTable" not in [table[0] for table in testMIB["TABLES"]])
+	eq_(testMIBObjs.get("testImpliedTable"), None)
+
+@timed(1)
+def test_GET_generated_Integer32_eq_Zero():
+	""" GET(generated Integer32) == 0
+
+	This tests that register() of the generated module registered the
+	TEST-MIB's scalars, without the agent having parsed the MIB. """
+
+	global testenv
+
+	(data, datatype) = testenv.snmpget("TEST-MIB::testInteger32NoInitval.0")
+	eq_(datatype, "INTEGER")
+	eq_(int(data), 0)
+
+@timed(1)
+def test_GET_generated_TableCell_eq_DEFVAL():
+	""" GET(generated Table cell) == DEFVAL
+
+	This tests that register() of the generated module registered the
+	TEST-MIB's tables with the columns' DEFVALs as default values. """
+
+	global testenv
+
+	(data, datatype) = testenv.snmpget("TEST-MIB::testTableValue.1")
+	eq_(datatype, "INTEGER")
+	eq_(int(data), 42)
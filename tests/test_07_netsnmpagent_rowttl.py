@@ -0,0 +1,149 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# python-netsnmpagent module
+# Copyright (c) 2013-2016 Pieter Hollants <pieter@hollants.com>
+# Licensed under the GNU Lesser Public License (LGPL) version 3
+#
+# Integration tests for the netsnmpagent module (table row TTLs)
+#
+
+import sys, os, re, threading, time
+from nose.tools import *
+sys.path.insert(1, "..")
+from netsnmptestenv import netsnmpTestEnv
+import netsnmpagent
+
+# The row TTL of the table whose rows expire
+TTL = 0.5
+
+def setUp(self):
+	global testenv, agent, ttlTable, ttlCounter
+
+	testenv = netsnmpTestEnv()
+
+	# Create a new netsnmpAgent instance which
+	# - connects to the net-snmp test environment's snmpd instance
+	# - uses its statedir
+	# - loads the TEST-MIB from our tests directory
+	# - runs net-snmp's alarms without SIGALRM, as required for row TTLs
+	testMIBPath = os.path.abspath(os.path.dirname(__file__)) + \
+				  "/TEST-MIB.txt"
+	agent = netsnmpagent.netsnmpAgent(
+		AgentName      = "netsnmpAgentTestAgent",
+		MasterSocket   = testenv.mastersocket,
+		PersistenceDir = testenv.statedir,
+		MIBFiles       = [ testMIBPath ],
+		AlarmSignals   = False,
+	)
+
+	# Test OIDs for a table whose rows expire, counting its rows
+	ttlCounter = agent.Unsigned32(
+		oidstr   = "TEST-MIB::testMIBObjects.2.4",
+		writable = False,
+	)
+	ttlTable = agent.Table(
+		oidstr     = "TEST-MIB::testMIBObjects.11",
+		indexes    = [ agent.Integer32() ],
+		columns    = [ (2, agent.Integer32(0)) ],
+		counterobj = ttlCounter,
+		rowTTL     = TTL,
+	)
+
+	# Connect to master snmpd instance
+	agent.start()
+
+	# Create a separate thread to implement the absolutely most
+	# minimalistic possible agent doing nothing but request handling
+	agent.loop = True
+	def RequestHandler():
+		while agent.loop:
+			agent.check_and_process(False)
+
+	agent.thread = threading.Thread(target=RequestHandler)
+	agent.thread.daemon = True
+	agent.thread.start()
+
+def tearDown(self):
+	global testenv, agent
+
+	if "agent" in globals():
+		agent.loop = False
+		if hasattr(agent, "thread"):
+			agent.thread.join()
+		agent.shutdown()
+
+	if "testenv" in globals():
+		testenv.shutdown()
+
+@nottest
+def walkTTLTable():
+	""" Walks the column of the table whose rows expire and returns a list
+	    of (index, value) tuples, expecting that it may be empty. """
+
+	global testenv
+
+	oid = "TEST-MIB::testMIBObjects.11.1.2"
+	try:
+		output = testenv.snmpwalk(oid)
+	except netsnmpTestEnv.MIBUnavailableError:
+		return []
+	return [
+		(int(idx), int(val))
+		for idx, val in re.findall(re.escape(oid) + r"\.(\d+) = INTEGER: (-?\d+)", output)
+	]
+
+@timed(3)
+def test_WALK_Table_rowTTL_expires_untouched_rows():
+	""" WALK(Table(rowTTL=TTL)) drops rows not touched for TTL seconds
+
+	This tests that rows expire TTL seconds after they were added or last
+	touched, that touch() restarts a row's time to live and that the
+	table's counterobj follows. Expiry happens from within the thread
+	processing SNMP requests, without any further calls from us. """
+
+	global testenv, agent, ttlTable, ttlCounter
+
+	ttlTable.addRows([
+		([ agent.Integer32(idx) ], { 2: agent.Integer32(val) })
+		for idx, val in ((1, 10), (2, 20))
+	])
+	eq_(walkTTLTable(), [ (1, 10), (2, 20) ])
+	eq_(ttlCounter.value(), 2)
+
+	time.sleep(TTL * 0.6)
+	ttlTable.getRow(1).touch()
+
+	# Row 2 has expired 0.1 * TTL seconds ago, row 1 has got 0.3 * TTL
+	# seconds left
+	time.sleep(TTL * 0.7)
+	eq_(walkTTLTable(), [ (1, 10) ])
+	eq_(ttlCounter.value(), 1)
+	(data, datatype) = testenv.snmpget("TEST-MIB::testMIBObjects.2.4.0")
+	eq_(int(data), 1)
+	eq_(ttlTable.getRow(2), None)
+
+	time.sleep(TTL * 0.6)
+	eq_(walkTTLTable(), [])
+	eq_(ttlCounter.value(), 0)
+	eq_(list(ttlTable.iterRows()), [])
+
+@timed(3)
+def test_WALK_Table_rowTTL_setCells_touches_row():
+	""" WALK(Table(rowTTL=TTL)) keeps rows whose cells were set
+
+	This tests that setting a row's cells restarts its time to live, just
+	like touch() does. """
+
+	global agent, ttlTable
+
+	row = ttlTable.addRow([ agent.Integer32(3) ])
+	row.setCells({ 2: 30 })
+
+	time.sleep(TTL * 0.6)
+	row.setCells({ 2: 31 })
+	time.sleep(TTL * 0.6)
+	eq_(walkTTLTable(), [ (3, 31) ])
+
+	time.sleep(TTL * 0.6)
+	eq_(walkTTLTable(), [])
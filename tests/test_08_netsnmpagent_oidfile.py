@@ -0,0 +1,157 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# python-netsnmpagent module
+# Copyright (c) 2013-2016 Pieter Hollants <pieter@hollants.com>
+# Licensed under the GNU Lesser Public License (LGPL) version 3
+#
+# Integration tests for the netsnmpagent module (compiled OID files)
+#
+
+import sys, os
+from nose.tools import *
+sys.path.insert(1, "..")
+from netsnmptestenv import netsnmpTestEnv
+import netsnmpagent
+
+# The OID TEST-MIB::testInteger32NoInitval resolves to
+TESTOID = (1, 3, 6, 1, 2, 1, 74, 1, 101, 1, 1, 1, 1)
+
+def setUp(self):
+	global testenv, agent, testMIBPath, oidFilePath
+
+	testenv = netsnmpTestEnv()
+
+	# An OID file written for a different version of the TEST-MIB, mapping
+	# a name to a bogus OID, which the agent must not use
+	testMIBPath = os.path.abspath(os.path.dirname(__file__)) + \
+				  "/TEST-MIB.txt"
+	oidFilePath = os.path.join(testenv.statedir, "oids.bin")
+	netsnmpagent._writeOIDFile(
+		oidFilePath,
+		[ { "path": testMIBPath, "mtime": 0, "size": 0, "sha1": "0" * 40 } ],
+		{ "TEST-MIB::testInteger32NoInitval": (1, 2, 3) }
+	)
+
+	# Create a new netsnmpAgent instance which
+	# - connects to the net-snmp test environment's snmpd instance
+	# - uses its statedir
+	# - loads the TEST-MIB from our tests directory
+	# - uses the outdated OID file
+	agent = netsnmpagent.netsnmpAgent(
+		AgentName      = "netsnmpAgentTestAgent",
+		MasterSocket   = testenv.mastersocket,
+		PersistenceDir = testenv.statedir,
+		MIBFiles       = [ testMIBPath ],
+		OIDCacheFile   = oidFilePath,
+	)
+
+def tearDown(self):
+	global testenv, agent
+
+	if "agent" in globals():
+		agent.shutdown()
+
+	if "testenv" in globals():
+		testenv.shutdown()
+
+@timed(1)
+def test_OIDFile_read_eq_written():
+	""" _OIDFile(_writeOIDFile(entries)) == entries
+
+	This tests that the entries and the MIB file fingerprint written to a
+	compiled OID file are read back unchanged, and that the reverse mapping
+	prefers fully qualified names. """
+
+	global testenv, testMIBPath
+
+	path = os.path.join(testenv.statedir, "roundtrip.bin")
+	mibs = netsnmpagent._mibFingerprint([ testMIBPath ])
+	entries = {
+		"TEST-MIB::testInteger32NoInitval": TESTOID,
+		"testInteger32NoInitval":           TESTOID,
+		"TEST-MIB::testMIBObjects":         TESTOID[:10],
+	}
+	netsnmpagent._writeOIDFile(path, mibs, entries)
+
+	oidfile = netsnmpagent._OIDFile(path)
+	try:
+		eq_(len(oidfile), 3)
+		eq_(oidfile.mibs, mibs)
+		for name, oid in entries.items():
+			eq_(oidfile.get(name), oid)
+		eq_(oidfile.get("TEST-MIB::testInteger32OneInitval"), None)
+		eq_(oidfile.items(), entries)
+		eq_(oidfile.names()[TESTOID], "TEST-MIB::testInteger32NoInitval")
+		ok_(netsnmpagent._mibFingerprintValid(oidfile.mibs, [ testMIBPath ]))
+	finally:
+		oidfile.close()
+
+@timed(1)
+def test_OIDFile_truncated_or_corrupt_raises_Exception():
+	""" _OIDFile(truncated or corrupt file) raises Exception
+
+	This tests that compiled OID files cut short at any point, as well as
+	files with a wrong magic or header, are refused instead of being read
+	beyond their end. """
+
+	global testenv
+
+	path = os.path.join(testenv.statedir, "valid.bin")
+	netsnmpagent._writeOIDFile(path, [], { "TEST-MIB::testMIBObjects": TESTOID[:10] })
+	with open(path, "rb") as f:
+		contents = f.read()
+
+	preamble = netsnmpagent._oidFilePreamble
+	broken = [ contents[:length] for length in range(len(contents)) ]
+	broken.append(b"NOTOIDS1" + contents[8:])
+	broken.append(contents + b"\0")
+	broken.append(
+		preamble.pack(netsnmpagent._oidFileMagic, 2, 0, 0) + b"[]"
+	)
+
+	brokenPath = os.path.join(testenv.statedir, "broken.bin")
+	for data in broken:
+		with open(brokenPath, "wb") as f:
+			f.write(data)
+		assert_raises(
+			netsnmpagent.netsnmpAgentException,
+			netsnmpagent._OIDFile,
+			brokenPath
+		)
+
+@timed(1)
+def test_OIDFile_outdated_falls_back_to_MIB():
+	""" determine_oid_and_length() ignores an outdated OID file
+
+	This tests that an OID file whose MIB file fingerprint does not match
+	the MIBFiles is not used and names get resolved through the MIB
+	instead. """
+
+	global agent
+
+	eq_(agent._oidfile, None)
+	(oid, oid_len) = agent.determine_oid_and_length("TEST-MIB::testInteger32NoInitval")
+	eq_(tuple(oid[:oid_len.value]), TESTOID)
+
+@timed(1)
+def test_start_writes_OIDFile():
+	""" start() replaces the outdated OID file with a valid one
+
+	This tests that the names resolved through the MIB get compiled into
+	the OID file on start(), which the agent then uses itself. """
+
+	global agent, testMIBPath, oidFilePath
+
+	agent.Integer32(oidstr = "TEST-MIB::testInteger32NoInitval")
+	agent.start()
+
+	ok_(agent._oidfile is not None)
+	eq_(agent._oidfile.get("TEST-MIB::testInteger32NoInitval"), TESTOID)
+
+	oidfile = netsnmpagent._OIDFile(oidFilePath)
+	try:
+		ok_(netsnmpagent._mibFingerprintValid(oidfile.mibs, [ testMIBPath ]))
+		eq_(oidfile.get("TEST-MIB::testInteger32NoInitval"), TESTOID)
+	finally:
+		oidfile.close()
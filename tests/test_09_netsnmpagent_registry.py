@@ -0,0 +1,362 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# python-netsnmpagent module
+# Copyright (c) 2013-2016 Pieter Hollants <pieter@hollants.com>
+# Licensed under the GNU Lesser Public License (LGPL) version 3
+#
+# Integration tests for the netsnmpagent module (SNMP object registry)
+#
+
+import sys, os, threading
+from nose.tools import *
+sys.path.insert(1, "..")
+from netsnmptestenv import netsnmpTestEnv
+import netsnmpagent
+
+# The OIDs of TEST-MIB::testInteger32, testInteger32NoInitval and
+# testInteger32OneInitval
+INTEGER32OID   = (1, 3, 6, 1, 2, 1, 74, 1, 101, 1, 1, 1)
+NOINITVALOID   = INTEGER32OID + (1,)
+ONEINITVALOID  = INTEGER32OID + (6,)
+
+def setUp(self):
+	global testenv, agent, noInitvalInteger32, oneInitvalInteger32
+	global settableUnsigned32, testTable
+
+	testenv = netsnmpTestEnv()
+
+	# Create a new netsnmpAgent instance which
+	# - connects to the net-snmp test environment's snmpd instance
+	# - uses its statedir
+	# - loads the TEST-MIB from our tests directory
+	testMIBPath = os.path.abspath(os.path.dirname(__file__)) + \
+				  "/TEST-MIB.txt"
+	agent = netsnmpagent.netsnmpAgent(
+		AgentName      = "netsnmpAgentTestAgent",
+		MasterSocket   = testenv.mastersocket,
+		PersistenceDir = testenv.statedir,
+		MIBFiles       = [ testMIBPath ],
+	)
+
+	# Objects registered by name and by numeric OID
+	noInitvalInteger32 = agent.Integer32(
+		oidstr  = "TEST-MIB::testInteger32NoInitval",
+		initval = 1,
+	)
+	oneInitvalInteger32 = agent.Integer32(
+		oidstr  = ".1.3.6.1.2.1.74.1.101.1.1.1.6",
+		initval = 6,
+	)
+	settableUnsigned32 = agent.Unsigned32(
+		oidstr  = "TEST-MIB::testUnsigned32NoInitval",
+		initval = 2,
+	)
+	testTable = agent.Table(
+		oidstr  = "TEST-MIB::testTable",
+		indexes = [ agent.Integer32() ],
+		columns = [ (2, agent.Integer32(42)) ],
+	)
+	testTable.addRow([ agent.Integer32(1) ])
+
+	# The agent gets started by test_start() below, so that the tests
+	# before can still register objects
+
+@nottest
+def startRequestHandler():
+	""" Creates a separate thread to implement the absolutely most
+	    minimalistic possible agent doing nothing but request handling. """
+
+	global agent
+
+	agent.loop = True
+	def RequestHandler():
+		while agent.loop:
+			agent.check_and_process(False)
+
+	agent.thread = threading.Thread(target=RequestHandler)
+	agent.thread.daemon = True
+	agent.thread.start()
+
+@nottest
+def stopRequestHandler():
+	""" Stops the thread started by startRequestHandler(), so that objects
+	    can be unregistered without it processing requests meanwhile. """
+
+	global agent
+
+	agent.loop = False
+	agent.thread.join()
+	del agent.thread
+
+def tearDown(self):
+	global testenv, agent
+
+	if "agent" in globals():
+		agent.loop = False
+		if hasattr(agent, "thread"):
+			agent.thread.join()
+		agent.shutdown()
+
+	if "testenv" in globals():
+		testenv.shutdown()
+
+@timed(1)
+def test_OIDRegistry_same_OID_replaces_object():
+	""" _OIDRegistry.add(oid) replaces the object registered at "oid"
+
+	This tests that objects are keyed by numeric OID, so that registering
+	at the same OID under another name does not add a second entry. """
+
+	registry = netsnmpagent._OIDRegistry()
+	registry.add((1, 3, 6), ".1.3.6", "first")
+	registry.add([ 1, 3, 6 ], "SNMPv2-SMI::dod", "second")
+
+	eq_(len(registry), 1)
+	ok_((1, 3, 6) in registry)
+	eq_(registry.get((1, 3, 6)), "second")
+	eq_(list(registry.items()), [ ((1, 3, 6), "SNMPv2-SMI::dod", "second") ])
+
+@timed(1)
+def test_OIDRegistry_items_prefix_in_OID_order():
+	""" _OIDRegistry.items(prefix) yields the subtree in OID order
+
+	This tests that items() returns the objects at or below "prefix" only,
+	sorted numerically rather than as strings. """
+
+	registry = netsnmpagent._OIDRegistry()
+	for oid in [ (1, 3, 10), (1, 4), (1, 3), (1, 30), (1, 3, 2), (1, 3, 2, 1) ]:
+		registry.add(oid, ".".join(str(x) for x in oid), oid)
+
+	eq_(
+		[ oid for oid, oidstr, obj in registry.items((1, 3)) ],
+		[ (1, 3), (1, 3, 2), (1, 3, 2, 1), (1, 3, 10) ]
+	)
+	eq_([ oid for oid, oidstr, obj in registry.items((1, 5)) ], [])
+	eq_(len(list(registry.items())), 6)
+
+@timed(1)
+def test_OIDRegistry_find_and_remove():
+	""" _OIDRegistry.find() returns the longest registered prefix
+
+	This tests that find() relates instance OIDs to the object whose
+	registration covers them and that remove() takes an object out of the
+	registry, including its subtree queries. """
+
+	registry = netsnmpagent._OIDRegistry()
+	registry.add((1, 3), "a", "a")
+	registry.add((1, 3, 6), "b", "b")
+
+	eq_(registry.find((1, 3, 6, 1, 0)), ((1, 3, 6), "b", "b"))
+	eq_(registry.find((1, 3, 7)), ((1, 3), "a", "a"))
+	eq_(registry.find((1, 4)), None)
+
+	eq_(registry.remove((1, 3, 6)), ("b", "b"))
+	eq_(registry.find((1, 3, 6, 1, 0)), ((1, 3), "a", "a"))
+	eq_(list(registry.items((1, 3))), [ ((1, 3), "a", "a") ])
+	assert_raises(KeyError, registry.remove, (1, 3, 6))
+
+@timed(1)
+def test_registry_keys_objects_by_numeric_OID():
+	""" agent registry holds objects by numeric OID
+
+	This tests that objects registered by name and by numeric OID are both
+	found by their numeric OIDs, scalars by the OID they were registered
+	at rather than their ".0" instance. """
+
+	global agent, noInitvalInteger32, oneInitvalInteger32
+
+	registry = agent._objs[""]
+	eq_(len(registry), 4)
+	eq_(registry.get(NOINITVALOID), noInitvalInteger32)
+	eq_(registry.get(ONEINITVALOID), oneInitvalInteger32)
+	eq_(
+		[ oidstr for oid, oidstr, obj in registry.items(INTEGER32OID) ],
+		[ "TEST-MIB::testInteger32NoInitval", ".1.3.6.1.2.1.74.1.101.1.1.1.6" ]
+	)
+
+@timed(1)
+@raises(netsnmpagent.netsnmpAgentException)
+def test_registerMany_same_numeric_OID_raises_Exception():
+	""" registerMany(numeric OID of object registered by name) raises Exception
+
+	This tests that duplicate registrations are detected by numeric OID,
+	not by the string the OID was given as. """
+
+	global agent
+
+	agent.registerMany([
+		("Integer32", ".1.3.6.1.2.1.74.1.101.1.1.1.1", 2),
+	])
+
+@timed(1)
+def test_getRegistered_prefix_eq_subtree():
+	""" getRegistered(prefix=testInteger32) == objects below testInteger32
+
+	This tests that getRegistered() narrows the objects down to a subtree,
+	whether its OID is given by name or as a tuple. """
+
+	global agent
+
+	expected = {
+		"TEST-MIB::testInteger32NoInitval": {
+			"type": "Integer32", "value": 1
+		},
+		".1.3.6.1.2.1.74.1.101.1.1.1.6": {
+			"type": "Integer32", "value": 6
+		},
+	}
+	eq_(agent.getRegistered(prefix = "TEST-MIB::testInteger32"), expected)
+	eq_(agent.getRegistered(prefix = INTEGER32OID), expected)
+	eq_(agent.getRegistered(prefix = "TEST-MIB::testCounter32"), {})
+
+@timed(1)
+def test_getRegistered_types_eq_objects_of_types():
+	""" getRegistered(types=["Unsigned32"]) == Unsigned32 objects only """
+
+	global agent
+
+	eq_(agent.getRegistered(types = [ "Unsigned32" ]), {
+		"TEST-MIB::testUnsigned32NoInitval": {
+			"type": "Unsigned32", "value": 2
+		},
+	})
+	eq_(list(agent.getRegistered(types = [ "Table" ])), [ "TEST-MIB::testTable" ])
+	eq_(agent.getRegistered(types = [ "Counter64" ]), {})
+
+@timed(1)
+def test_getRegistered_includeTables_False_leaves_out_tables():
+	""" getRegistered(includeTables=False) leaves out tables
+
+	This tests that tables, whose contents would have to be dumped, are
+	only returned without "includeTables" set to False. """
+
+	global agent
+
+	scalars = [
+		"TEST-MIB::testInteger32NoInitval",
+		".1.3.6.1.2.1.74.1.101.1.1.1.6",
+		"TEST-MIB::testUnsigned32NoInitval",
+	]
+	eq_(sorted(agent.getRegistered(includeTables = False)), sorted(scalars))
+
+	objs = agent.getRegistered()
+	eq_(sorted(objs), sorted(scalars + [ "TEST-MIB::testTable" ]))
+	eq_(objs["TEST-MIB::testTable"]["value"][1], { 2: 42 })
+
+@timed(1)
+def test_getRegistered_unknown_context_eq_empty():
+	""" getRegistered(context="unknown") == {}
+
+	This tests that asking for a context nothing has been registered in
+	neither fails nor creates the context. """
+
+	global agent
+
+	eq_(agent.getRegistered(context = "unknown"), {})
+	eq_(agent.changedSince(context = "unknown")[1], {})
+	ok_("unknown" not in agent.getContexts())
+
+@timed(1)
+def test_start():
+	""" Starting the agent and processing requests """
+
+	global agent
+
+	agent.start()
+	startRequestHandler()
+
+@timed(1)
+def test_changedSince_returns_changed_objects_only():
+	""" changedSince(token) returns the objects changed since "token"
+
+	This tests that changedSince() without a token returns all objects and
+	that the tokens it returns yield only the objects changed afterwards,
+	whether through update(), SNMP SETs or table rows being added. """
+
+	global testenv, agent, settableUnsigned32, testTable
+
+	(token, objs) = agent.changedSince()
+	eq_(len(objs), 4)
+
+	(token, objs) = agent.changedSince(token)
+	eq_(objs, {})
+
+	settableUnsigned32.update(3)
+	(token, objs) = agent.changedSince(token)
+	eq_(objs, {
+		"TEST-MIB::testUnsigned32NoInitval": {
+			"type": "Unsigned32", "value": 3
+		},
+	})
+
+	print(testenv.snmpset("TEST-MIB::testUnsigned32NoInitval.0", 4, "u"))
+	(token, objs) = agent.changedSince(token)
+	eq_(list(objs), [ "TEST-MIB::testUnsigned32NoInitval" ])
+	eq_(objs["TEST-MIB::testUnsigned32NoInitval"]["value"], 4)
+
+	testTable.addRow([ agent.Integer32(2) ])
+	eq_(agent.changedSince(token, includeTables = False)[1], {})
+	eq_(list(agent.changedSince(token)[1]), [ "TEST-MIB::testTable" ])
+
+@timed(1)
+def test_unregister_scalar_by_instance_OID():
+	""" GET(Integer32) fails after unregister(Integer32.0)
+
+	This tests that unregister() finds a scalar by its instance OID, takes
+	it out of the registry and makes net-snmp stop serving it, while the
+	object keeps its value. """
+
+	global testenv, agent, noInitvalInteger32
+
+	(data, datatype) = testenv.snmpget("TEST-MIB::testInteger32NoInitval.0")
+	eq_(int(data), 1)
+
+	stopRequestHandler()
+	try:
+		snmpobj = agent.unregister("TEST-MIB::testInteger32NoInitval.0")
+	finally:
+		startRequestHandler()
+
+	eq_(snmpobj, noInitvalInteger32)
+	eq_(snmpobj.value(), 1)
+	ok_(NOINITVALOID not in agent._objs[""])
+	assert_raises(
+		netsnmpTestEnv.MIBUnavailableError,
+		testenv.snmpget,
+		"TEST-MIB::testInteger32NoInitval.0"
+	)
+
+	(data, datatype) = testenv.snmpget("TEST-MIB::testInteger32OneInitval.0")
+	eq_(int(data), 6)
+
+@timed(1)
+def test_unregister_table_by_cell_OID():
+	""" GET(Table cell) fails after unregister(Table cell) """
+
+	global testenv, agent, testTable
+
+	(data, datatype) = testenv.snmpget("TEST-MIB::testTableValue.1")
+	eq_(int(data), 42)
+
+	stopRequestHandler()
+	try:
+		eq_(agent.unregister("TEST-MIB::testTableValue.1"), testTable)
+	finally:
+		startRequestHandler()
+
+	assert_raises(
+		netsnmpTestEnv.MIBUnavailableError,
+		testenv.snmpget,
+		"TEST-MIB::testTableValue.1"
+	)
+	eq_(len(agent._objs[""]), 2)
+
+@timed(1)
+@raises(netsnmpagent.netsnmpAgentException)
+def test_unregister_unregistered_OID_raises_Exception():
+	""" unregister(OID nothing is registered at) raises Exception """
+
+	global agent
+
+	agent.unregister("TEST-MIB::testCounter32NoInitval")
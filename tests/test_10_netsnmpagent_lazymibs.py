@@ -0,0 +1,137 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# python-netsnmpagent module
+# Copyright (c) 2013-2016 Pieter Hollants <pieter@hollants.com>
+# Licensed under the GNU Lesser Public License (LGPL) version 3
+#
+# Integration tests for the netsnmpagent module (MIB modules loaded on demand)
+#
+
+import sys, os
+from nose.tools import *
+sys.path.insert(1, "..")
+from netsnmptestenv import netsnmpTestEnv
+import netsnmpagent
+
+def setUp(self):
+	global testenv, agent, testMIBPath
+
+	testenv = netsnmpTestEnv()
+
+	# Create a new netsnmpAgent instance which
+	# - connects to the net-snmp test environment's snmpd instance
+	# - uses its statedir
+	# - loads the TEST-MIB from our tests directory
+	# - loads all other MIB modules on demand only
+	testMIBPath = os.path.abspath(os.path.dirname(__file__)) + \
+				  "/TEST-MIB.txt"
+	agent = netsnmpagent.netsnmpAgent(
+		AgentName      = "netsnmpAgentTestAgent",
+		MasterSocket   = testenv.mastersocket,
+		PersistenceDir = testenv.statedir,
+		MIBFiles       = [ testMIBPath ],
+		LazyMIBs       = True,
+	)
+
+def tearDown(self):
+	global testenv, agent
+
+	if "agent" in globals():
+		agent.shutdown()
+
+	if "testenv" in globals():
+		testenv.shutdown()
+
+@nottest
+def resolve(oidstr):
+	""" Returns the OID "oidstr" resolves to as a tuple. """
+
+	global agent
+
+	(oid, oid_len) = agent.determine_oid_and_length(oidstr)
+	return tuple(oid[:oid_len.value])
+
+@timed(1)
+def test_mibLoadReport_lists_MIBFiles_only():
+	""" mibLoadReport() lists the MIBFiles only before any name is resolved """
+
+	global agent, testMIBPath
+
+	report = agent.mibLoadReport()
+	eq_(report["lazy"], True)
+	eq_(report["modules"], [ testMIBPath ])
+	ok_(report["seconds"] >= 0)
+
+@timed(1)
+def test_resolve_loads_MIB_module_once():
+	""" determine_oid_and_length(NET-SNMP-MIB::...) loads NET-SNMP-MIB once
+
+	This tests that resolving a name from a MIB module that has not been
+	loaded yet loads it, that mibLoadReport() lists it and that resolving
+	further names from it does not load it again. """
+
+	global agent, testMIBPath
+
+	seconds = agent.mibLoadReport()["seconds"]
+
+	eq_(resolve("NET-SNMP-MIB::netSnmp"), (1, 3, 6, 1, 4, 1, 8072))
+	eq_(resolve("NET-SNMP-MIB::netSnmpObjects"), (1, 3, 6, 1, 4, 1, 8072, 1))
+
+	report = agent.mibLoadReport()
+	eq_(report["modules"], [ testMIBPath, "NET-SNMP-MIB" ])
+	ok_(report["seconds"] >= seconds)
+
+@timed(1)
+@raises(netsnmpagent.netsnmpAgentException)
+def test_resolve_unknown_MIB_module_raises_Exception():
+	""" determine_oid_and_length(unknown MIB module) raises Exception
+
+	This tests that a module that can't be loaded makes the resolution
+	fail and does not show up in mibLoadReport(). """
+
+	global agent
+
+	try:
+		resolve("NO-SUCH-TEST-MIB::noSuchObject")
+	finally:
+		ok_("NO-SUCH-TEST-MIB" not in agent.mibLoadReport()["modules"])
+
+@timed(1)
+def test_loading_MIB_module_keeps_OID_cache():
+	""" loading a MIB module on demand keeps the OID cache
+
+	This tests that names resolved before a MIB module gets loaded on
+	demand are still served from the OID cache afterwards. """
+
+	global agent
+
+	resolve("TEST-MIB::testMIBObjects")
+	stats = agent.oidCacheStats()
+
+	resolve("NET-SNMP-AGENT-MIB::nsModuleTable")
+	ok_("NET-SNMP-AGENT-MIB" in agent.mibLoadReport()["modules"])
+	eq_(agent.oidCacheStats()["size"], stats["size"] + 1)
+
+	resolve("TEST-MIB::testMIBObjects")
+	eq_(agent.oidCacheStats()["hits"], stats["hits"] + 1)
+
+@timed(1)
+def test_mibsChanged_clears_OID_cache():
+	""" _mibsChanged() clears the OID cache
+
+	This tests that once MIBs changed in a way that may make names resolve
+	differently, names get resolved again instead of being served from the
+	cache. """
+
+	global agent
+
+	resolve("TEST-MIB::testMIBObjects")
+	ok_(agent.oidCacheStats()["size"] > 0)
+
+	agent._mibsChanged()
+	eq_(agent.oidCacheStats()["size"], 0)
+
+	misses = agent.oidCacheStats()["misses"]
+	eq_(resolve("TEST-MIB::testMIBObjects"), (1, 3, 6, 1, 2, 1, 74, 1, 101, 1))
+	eq_(agent.oidCacheStats()["misses"], misses + 1)
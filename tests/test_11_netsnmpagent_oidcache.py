@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# python-netsnmpagent module
+# Copyright (c) 2013-2016 Pieter Hollants <pieter@hollants.com>
+# Licensed under the GNU Lesser Public License (LGPL) version 3
+#
+# Integration tests for the netsnmpagent module (OID resolution cache)
+#
+
+import sys, os
+from nose.tools import *
+sys.path.insert(1, "..")
+from netsnmptestenv import netsnmpTestEnv
+import netsnmpagent
+
+# The OID TEST-MIB::testMIBObjects resolves to
+TESTOID = (1, 3, 6, 1, 2, 1, 74, 1, 101, 1)
+
+def setUp(self):
+	global testenv, agent
+
+	testenv = netsnmpTestEnv()
+
+	# Create a new netsnmpAgent instance which
+	# - connects to the net-snmp test environment's snmpd instance
+	# - uses its statedir
+	# - loads the TEST-MIB from our tests directory
+	# - caches the resolution of two OID strings at most
+	testMIBPath = os.path.abspath(os.path.dirname(__file__)) + \
+				  "/TEST-MIB.txt"
+	agent = netsnmpagent.netsnmpAgent(
+		AgentName      = "netsnmpAgentTestAgent",
+		MasterSocket   = testenv.mastersocket,
+		PersistenceDir = testenv.statedir,
+		MIBFiles       = [ testMIBPath ],
+		OIDCacheSize   = 2,
+	)
+
+def tearDown(self):
+	global testenv, agent
+
+	if "agent" in globals():
+		agent.shutdown()
+
+	if "testenv" in globals():
+		testenv.shutdown()
+
+@nottest
+def resolve(oidstr):
+	""" Returns the OID "oidstr" resolves to as a tuple. """
+
+	global agent
+
+	(oid, oid_len) = agent.determine_oid_and_length(oidstr)
+	return tuple(oid[:oid_len.value])
+
+@timed(1)
+def test_OIDCache_evicts_least_recently_used():
+	""" _OIDCache(2).put(third OID) evicts the least recently used OID
+
+	This tests that looking an entry up marks it as recently used, so that
+	the entry evicted is the one used longest ago, not the one added first. """
+
+	cache = netsnmpagent._OIDCache(2)
+	cache.put("a", (1,))
+	cache.put("b", (2,))
+	eq_(cache.get("a"), (1,))
+
+	cache.put("c", (3,))
+	eq_(cache.get("b"), None)
+	eq_(cache.get("a"), (1,))
+	eq_(cache.get("c"), (3,))
+	eq_(cache.stats(), { "hits": 3, "misses": 1, "size": 2, "maxsize": 2 })
+
+@timed(1)
+def test_OIDCache_size_0_caches_nothing():
+	""" _OIDCache(0).put(OID) caches nothing """
+
+	cache = netsnmpagent._OIDCache(0)
+	cache.put("a", (1,))
+	eq_(cache.get("a"), None)
+	eq_(cache.stats(), { "hits": 0, "misses": 1, "size": 0, "maxsize": 0 })
+
+@timed(1)
+def test_oidCacheStats_counts_hits_and_misses():
+	""" oidCacheStats() counts determine_oid_and_length() hits and misses
+
+	This tests that resolving an OID string once misses the cache, that
+	resolving it again is served from the cache with the same result and
+	that the cache does not grow beyond OIDCacheSize. """
+
+	global agent
+
+	stats = agent.oidCacheStats()
+	eq_(stats["maxsize"], 2)
+
+	eq_(resolve("TEST-MIB::testMIBObjects"), TESTOID)
+	eq_(resolve("TEST-MIB::testMIBObjects"), TESTOID)
+	eq_(resolve("TEST-MIB::testInteger32"), TESTOID + (1, 1))
+	eq_(resolve("TEST-MIB::testInteger32NoInitval"), TESTOID + (1, 1, 1))
+
+	eq_(agent.oidCacheStats(), {
+		"hits":    stats["hits"] + 1,
+		"misses":  stats["misses"] + 3,
+		"size":    2,
+		"maxsize": 2
+	})
+
+@timed(1)
+def test_oidCacheStats_evicted_OID_misses():
+	""" determine_oid_and_length(evicted OID) misses the cache
+
+	This tests that an OID string evicted from the full cache gets resolved
+	again, to the same OID. """
+
+	global agent
+
+	resolve("TEST-MIB::testMIBObjects")
+	resolve("TEST-MIB::testInteger32")
+	resolve("TEST-MIB::testInteger32NoInitval")
+
+	misses = agent.oidCacheStats()["misses"]
+	eq_(resolve("TEST-MIB::testMIBObjects"), TESTOID)
+	eq_(agent.oidCacheStats()["misses"], misses + 1)
+
+@timed(1)
+def test_determine_oid_and_length_returns_private_copies():
+	""" determine_oid_and_length() returns a new array for cached OIDs
+
+	This tests that modifying the array returned, as ObjectIdentifiers being
+	SET do, does not corrupt the cached OID. """
+
+	global agent
+
+	(oid, oid_len) = agent.determine_oid_and_length("TEST-MIB::testMIBObjects")
+	oid[0] = 2
+	eq_(resolve("TEST-MIB::testMIBObjects"), TESTOID)
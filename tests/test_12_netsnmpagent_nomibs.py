@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# python-netsnmpagent module
+# Copyright (c) 2013-2016 Pieter Hollants <pieter@hollants.com>
+# Licensed under the GNU Lesser Public License (LGPL) version 3
+#
+# Integration tests for the netsnmpagent module (tables without MIB files)
+#
+
+import sys, os, threading
+from nose.tools import *
+sys.path.insert(1, "..")
+from netsnmptestenv import netsnmpTestEnv
+import netsnmpagent
+
+# The OID of TEST-MIB::testMIBObjects, which we must give numerically
+TESTOID = ".1.3.6.1.2.1.74.1.101.1"
+
+def setUp(self):
+	global testenv, agent, intTable, stringTable, ipTable
+
+	testenv = netsnmpTestEnv()
+
+	# Create a new netsnmpAgent instance which
+	# - connects to the net-snmp test environment's snmpd instance
+	# - uses its statedir
+	# - does not use MIB files at all, so that row indexes get decoded
+	#   without the MIB
+	agent = netsnmpagent.netsnmpAgent(
+		AgentName      = "netsnmpAgentTestAgent",
+		MasterSocket   = testenv.mastersocket,
+		PersistenceDir = testenv.statedir,
+		UseMIBFiles    = False,
+	)
+
+	# Test OIDs for tables indexed by an integer, by a string and an
+	# integer and by an IP address
+	intTable = agent.Table(
+		oidstr  = TESTOID + ".11",
+		indexes = [ agent.Integer32() ],
+		columns = [ (2, agent.Integer32(0)) ],
+	)
+	intTable.addRow([ agent.Integer32(1) ]).setRowCell(2, agent.Integer32(10))
+	intTable.addRow([ agent.Integer32(2) ]).setRowCell(2, agent.Integer32(20))
+
+	stringTable = agent.Table(
+		oidstr  = TESTOID + ".12",
+		indexes = [ agent.DisplayString(), agent.Integer32() ],
+		columns = [ (3, agent.Integer32(0)) ],
+	)
+	stringTable.addRow([
+		agent.DisplayString("aa"), agent.Integer32(1)
+	]).setRowCell(3, agent.Integer32(11))
+	stringTable.addRow([
+		agent.DisplayString("b"), agent.Integer32(2)
+	]).setRowCell(3, agent.Integer32(22))
+
+	ipTable = agent.Table(
+		oidstr  = TESTOID + ".13",
+		indexes = [ agent.IpAddress() ],
+		columns = [ (2, agent.Integer32(0)) ],
+	)
+	ipTable.addRow([ agent.IpAddress("10.0.0.1") ]).setRowCell(2, agent.Integer32(1))
+
+	# Connect to master snmpd instance
+	agent.start()
+
+	# Create a separate thread to implement the absolutely most
+	# minimalistic possible agent doing nothing but request handling
+	agent.loop = True
+	def RequestHandler():
+		while agent.loop:
+			agent.check_and_process(False)
+
+	agent.thread = threading.Thread(target=RequestHandler)
+	agent.thread.daemon = True
+	agent.thread.start()
+
+def tearDown(self):
+	global testenv, agent
+
+	if "agent" in globals():
+		agent.loop = False
+		if hasattr(agent, "thread"):
+			agent.thread.join()
+		agent.shutdown()
+
+	if "testenv" in globals():
+		testenv.shutdown()
+
+@timed(1)
+def test_Table_integer_index_eq_int():
+	""" Table(indexes=[Integer32()]).value() indexes rows by int
+
+	This tests that integer row indexes decoded without the MIB come back
+	as integers, just like they do when decoded through the MIB. """
+
+	global intTable
+
+	eq_(list(intTable.iterRows()), [ (1, { 2: 10 }), (2, { 2: 20 }) ])
+	value = intTable.value()
+	del value[0]
+	eq_(value, { 1: { 2: 10 }, 2: { 2: 20 } })
+
+@timed(1)
+def test_Table_string_and_integer_index_eq_dotted_string():
+	""" Table(indexes=[DisplayString(), Integer32()]).value() indexes rows by "aa.1"
+
+	This tests that row indexes made of several values get decoded without
+	the MIB into the unquoted strings "snmptable" would show. """
+
+	global stringTable
+
+	eq_(list(stringTable.iterRows()), [ ("b.2", { 3: 22 }), ("aa.1", { 3: 11 }) ])
+	value = stringTable.value()
+	del value[0]
+	eq_(value, { "aa.1": { 3: 11 }, "b.2": { 3: 22 } })
+
+@timed(1)
+def test_Table_IpAddress_index_eq_dotted_quad():
+	""" Table(indexes=[IpAddress()]).value() indexes rows by "10.0.0.1" """
+
+	global ipTable
+
+	eq_(list(ipTable.iterRows()), [ ("10.0.0.1", { 2: 1 }) ])
+
+@timed(1)
+def test_GET_Table_string_index_eq_value():
+	""" GET(Table(indexes=[DisplayString(), Integer32()]).aa.1) == 11
+
+	This tests that the rows whose indexes were encoded without the MIB
+	are served at the OIDs a MIB-aware client expects. """
+
+	global testenv
+
+	(data, datatype) = testenv.snmpget(TESTOID + ".12.1.3.2.97.97.1")
+	eq_(datatype, "INTEGER")
+	eq_(int(data), 11)
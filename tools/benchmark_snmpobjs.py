@@ -0,0 +1,146 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# python-netsnmpagent module
+# Copyright (c) 2013-2016 Pieter Hollants <pieter@hollants.com>
+# Licensed under the GNU Lesser Public License (LGPL) version 3
+#
+# Benchmark for SNMP object creation and registration
+#
+
+""" Measures the time and the memory (RSS) it takes to create and register
+a large number of SNMP scalar objects and table rows, and to update table
+cells.
+
+Run it from the source tree's top-level directory:
+
+  $ python tools/benchmark_snmpobjs.py [count]
+
+To compare against another version of the netsnmpagent module, run the same
+script with PYTHONPATH pointing to a checkout of that version, eg.:
+
+  $ git worktree add /tmp/before <revision>
+  $ PYTHONPATH=/tmp/before python tools/benchmark_snmpobjs.py
+
+No snmpd instance is required since the agent is never start()ed, but the
+net-snmp libraries must be installed: registration happens in net-snmp, so
+figures obtained without them say nothing about it. """
+
+import sys, os, time, gc, struct
+if not os.environ.get("PYTHONPATH"):
+	sys.path.insert(1, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import netsnmpagent
+
+def rss_kb():
+	""" Returns the current resident set size of this process in kB. """
+
+	with open("/proc/self/status") as f:
+		for line in f:
+			if line.startswith("VmRSS:"):
+				return int(line.split()[1])
+	return 0
+
+def table(agent, oidstr):
+	""" Returns a new Table with a single index and column. """
+
+	return agent.Table(
+		oidstr  = oidstr,
+		indexes = [ agent.Unsigned32() ],
+		columns = [ (2, agent.Integer32(0)) ]
+	)
+
+def measure(name, func, count):
+	gc.collect()
+	rss_before = rss_kb()
+	start = time.time()
+	objs = func(count)
+	duration = time.time() - start
+	gc.collect()
+	rss_after = rss_kb()
+	print("{0:<48} {1:>8.3f} s {2:>10} kB RSS ({3:.1f} bytes/object)".format(
+		name,
+		duration,
+		rss_after - rss_before,
+		(rss_after - rss_before) * 1024.0 / count
+	))
+	return objs
+
+if __name__ == "__main__":
+	count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+
+	agent = netsnmpagent.netsnmpAgent(
+		AgentName   = "netsnmpAgentBenchmarkAgent",
+		UseMIBFiles = False,
+	)
+
+	print("netsnmpagent module: {0}".format(netsnmpagent.__file__))
+	print("Objects per run: {0}".format(count))
+	print("")
+
+	keep = []
+	keep.append(measure(
+		"Integer32, unregistered",
+		lambda n: [agent.Integer32(i) for i in range(n)],
+		count
+	))
+	keep.append(measure(
+		"Counter64, unregistered",
+		lambda n: [agent.Counter64(i) for i in range(n)],
+		count
+	))
+	keep.append(measure(
+		"Integer32, registered",
+		lambda n: [agent.Integer32(oidstr=".1.3.6.1.4.1.8072.9999.1.{0}".format(i))
+		           for i in range(n)],
+		count
+	))
+	keep.append(measure(
+		"OctetString, registered",
+		lambda n: [agent.OctetString(oidstr=".1.3.6.1.4.1.8072.9999.2.{0}".format(i))
+		           for i in range(n)],
+		count
+	))
+	keep.append(measure(
+		"Integer32, registerMany()",
+		lambda n: agent.registerMany(
+			("Integer32", ".1.3.6.1.4.1.8072.9999.3.{0}".format(i))
+			for i in range(n)
+		),
+		count
+	))
+
+	# Table rows get added in index order, which net-snmp appends to the
+	# row list in constant time. Rows added out of order would take linear
+	# time each to be inserted, which addRows() avoids by sorting them once.
+	rows = count
+	def addRow(n):
+		t = table(agent, ".1.3.6.1.4.1.8072.9999.4")
+		for i in range(n):
+			t.addRow([agent.Unsigned32(i)]).setRowCell(2, agent.Integer32(i))
+		return t
+	def addRows(n):
+		t = table(agent, ".1.3.6.1.4.1.8072.9999.5")
+		t.addRows(
+			([agent.Unsigned32(i)], { 2: agent.Integer32(i) })
+			for i in range(n)
+		)
+		return t
+	keep.append(measure("Table rows, addRow()", addRow, rows))
+	keep.append(measure("Table rows, addRows()", addRows, rows))
+
+	# Repeated updates of a single Integer32 table cell, once through
+	# netsnmp_set_row_column(), which reallocates the cell's storage every
+	# time, and once through TableRow.setCells(), which overwrites it in place
+	row = table(agent, ".1.3.6.1.4.1.8072.9999.6").addRow([agent.Unsigned32(1)])
+	row.setCells({ 2: 0 })
+	def setRowColumn(n):
+		for i in range(n):
+			raw = struct.pack("l", i)
+			netsnmpagent.libnsX.netsnmp_set_row_column(
+				row._table_row, 2, netsnmpagent.ASN_INTEGER, raw, len(raw)
+			)
+	def setCells(n):
+		for i in range(n):
+			row.setCells({ 2: i })
+	measure("Table cell updates, netsnmp_set_row_column()", setRowColumn, count)
+	measure("Table cell updates, in place", setCells, count)